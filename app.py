@@ -14,10 +14,8 @@ logfire.configure()
 # This goes after logfire.configure() to avoid
 # LogfireNotConfiguredWarning: Instrumentation will have no effect
 from app_functions import (
-    _fetch_current_revision,
-    _fetch_previous_revision,
-    _run_heuristic_classifier,
-    _run_fewshot_classifier,
+    _stream_revisions,
+    _stream_classifiers,
     _run_judge,
     find_interesting_example,
 )
@@ -35,33 +33,70 @@ def start_parent_span(page_title: str, number_behind: int, units_behind: str):
     return context
 
 
-def fetch_current_revision(title: str, context=None):
+async def stream_in_context(stream, context=None):
     """
-    Wrapper to run _fetch_current_revision in provided Logfire context.
+    Iterate over an async generator with each step run in provided Logfire context.
+    The context is attached for each step rather than across the yields because
+    Gradio may resume the generator in a different task.
+    """
+    while True:
+        with logfire.attach_context(context) if context else nullcontext():
+            try:
+                outputs = await anext(stream)
+            except StopAsyncIteration:
+                return
+        yield outputs
+
+
+async def fetch_revisions(title: str, number: int, units: str, context=None):
+    """
+    Wrapper to run _stream_revisions in provided Logfire context.
     We use a wrapper to minimize indentation in the called function.
+    The revisions are shown as soon as they are downloaded.
     """
-    with logfire.attach_context(context) if context else nullcontext():
-        return _fetch_current_revision(title)
+    async for outputs in stream_in_context(
+        _stream_revisions(title, number, units), context
+    ):
+        yield outputs
 
 
-def fetch_previous_revision(
-    title: str, number: int, units: str, new_revision: str, context=None
-):
-    with logfire.attach_context(context) if context else nullcontext():
-        return _fetch_previous_revision(title, number, units, new_revision)
+async def run_classifiers(old_revision: str, new_revision: str, context=None):
+    # Each classifier's rationale is shown when it is ready
+    async for outputs in stream_in_context(
+        _stream_classifiers(old_revision, new_revision), context
+    ):
+        yield outputs
 
 
-def run_heuristic_classifier(old_revision: str, new_revision: str, context=None):
-    with logfire.attach_context(context) if context else nullcontext():
-        return _run_heuristic_classifier(old_revision, new_revision)
+async def rerun_classifiers(old_revision: str, new_revision: str, context=None):
+    # Resample the models instead of returning the cached results
+    async for outputs in stream_in_context(
+        _stream_classifiers(old_revision, new_revision, use_cache=False), context
+    ):
+        yield outputs
 
 
-def run_fewshot_classifier(old_revision: str, new_revision: str, context=None):
+def run_judge(
+    old_revision: str,
+    new_revision: str,
+    heuristic_noteworthy: bool,
+    fewshot_noteworthy: bool,
+    heuristic_rationale: str,
+    fewshot_rationale: str,
+    context=None,
+):
     with logfire.attach_context(context) if context else nullcontext():
-        return _run_fewshot_classifier(old_revision, new_revision)
+        return _run_judge(
+            old_revision,
+            new_revision,
+            heuristic_noteworthy,
+            fewshot_noteworthy,
+            heuristic_rationale,
+            fewshot_rationale,
+        )
 
 
-def run_judge(
+def rerun_judge(
     old_revision: str,
     new_revision: str,
     heuristic_noteworthy: bool,
@@ -70,6 +105,7 @@ def run_judge(
     fewshot_rationale: str,
     context=None,
 ):
+    # Resample the judge instead of returning the cached result
     with logfire.attach_context(context) if context else nullcontext():
         return _run_judge(
             old_revision,
@@ -78,6 +114,7 @@ def run_judge(
             fewshot_noteworthy,
             heuristic_rationale,
             fewshot_rationale,
+            use_cache=False,
         )
 
 
@@ -117,7 +154,7 @@ with gr.Blocks(title="Noteworthy Differences") as demo:
                 gr.Markdown(
                     """
                 - Page title is case sensitive; use underscores or spaces
-                - Specify any number of days or up to 499 revisions behind
+                - Specify any number of days or up to 5000 revisions behind
                   - The closest available revision is retrieved
                 - Only article introductions are downloaded
                 """
@@ -215,6 +252,8 @@ with gr.Blocks(title="Noteworthy Differences") as demo:
                         until the confidence score is not High,
                         up to 20 tries*"""
                         )
+                        # Pages tried by Special Random
+                        special_random_log = gr.Markdown("")
 
     # States to store boolean values
     heuristic_noteworthy = gr.State()
@@ -232,11 +271,16 @@ with gr.Blocks(title="Noteworthy Differences") as demo:
     gr.on(
         # Press Enter in textbox or use button to submit
         triggers=[page_title.submit, submit_btn.click],
-        # Clear the new_revision and new_timestamp values before proceeding.
+        # Clear the revisions and timestamps before proceeding.
         # The empty values will propagate to the other components (through function return values) if there is an error.
-        fn=lambda: (gr.update(value=""), gr.update(value="")),
+        fn=lambda: (
+            gr.update(value=""),
+            gr.update(value=""),
+            gr.update(value=""),
+            gr.update(value=""),
+        ),
         inputs=None,
-        outputs=[new_revision, new_timestamp],
+        outputs=[new_revision, new_timestamp, old_revision, old_timestamp],
         api_name=False,
     ).then(
         # Initialize Logfire context
@@ -244,24 +288,19 @@ with gr.Blocks(title="Noteworthy Differences") as demo:
         inputs=[page_title, number_behind, units_behind],
         outputs=context,
     ).then(
-        fn=fetch_current_revision,
-        inputs=[page_title, context],
-        outputs=[new_revision, new_timestamp],
-        api_name=False,
-    ).then(
-        fn=fetch_previous_revision,
-        inputs=[page_title, number_behind, units_behind, new_revision, context],
-        outputs=[old_revision, old_timestamp],
-        api_name=False,
-    ).then(
-        fn=run_heuristic_classifier,
-        inputs=[old_revision, new_revision, context],
-        outputs=[heuristic_noteworthy, heuristic_rationale],
+        fn=fetch_revisions,
+        inputs=[page_title, number_behind, units_behind, context],
+        outputs=[new_revision, new_timestamp, old_revision, old_timestamp],
         api_name=False,
     ).then(
-        fn=run_fewshot_classifier,
+        fn=run_classifiers,
         inputs=[old_revision, new_revision, context],
-        outputs=[fewshot_noteworthy, fewshot_rationale],
+        outputs=[
+            heuristic_noteworthy,
+            heuristic_rationale,
+            fewshot_noteworthy,
+            fewshot_rationale,
+        ],
         api_name=False,
     ).then(
         fn=run_judge,
@@ -281,17 +320,17 @@ with gr.Blocks(title="Noteworthy Differences") as demo:
     # Rerun model when rerun button is clicked
     gr.on(
         triggers=[rerun_btn.click],
-        fn=run_heuristic_classifier,
-        inputs=[old_revision, new_revision, context],
-        outputs=[heuristic_noteworthy, heuristic_rationale],
-        api_name=False,
-    ).then(
-        fn=run_fewshot_classifier,
+        fn=rerun_classifiers,
         inputs=[old_revision, new_revision, context],
-        outputs=[fewshot_noteworthy, fewshot_rationale],
+        outputs=[
+            heuristic_noteworthy,
+            heuristic_rationale,
+            fewshot_noteworthy,
+            fewshot_rationale,
+        ],
         api_name=False,
     ).then(
-        fn=run_judge,
+        fn=rerun_judge,
         inputs=[
             old_revision,
             new_revision,
@@ -366,6 +405,7 @@ with gr.Blocks(title="Noteworthy Differences") as demo:
             judge_reasoning,
             noteworthy_text,
             confidence_score,
+            special_random_log,
         ],
         api_name=False,
     )
@@ -1,130 +1,144 @@
-from wiki_data_fetcher import (
-    get_previous_revisions,
-    get_revision_from_age,
+from async_wiki_data_fetcher import (
     get_wikipedia_introduction,
-    extract_revision_info,
-    get_revisions_behind,
-    get_random_wikipedia_title,
+    get_lead_wikitexts,
+    get_random_wikipedia_titles,
 )
-from models import classifier, judge
+from revision_index import get_revision_index
+from wiki_data_fetcher import wikitext_to_text, removed_templates
+from models import classifier, judge, equivalent_revisions, changed_words
 import gradio as gr
 import logfire
+import asyncio
 
 
-@logfire.instrument("Fetch current revision")
-def _fetch_current_revision(title: str):
+async def _stream_revisions(title: str, number: int, units: str):
     """
-    Fetch current revision of a Wikipedia article and return its introduction.
+    Fetch the current and a previous revision of a Wikipedia article and yield their
+    introductions as they arrive. The metadata for both revisions comes from the revision
+    index (one API call for up to 500 revisions behind), then both introductions are
+    downloaded concurrently.
 
     Args:
         title: Wikipedia article title
+        number: Number of revisions or days behind
+        units: "revisions" or "days"
 
-    Returns:
-        Tuple of (introduction, timestamp)
+    Yields:
+        Tuples of (new_introduction, new_timestamp, old_introduction, old_timestamp), first with
+        the timestamps, then with each introduction when it is downloaded (gr.skip() for values
+        not known yet). The last tuple has all values.
     """
     if not title or not title.strip():
         error_msg = "Please enter a Wikipedia page title."
         raise gr.Error(error_msg, print_exception=False)
-        return None, None
+
+    def get_revision_info():
+        # Get current revision (revision 0) and previous revision based on units
+        index = get_revision_index(title)
+        new_info = index.revision(0)
+        if not new_info.get("revid"):
+            return new_info, None
+        if units == "revisions":
+            old_info = index.revision(number)
+        else:  # units == "days"
+            old_info = index.revision_from_age(number)
+        return new_info, old_info
 
     try:
-        # Get current revision (revision 0)
-        json_data = get_previous_revisions(title, revisions=0)
-        revision_info = extract_revision_info(json_data, revnum=0)
+        # The revision index is synchronous, so run it in a thread to keep the event loop free
+        new_info, old_info = await asyncio.to_thread(get_revision_info)
 
-        if not revision_info.get("revid"):
+        if not new_info.get("revid"):
             error_msg = f"Error: Could not find Wikipedia page '{title}'. Please check the title."
             raise gr.Error(error_msg, print_exception=False)
-            return None, None
-
-        revid = revision_info["revid"]
-        timestamp = revision_info["timestamp"]
 
-        # Get introduction
-        introduction = get_wikipedia_introduction(revid)
+        if not old_info.get("revid"):
+            error_msg = f"Error: Could not find revision {number} {'revisions' if units == 'revisions' else 'days'} behind for '{title}'."
+            raise gr.Error(error_msg, print_exception=False)
 
-        if introduction is None:
-            introduction = f"Error: Could not retrieve introduction for current revision (revid: {revid})"
+        new_revid = new_info["revid"]
+        old_revid = old_info["revid"]
 
-        # Format timestamp for display
-        timestamp = f"**Timestamp:** {timestamp}" if timestamp else ""
+        # Get revisions_behind
+        revisions_behind = old_info["revnum"]
+        if units == "revisions" and revisions_behind < number:
+            # The page has fewer revisions, or the number is beyond the revision index
+            gr.Warning(
+                f"Only {revisions_behind} revisions behind are available for '{title}'; "
+                "showing the earliest available revision."
+            )
+
+        # Format timestamps for display
+        new_timestamp = new_info["timestamp"]
+        new_timestamp = f"**Timestamp:** {new_timestamp}" if new_timestamp else ""
+        old_timestamp = old_info["timestamp"]
+        old_timestamp = (
+            f"**Timestamp:** {old_timestamp}, {revisions_behind} revisions behind"
+            if old_timestamp
+            else ""
+        )
 
-        # Return introduction text and timestamp
-        return introduction, timestamp
+        # Show the timestamps while the introductions are downloaded
+        introductions = {"new": gr.skip(), "old": gr.skip()}
+
+        def outputs():
+            return (
+                introductions["new"],
+                new_timestamp,
+                introductions["old"],
+                old_timestamp,
+            )
+
+        yield outputs()
+
+        # Get introductions concurrently and show each one when it arrives
+        tasks = {
+            asyncio.create_task(get_wikipedia_introduction(new_revid)): "new",
+            asyncio.create_task(get_wikipedia_introduction(old_revid)): "old",
+        }
+        errors = {
+            "new": f"Error: Could not retrieve introduction for current revision (revid: {new_revid})",
+            "old": f"Error: Could not retrieve introduction for previous revision (revid: {old_revid})",
+        }
+        pending = set(tasks)
+        try:
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    which = tasks[task]
+                    introductions[which] = task.result()
+                    if introductions[which] is None:
+                        introductions[which] = errors[which]
+                yield outputs()
+        finally:
+            # Stop the downloads if there is an error or the caller stops early
+            for task in pending:
+                task.cancel()
 
     except Exception as e:
         error_msg = f"Error occurred: {str(e)}"
         raise gr.Error(error_msg, print_exception=False)
-        return None, None
 
 
-@logfire.instrument("Fetch previous revision")
-def _fetch_previous_revision(title: str, number: int, units: str, new_revision: str):
+@logfire.instrument("Fetch revisions")
+async def _fetch_revisions(title: str, number: int, units: str):
     """
-    Fetch previous revision of a Wikipedia article and return its introduction.
-
-    Args:
-        title: Wikipedia article title
-        number: Number of revisions or days behind
-        units: "revisions" or "days"
+    Fetch the current and a previous revision of a Wikipedia article and return their introductions.
+    See _stream_revisions() for the arguments.
 
     Returns:
-        Tuple of (introduction, timestamp)
+        Tuple of (new_introduction, new_timestamp, old_introduction, old_timestamp)
     """
+    async for outputs in _stream_revisions(title, number, units):
+        pass
+    return outputs
 
-    # If we get here with an empty new revision, then an error should have been raised
-    # in fetch_current_revision, so just return empty values without raising another error
-    if not new_revision:
-        return None, None
-
-    try:
-        # Get previous revision based on units
-        if units == "revisions":
-            json_data = get_previous_revisions(title, revisions=number)
-            revision_info = extract_revision_info(json_data, revnum=number)
-        else:  # units == "days"
-            revision_info = get_revision_from_age(title, age_days=number)
-
-        if not revision_info.get("revid"):
-            error_msg = f"Error: Could not find revision {number} {'revisions' if units == 'revisions' else 'days'} behind for '{title}'."
-            raise gr.Error(error_msg, print_exception=False)
-            return None, None
-
-        revid = revision_info["revid"]
-        timestamp = revision_info["timestamp"]
-
-        # Get introduction
-        introduction = get_wikipedia_introduction(revid)
 
-        if introduction is None:
-            introduction = f"Error: Could not retrieve introduction for previous revision (revid: {revid})"
-
-        # Get revisions_behind
-        if units == "revisions":
-            revisions_behind = revision_info["revnum"]
-        else:
-            revisions_behind = get_revisions_behind(title, revid)
-            # For a negative number, replace the negative sign with ">"
-            if revisions_behind < 0:
-                revisions_behind = str(revisions_behind).replace("-", ">")
-
-        # Format timestamp for display
-        timestamp = (
-            f"**Timestamp:** {timestamp}, {revisions_behind} revisions behind"
-            if timestamp
-            else ""
-        )
-
-        # Return introduction text and timestamp
-        return introduction, timestamp
-
-    except Exception as e:
-        error_msg = f"Error occurred: {str(e)}"
-        raise gr.Error(error_msg, print_exception=False)
-        return None, None
-
-
-def run_classifier(old_revision: str, new_revision: str, prompt_style: str):
+def run_classifier(
+    old_revision: str, new_revision: str, prompt_style: str, use_cache: bool = True
+):
     """
     Run a classification model on the revisions.
 
@@ -132,6 +146,7 @@ def run_classifier(old_revision: str, new_revision: str, prompt_style: str):
         old_revision: Old revision text
         new_revision: New revision text
         prompt_style: heuristic or few-shot
+        use_cache: Use a cached result (False to resample the model)
 
     Returns:
         Tuple of (noteworthy, rationale) (bool, str)
@@ -144,7 +159,9 @@ def run_classifier(old_revision: str, new_revision: str, prompt_style: str):
 
     try:
         # Run classifier model
-        result = classifier(old_revision, new_revision, prompt_style=prompt_style)
+        result = classifier(
+            old_revision, new_revision, prompt_style=prompt_style, use_cache=use_cache
+        )
         if result:
             noteworthy = result.get("noteworthy", None)
             rationale = result.get("rationale", "")
@@ -160,13 +177,72 @@ def run_classifier(old_revision: str, new_revision: str, prompt_style: str):
 
 
 @logfire.instrument("Run heuristic classifier")
-def _run_heuristic_classifier(old_revision: str, new_revision: str):
-    return run_classifier(old_revision, new_revision, prompt_style="heuristic")
+def _run_heuristic_classifier(
+    old_revision: str, new_revision: str, use_cache: bool = True
+):
+    return run_classifier(old_revision, new_revision, "heuristic", use_cache)
 
 
 @logfire.instrument("Run few-shot classifier")
-def _run_fewshot_classifier(old_revision: str, new_revision: str):
-    return run_classifier(old_revision, new_revision, prompt_style="few-shot")
+def _run_fewshot_classifier(
+    old_revision: str, new_revision: str, use_cache: bool = True
+):
+    return run_classifier(old_revision, new_revision, "few-shot", use_cache)
+
+
+async def _stream_classifiers(
+    old_revision: str, new_revision: str, use_cache: bool = True
+):
+    """
+    Run the heuristic and few-shot classifiers concurrently and yield each result when it is ready.
+    Each classifier runs in a thread that keeps the current Logfire context.
+    Use use_cache=False to resample the models (e.g. for the Rerun Model button).
+
+    Yields:
+        Tuples of (heuristic_noteworthy, heuristic_rationale, fewshot_noteworthy, fewshot_rationale)
+        with gr.skip() for the classifier that isn't finished. The last tuple has all values.
+    """
+    results = {"heuristic": (gr.skip(), gr.skip()), "few-shot": (gr.skip(), gr.skip())}
+    tasks = {
+        asyncio.create_task(
+            asyncio.to_thread(
+                _run_heuristic_classifier, old_revision, new_revision, use_cache
+            )
+        ): "heuristic",
+        asyncio.create_task(
+            asyncio.to_thread(
+                _run_fewshot_classifier, old_revision, new_revision, use_cache
+            )
+        ): "few-shot",
+    }
+    pending = set(tasks)
+    try:
+        while pending:
+            done, pending = await asyncio.wait(
+                pending, return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in done:
+                results[tasks[task]] = task.result()
+            yield results["heuristic"] + results["few-shot"]
+    finally:
+        # Don't wait for a classifier if the other one failed or the caller stops early
+        for task in pending:
+            task.cancel()
+
+
+@logfire.instrument("Run classifiers")
+async def _run_classifiers(
+    old_revision: str, new_revision: str, use_cache: bool = True
+):
+    """
+    Run the heuristic and few-shot classifiers concurrently (see _stream_classifiers()).
+
+    Returns:
+        Tuple of (heuristic_noteworthy, heuristic_rationale, fewshot_noteworthy, fewshot_rationale)
+    """
+    async for outputs in _stream_classifiers(old_revision, new_revision, use_cache):
+        pass
+    return outputs
 
 
 def compute_confidence(
@@ -196,6 +272,7 @@ def _run_judge(
     fewshot_noteworthy: bool,
     heuristic_rationale: str,
     fewshot_rationale: str,
+    use_cache: bool = True,
 ):
     """
     Run judge on the revisions and classifiers' rationales.
@@ -207,6 +284,7 @@ def _run_judge(
         fewshot_noteworthy: Few-shot model's noteworthiness prediction
         heuristic_rationale: Heuristic model's rationale
         fewshot_rationale: Few-shot model's rationale
+        use_cache: Use a cached result (False to resample the model)
 
     Returns:
         Tuple of (noteworthy, noteworthy_text, reasoning, confidence) (bool, str, str, str)
@@ -230,6 +308,7 @@ def _run_judge(
             heuristic_rationale,
             fewshot_rationale,
             mode="aligned-heuristic",
+            use_cache=use_cache,
         )
         if result:
             noteworthy = result.get("noteworthy", "")
@@ -262,93 +341,282 @@ def _run_judge(
     return noteworthy, noteworthy_text, reasoning, confidence
 
 
-@logfire.instrument("🎲 Special Random")
-def find_interesting_example(number_behind: int, units_behind: str):
+# Number of outputs of find_interesting_example() before the progress log
+INTERESTING_EXAMPLE_OUTPUTS = 13
+
+
+# Number of random pages tried at the same time by Special Random
+SEARCH_CONCURRENCY = 4
+
+
+async def _try_page(
+    attempt: int, page_title: str, number_behind: int, units_behind: str, report
+):
     """
-    Find an interesting example by repeatedly getting random pages and running the model
-    until we find one with a confidence score that is not High, up to 20 tries.
+    Fetch the revisions of a page and run the model (see _search_interesting_example()).
+
+    Returns:
+        Tuple with the outputs of find_interesting_example(), or None if the confidence
+        score is High or there is an error
     """
-    max_tries = 20
+    report(attempt, page_title, "fetching revisions")
+
+    try:
+        # Initialize Logfire span
+        span_name = f"{page_title} - {number_behind} {units_behind}"
+        with logfire.span(span_name):
+
+            # Fetch current and previous revisions
+            new_revision, new_timestamp, old_revision, old_timestamp = (
+                await _fetch_revisions(page_title, number_behind, units_behind)
+            )
+            if not new_revision or not old_revision:
+                report(attempt, page_title, "no revisions")
+                return None
+
+            # Run heuristic and few-shot classifiers
+            report(attempt, page_title, "running classifiers")
+            (
+                heuristic_noteworthy,
+                heuristic_rationale,
+                fewshot_noteworthy,
+                fewshot_rationale,
+            ) = await _run_classifiers(old_revision, new_revision)
+            if heuristic_rationale is None or fewshot_rationale is None:
+                report(attempt, page_title, "no model output")
+                return None
+
+            # Run judge
+            report(attempt, page_title, "running judge")
+            (
+                judge_noteworthy,
+                noteworthy_text,
+                judge_reasoning,
+                confidence_score,
+            ) = await asyncio.to_thread(
+                _run_judge,
+                old_revision,
+                new_revision,
+                heuristic_noteworthy,
+                fewshot_noteworthy,
+                heuristic_rationale,
+                fewshot_rationale,
+            )
+
+    except Exception:
+        # If there's an error, continue with other pages
+        report(attempt, page_title, "error")
+        return None
+
+    report(attempt, page_title, f"{confidence_score} confidence")
+    # Check if confidence score is not High
+    if not confidence_score or confidence_score == "High":
+        return None
+    return (
+        page_title,
+        new_revision,
+        new_timestamp,
+        old_revision,
+        old_timestamp,
+        heuristic_noteworthy,
+        fewshot_noteworthy,
+        judge_noteworthy,
+        heuristic_rationale,
+        fewshot_rationale,
+        judge_reasoning,
+        noteworthy_text,
+        confidence_score,
+    )
 
-    for attempt in range(max_tries):
-        # Get random page title
-        page_title = get_random_wikipedia_title()
-        if not page_title:
-            continue
 
-        gr.Info(f"Page {attempt + 1}: {page_title}", duration=20)
+# Number of random titles requested at once for Special Random
+RANDOM_BATCH = 20
+# Minimum change in page size (bytes) between the revisions of a candidate page
+MIN_SIZE_CHANGE = 1
+# Minimum number of changed words between the introductions of a candidate page
+# (including words in templates that aren't converted to text)
+MIN_CHANGED_WORDS = 3
+# Maximum number of batches of random titles for one search
+MAX_PREFILTER_ROUNDS = 5
 
+
+async def _prefilter_candidates(
+    number_behind: int, units_behind: str, count: int = RANDOM_BATCH
+) -> list:
+    """
+    Get random pages that are likely to have a changed introduction, with cheap checks
+    before any model calls.
+
+    1. Get a batch of random titles with one API request.
+    2. Look up the revisions (without keeping the revision indexes of the random pages):
+       drop pages without enough revisions,
+       pages with no edits in the period, and pages whose size didn't change (e.g. after a revert).
+    3. Download the lead-section wikitext of the remaining pages with one API request and
+       convert it to text (see wikitext_to_text()): drop pages with fewer than
+       MIN_CHANGED_WORDS changed words. Words in templates that the conversion removes
+       (see removed_templates()) are counted too, so edits that only change those
+       templates aren't dropped (the text shown to the models is rendered by Wikipedia).
+
+    Args:
+        number_behind: Number of revisions or days behind
+        units_behind: "revisions" or "days"
+        count: Number of random titles
+
+    Returns:
+        List of page titles, most changed words first
+    """
+    titles = await get_random_wikipedia_titles(count)
+
+    def get_revision_info(title):
+        # Most random pages are dropped, so their indexes aren't kept
+        index = get_revision_index(title, store=False)
+        new_info = index.revision(0)
+        if not new_info.get("revid"):
+            return new_info, {}
+        if units_behind == "revisions":
+            # Skip pages with fewer revisions instead of using the first revision
+            old_info = index.revision(number_behind, limit_revnum=False)
+        else:  # units_behind == "days"
+            old_info = index.revision_from_age(number_behind)
+        return new_info, old_info
+
+    async def check_revisions(title):
         try:
-            # Initialize Logfire span
-            span_name = f"{page_title} - {number_behind} {units_behind}"
-            with logfire.span(span_name):
-
-                # Fetch current revision
-                new_revision, new_timestamp = _fetch_current_revision(page_title)
-                if not new_revision:
-                    continue
-
-                # Fetch previous revision
-                old_revision, old_timestamp = _fetch_previous_revision(
-                    page_title, number_behind, units_behind, new_revision
-                )
-                if not old_revision:
-                    continue
+            new_info, old_info = await asyncio.to_thread(get_revision_info, title)
+        except Exception:
+            return None
+        if not old_info.get("revid") or old_info["revid"] == new_info["revid"]:
+            return None
+        # The size isn't known for revisions older than the revision index
+        if new_info.get("size") is not None and old_info.get("size") is not None:
+            if abs(new_info["size"] - old_info["size"]) < MIN_SIZE_CHANGE:
+                return None
+        return title, new_info["revid"], old_info["revid"]
+
+    revisions = [
+        pair
+        for pair in await asyncio.gather(*[check_revisions(title) for title in titles])
+        if pair
+    ]
+
+    scores = {}
+    if revisions:
+        revids = [
+            revid
+            for _, new_revid, old_revid in revisions
+            for revid in (new_revid, old_revid)
+        ]
+        try:
+            wikitexts = await get_lead_wikitexts(revids)
+        except Exception:
+            wikitexts = []
+        for i, (title, _, _) in enumerate(revisions):
+            new_wikitext, old_wikitext = wikitexts[2 * i : 2 * i + 2] or (None, None)
+            if not new_wikitext or not old_wikitext:
+                continue
+            new_revision = wikitext_to_text(new_wikitext)
+            old_revision = wikitext_to_text(old_wikitext)
+            score = 0
+            if not equivalent_revisions(old_revision, new_revision):
+                score += changed_words(old_revision, new_revision)
+            score += changed_words(
+                " ".join(removed_templates(old_wikitext)),
+                " ".join(removed_templates(new_wikitext)),
+            )
+            if score >= MIN_CHANGED_WORDS:
+                scores[title] = score
+
+    logfire.info(
+        "Prefilter: {titles} titles, {revisions} with changed revisions, {candidates} candidates",
+        titles=len(titles),
+        revisions=len(revisions),
+        candidates=len(scores),
+    )
+    return sorted(scores, key=scores.get, reverse=True)
 
-                # Run heuristic classifier
-                heuristic_noteworthy, heuristic_rationale = _run_heuristic_classifier(
-                    old_revision, new_revision
-                )
-                if heuristic_rationale is None:
-                    continue
 
-                # Run few-shot classifier
-                fewshot_noteworthy, fewshot_rationale = _run_fewshot_classifier(
-                    old_revision, new_revision
-                )
-                if fewshot_rationale is None:
-                    continue
-
-                # Run judge
-                judge_noteworthy, noteworthy_text, judge_reasoning, confidence_score = (
-                    _run_judge(
-                        old_revision,
-                        new_revision,
-                        heuristic_noteworthy,
-                        fewshot_noteworthy,
-                        heuristic_rationale,
-                        fewshot_rationale,
-                    )
-                )
+async def _search_interesting_example(
+    number_behind: int,
+    units_behind: str,
+    report,
+    concurrency: int = SEARCH_CONCURRENCY,
+):
+    """
+    Find an interesting example by getting random pages and running the model until we
+    find one with a confidence score that is not High, up to 20 tries.
+
+    Random pages are prefiltered in batches (see _prefilter_candidates()), so the model
+    only runs on pages whose introduction changed, most changed pages first.
+
+    Several pages are tried at the same time. As soon as one of them is interesting, the
+    other pages are stopped: their remaining requests and model calls aren't made (calls
+    that are already running finish in their threads, but their results are discarded).
+
+    Args:
+        number_behind: Number of revisions or days behind
+        units_behind: "revisions" or "days"
+        report: Function called with (attempt, page_title, status) as each page is tried
+        concurrency: Number of pages tried at the same time
 
-            # Check if confidence score is not High
-            if confidence_score and confidence_score != "High":
+    Returns:
+        Tuple with the outputs of find_interesting_example() (empty values if no example was found)
+    """
+    max_tries = 20
+    # Attempt numbers shared by the workers
+    attempts = iter(range(max_tries))
+    # Attempt -> page title for pages being tried
+    running = {}
+    # Prefiltered pages not tried yet
+    candidates = []
+    rounds = 0
+    # Only one worker gets a new batch of candidates at a time
+    candidates_lock = asyncio.Lock()
+
+    async def next_candidate():
+        nonlocal rounds
+        async with candidates_lock:
+            while not candidates and rounds < MAX_PREFILTER_ROUNDS:
+                rounds += 1
+                candidates.extend(
+                    await _prefilter_candidates(number_behind, units_behind)
+                )
+            return candidates.pop(0) if candidates else None
+
+    async def worker():
+        for attempt in attempts:
+            # Get the next prefiltered page
+            page_title = await next_candidate()
+            if not page_title:
+                break
+            running[attempt] = page_title
+            outputs = await _try_page(
+                attempt, page_title, number_behind, units_behind, report
+            )
+            del running[attempt]
+            if outputs:
                 # Found an interesting example
                 gr.Success(
                     f"Interesting example (page {attempt + 1}) - ready for your feedback",
                     duration=None,
                 )
-                return (
-                    page_title,
-                    new_revision,
-                    new_timestamp,
-                    old_revision,
-                    old_timestamp,
-                    heuristic_noteworthy,
-                    fewshot_noteworthy,
-                    judge_noteworthy,
-                    heuristic_rationale,
-                    fewshot_rationale,
-                    judge_reasoning,
-                    noteworthy_text,
-                    confidence_score,
-                )
+                return outputs
+        return None
 
-        except Exception:
-            # If there's an error, continue to next attempt
-            continue
-
-    # If we get here, all 20 tries had High confidence
+    with logfire.span("🎲 Special Random", concurrency=concurrency):
+        workers = [asyncio.create_task(worker()) for _ in range(concurrency)]
+        try:
+            for next_done in asyncio.as_completed(workers):
+                outputs = await next_done
+                if outputs:
+                    return outputs
+        finally:
+            # Stop the other pages
+            for task in workers:
+                task.cancel()
+            for attempt, page_title in running.items():
+                report(attempt, page_title, "stopped")
+
+    # If we get here, all tries had High confidence or there were no candidates
     gr.Warning("No interesting examples found - try again", duration=None)
     # Return empty values
     return (
@@ -366,3 +634,47 @@ def find_interesting_example(number_behind: int, units_behind: str):
         "",
         "",
     )
+
+
+async def find_interesting_example(number_behind: int, units_behind: str):
+    """
+    Find an interesting example (see _search_interesting_example()) and show the pages tried.
+
+    Yields:
+        Tuples with the page title, revisions, timestamps, model outputs, and a progress log
+        (Markdown list of pages tried). Only the progress log is updated until the search is done.
+    """
+    progress = asyncio.Queue()
+    # Page status for each attempt
+    pages = {}
+
+    def report(attempt, page_title, status):
+        progress.put_nowait((attempt, page_title, status))
+
+    def progress_log():
+        return "\n".join(
+            f"{attempt + 1}. {page_title}: {status}"
+            for attempt, (page_title, status) in sorted(pages.items())
+        )
+
+    # Run the search in a task so its Logfire span isn't split by the yields
+    search = asyncio.create_task(
+        _search_interesting_example(number_behind, units_behind, report)
+    )
+    try:
+        while not search.done():
+            update = asyncio.create_task(progress.get())
+            await asyncio.wait({update, search}, return_when=asyncio.FIRST_COMPLETED)
+            if not update.done():
+                update.cancel()
+                break
+            attempt, page_title, status = update.result()
+            pages[attempt] = (page_title, status)
+            yield (gr.skip(),) * INTERESTING_EXAMPLE_OUTPUTS + (progress_log(),)
+        # Show the status updates that came with the result
+        while not progress.empty():
+            attempt, page_title, status = progress.get_nowait()
+            pages[attempt] = (page_title, status)
+        yield search.result() + (progress_log(),)
+    finally:
+        search.cancel()
@@ -0,0 +1,379 @@
+"""
+Asyncio variant of wiki_data_fetcher.
+
+The functions have the same names, arguments, and return values as in wiki_data_fetcher,
+but are coroutines that share one httpx.AsyncClient per event loop. The number of
+concurrent requests is limited by a semaphore.
+
+Example:
+    import asyncio
+    import async_wiki_data_fetcher as wiki
+
+    async def main():
+        json_data = await wiki.get_previous_revisions("Albert Einstein", revisions=100)
+        new_info = wiki.extract_revision_info(json_data, 0)
+        old_info = wiki.extract_revision_info(json_data, 100)
+        # Get both introductions concurrently
+        return await asyncio.gather(
+            wiki.get_wikipedia_introduction(new_info["revid"]),
+            wiki.get_wikipedia_introduction(old_info["revid"]),
+        )
+
+    new_revision, old_revision = asyncio.run(main())
+"""
+
+from wiki_data_fetcher import (
+    BASE_URL,
+    CHUNK_SIZE,
+    HEADERS,
+    MAX_REVIDS,
+    POOL_SIZE,
+    RANDOM_TITLE_PARAMS,
+    REVISION_ERROR_CODES,
+    TIMEOUT,
+    IntroductionStream,
+    extract_revision_info,
+    introduction_cache,
+    introductions_params,
+    parse_params,
+    previous_revisions_params,
+    random_titles_params,
+    revision_from_age_params,
+    _add_introductions,
+    _add_wikitexts,
+    _cached_introductions,
+    _edit_count_url,
+    _first_revision,
+    _middle_timestamp,
+    _record_timing,
+    _revision_params,
+)
+from rate_limiter import acquire_async
+from typing import Dict, Optional
+import weakref
+import asyncio
+import httpx
+import time
+
+# Default maximum number of concurrent requests
+MAX_CONCURRENCY = 10
+
+# Settings for the async clients
+_client_settings = {
+    "max_concurrency": MAX_CONCURRENCY,
+    "pool_size": POOL_SIZE,
+    "timeout": TIMEOUT,
+    "gzip": True,
+}
+
+# Client and semaphore for each event loop (an httpx client can't be shared between loops)
+_clients = weakref.WeakKeyDictionary()
+
+
+def configure_client(
+    max_concurrency: int = MAX_CONCURRENCY,
+    pool_size: int = POOL_SIZE,
+    timeout=TIMEOUT,
+    gzip: bool = True,
+):
+    """
+    Configure the async clients used for Wikipedia API calls.
+    The settings apply to clients created after this call (see aclose_client()).
+
+    Args:
+        max_concurrency: Maximum number of concurrent requests in an event loop
+        pool_size: Maximum number of keep-alive connections kept in the pool
+        timeout: Timeout in seconds, either a number or a (connect, read) tuple
+        gzip: Request gzip-compressed responses
+    """
+    _client_settings.update(
+        max_concurrency=max_concurrency, pool_size=pool_size, timeout=timeout, gzip=gzip
+    )
+
+
+def get_client() -> tuple:
+    """
+    Get the shared client and concurrency semaphore for the running event loop, creating them if needed.
+    """
+    loop = asyncio.get_running_loop()
+    if loop not in _clients:
+        timeout = _client_settings["timeout"]
+        if isinstance(timeout, tuple):
+            timeout = httpx.Timeout(timeout[1], connect=timeout[0])
+        headers = dict(HEADERS)
+        headers["Accept-Encoding"] = "gzip" if _client_settings["gzip"] else "identity"
+        client = httpx.AsyncClient(
+            headers=headers,
+            timeout=timeout,
+            limits=httpx.Limits(
+                max_connections=_client_settings["pool_size"],
+                max_keepalive_connections=_client_settings["pool_size"],
+            ),
+        )
+        semaphore = asyncio.Semaphore(_client_settings["max_concurrency"])
+        _clients[loop] = (client, semaphore)
+    return _clients[loop]
+
+
+async def aclose_client():
+    """
+    Close the client for the running event loop.
+    """
+    loop = asyncio.get_running_loop()
+    if loop in _clients:
+        client, _ = _clients.pop(loop)
+        await client.aclose()
+
+
+async def run_get_request(params: dict, url: str = BASE_URL):
+    """
+    Utility function to run GET request against Wikipedia API
+
+    Args:
+        params: Query parameters
+        url: URL of the Action API (default) or a REST API endpoint
+    """
+    client, semaphore = get_client()
+    async with semaphore:
+        # Wait for the shared Wikipedia rate limiter
+        await acquire_async("wikipedia")
+        start = time.perf_counter()
+        response = await client.get(url, params=params)
+        # Handle HTTP errors
+        response.raise_for_status()
+
+        try:
+            json_data = response.json()
+        except Exception:
+            raise ValueError(f"Unable to parse response: {response}")
+
+        # Record timing for this request (httpx doesn't report new connections)
+        _record_timing(
+            params.get("action", "rest"),
+            None,
+            response.elapsed.total_seconds(),
+            start,
+            len(response.content),
+        )
+
+    return json_data
+
+
+async def run_streaming_parse_request(params: dict) -> tuple:
+    """
+    Run a parse API request and extract the introduction while the response is downloaded.
+
+    Returns:
+        Tuple of (introduction, json_data) as for wiki_data_fetcher.stream_introduction()
+    """
+    client, semaphore = get_client()
+    async with semaphore:
+        # Wait for the shared Wikipedia rate limiter
+        await acquire_async("wikipedia")
+        start = time.perf_counter()
+        stream = IntroductionStream()
+        async with client.stream("GET", BASE_URL, params=params) as response:
+            # Handle HTTP errors
+            response.raise_for_status()
+            async for chunk in response.aiter_bytes(CHUNK_SIZE):
+                if stream.feed(chunk):
+                    break
+            elapsed = time.perf_counter() - start
+        introduction, json_data, nbytes = stream.result()
+
+        # Record timing for this request
+        _record_timing(params["action"], None, elapsed, start, nbytes)
+
+    return introduction, json_data
+
+
+async def get_revision_from_age(title: str, age_days: int = 0) -> Dict[str, str]:
+    """
+    Get the revision info of a Wikipedia article closest to the age in days.
+    See wiki_data_fetcher.get_revision_from_age().
+    """
+    json_data = await run_get_request(revision_from_age_params(title, age_days))
+    return extract_revision_info(json_data)
+
+
+async def get_previous_revisions(title: str, revisions: int = 0) -> Dict[str, str]:
+    """
+    Get the revision info of a Wikipedia article a certain number of revisions before the current one.
+    See wiki_data_fetcher.get_previous_revisions().
+    """
+    return await run_get_request(previous_revisions_params(title, revisions))
+
+
+async def get_wikipedia_introduction(
+    revid: int, use_cache: bool = True, mode: str = "lead"
+) -> Optional[str]:
+    """
+    Retrieve the introduction of a Wikipedia article.
+    See wiki_data_fetcher.get_wikipedia_introduction().
+    """
+    # Return None for missing revid
+    if not revid:
+        return None
+
+    if use_cache:
+        introduction = introduction_cache.get(str(revid))
+        if introduction is not None:
+            return introduction
+
+    introduction, json_data = await run_streaming_parse_request(
+        parse_params(revid, mode)
+    )
+
+    # Fall back to the full article if the lead section isn't available,
+    # unless the revision itself is missing or deleted
+    if introduction is None and mode == "lead":
+        error_code = json_data.get("error", {}).get("code")
+        if error_code not in REVISION_ERROR_CODES:
+            introduction, json_data = await run_streaming_parse_request(
+                parse_params(revid, "full")
+            )
+
+    if introduction is None:
+        return None
+
+    if use_cache:
+        introduction_cache.set(str(revid), introduction)
+
+    return introduction
+
+
+async def get_lead_wikitexts(revids: list) -> list:
+    """
+    Retrieve the wikitext of the lead section of many revisions with one API request for
+    up to 50 revisions. The batches are downloaded concurrently.
+    See wiki_data_fetcher.get_lead_wikitexts().
+    """
+    wikitexts = {}
+    to_fetch = list(dict.fromkeys(int(revid) for revid in revids if revid))
+
+    async def fetch_batch(batch):
+        params = introductions_params(batch)
+        while True:
+            json_data = await run_get_request(params)
+            _add_wikitexts(json_data, wikitexts)
+            # Large responses are split into parts
+            if "continue" not in json_data:
+                break
+            params.update(json_data["continue"])
+
+    await asyncio.gather(
+        *[
+            fetch_batch(to_fetch[i : i + MAX_REVIDS])
+            for i in range(0, len(to_fetch), MAX_REVIDS)
+        ]
+    )
+
+    return [wikitexts.get(int(revid)) if revid else None for revid in revids]
+
+
+async def get_wikipedia_introductions(revids: list, use_cache: bool = True) -> list:
+    """
+    Retrieve the introductions of many revisions with one API request for up to 50 revisions.
+    The batches are downloaded concurrently. See wiki_data_fetcher.get_wikipedia_introductions().
+    """
+    introductions, to_fetch = _cached_introductions(revids, use_cache)
+    wikitexts = await get_lead_wikitexts(to_fetch)
+    _add_introductions(wikitexts, to_fetch, introductions, use_cache)
+
+    return [introductions.get(int(revid)) if revid else None for revid in revids]
+
+
+async def _get_revision(
+    title: str, revid: int = None, timestamp: str = None, rvdir="older"
+):
+    """
+    Get the id and timestamp of a revision. See wiki_data_fetcher._get_revision().
+    """
+    json_data = await run_get_request(_revision_params(title, revid, timestamp, rvdir))
+    return _first_revision(json_data)
+
+
+async def _count_revisions_between(title: str, old: dict, new: dict) -> int:
+    """
+    Count the revisions of a page between two revisions (excluding both).
+    See wiki_data_fetcher._count_revisions_between(); here the two halves of a split interval
+    are counted concurrently.
+    """
+    json_data = await run_get_request(
+        {"from": old["revid"], "to": new["revid"]}, url=_edit_count_url(title)
+    )
+    if not json_data.get("limit"):
+        return json_data["count"]
+
+    # Split the interval at the midpoint of the timestamps
+    middle = _middle_timestamp(old, new)
+    revision = await _get_revision(title, timestamp=middle, rvdir="older")
+    if revision is None or revision["revid"] == old["revid"]:
+        revision = await _get_revision(title, timestamp=middle, rvdir="newer")
+    if revision is None or revision["revid"] in [old["revid"], new["revid"]]:
+        raise ValueError(f"Unable to split revision history of '{title}'")
+
+    older, newer = await asyncio.gather(
+        _count_revisions_between(title, old, revision),
+        _count_revisions_between(title, revision, new),
+    )
+    return older + 1 + newer
+
+
+async def get_revisions_behind(title: str, revid: int) -> int:
+    """
+    Get the number of revisions a given revid is behind the current revision of the page.
+    See wiki_data_fetcher.get_revisions_behind().
+    """
+    try:
+        # Get the current and target revisions concurrently
+        current, target = await asyncio.gather(
+            _get_revision(title), _get_revision(title, revid=revid)
+        )
+        if current is None:
+            raise ValueError(f"Page not found for revid {revid}")
+
+        if current["revid"] == int(revid):
+            return 0
+
+        if target is None:
+            raise ValueError(
+                f"Revid {revid} not found in the revision history of the page. "
+                f"It may be from a different page or may have been deleted."
+            )
+
+        # The target revision and the revisions between it and the current one
+        return await _count_revisions_between(title, target, current) + 1
+
+    except ValueError:
+        # Re-raise ValueError exceptions
+        raise
+    except Exception as e:
+        raise ValueError(f"Error searching for revid {revid}: {e}")
+
+
+async def get_random_wikipedia_title():
+    try:
+        json_data = await run_get_request(RANDOM_TITLE_PARAMS)
+
+        # Extract the title
+        title = json_data["query"]["random"][0]["title"]
+        return title
+
+    except httpx.HTTPError as e:
+        print(f"Error fetching random Wikipedia title: {e}")
+        return None
+
+
+async def get_random_wikipedia_titles(count: int = 20) -> list:
+    """
+    Get many random article titles with one API request.
+    See wiki_data_fetcher.get_random_wikipedia_titles().
+    """
+    try:
+        json_data = await run_get_request(random_titles_params(count))
+        return [page["title"] for page in json_data["query"]["random"]]
+
+    except httpx.HTTPError as e:
+        print(f"Error fetching random Wikipedia titles: {e}")
+        return []
@@ -0,0 +1,193 @@
+"""
+Offline batch prediction for large evaluation and development runs.
+
+All prompts for a job are written to a JSONL request file and submitted as one batch job
+through the model backend (the Gemini Batch API, or a local stand-in with FakeBackend).
+The job is polled until it finishes, and the results are merged back by row key.
+Batch jobs cost less than one request per prompt but may take minutes to hours.
+
+Results are stored in the model result cache, so cached prompts and revisions that are
+equivalent (see models.equivalent_revisions()) aren't sent again. The job name and a hash
+of each prompt are saved next to the request file, so running the same job again (e.g.
+after an interruption) resumes polling instead of submitting a new job. Requests that
+were added or changed since then are sent in a follow-up job named {name}_extra.
+
+Example:
+    from batch_jobs import judge_batch
+
+    rows = {
+        "Turin": (old_revision, new_revision, heuristic_rationale, fewshot_rationale),
+    }
+    results = judge_batch(rows, "evalset_1", mode="aligned-heuristic", round=1)
+    results["Turin"]  # {'noteworthy': True, 'reasoning': '...'}
+"""
+
+from model_backends import BATCH_DONE_STATES, batch_request, batch_result
+from disk_cache import CACHE_DIR
+import models
+import json
+import time
+import os
+
+# Directory for batch request and result files
+BATCH_DIR = os.path.join(CACHE_DIR, "batches")
+# Seconds between checks of the job state
+BATCH_POLL_SECONDS = 30
+
+
+def run_batch(requests, name, kind, poll_seconds=BATCH_POLL_SECONDS, resume=True):
+    """
+    Run a batch job and get the results by key.
+
+    Args:
+        requests: Dictionary of key -> prompt
+        name: Name of the job (used for the file names)
+        kind: Kind of response: classifier or judge
+        poll_seconds: Seconds between checks of the job state
+        resume: Continue a job with the same name that was already submitted (requests
+          that are not in that job or whose prompt changed are submitted in a job named
+          {name}_extra when it is done)
+
+    Returns:
+        Dictionary of key -> result for successful requests (failed requests are left out)
+    """
+    backend = models.get_backend()
+    os.makedirs(BATCH_DIR, exist_ok=True)
+    request_file = os.path.join(BATCH_DIR, f"{name}_requests.jsonl")
+    result_file = os.path.join(BATCH_DIR, f"{name}_results.jsonl")
+    job_file = os.path.join(BATCH_DIR, f"{name}_job.json")
+
+    # Hash of each prompt (with the model and response schema) to match resumed results
+    hashes = {key: models._cache_key(prompt, kind) for key, prompt in requests.items()}
+    job = None
+    # Requests that were not in a resumed job or whose prompt changed
+    missing = {}
+    if resume and os.path.exists(job_file):
+        with open(job_file) as file:
+            saved = json.load(file)
+        # Only resume a job for the same backend
+        if saved["model"] == backend.model:
+            job = saved["job"]
+            print(f"Resuming batch job {job}")
+            submitted = saved.get("hashes", {})
+            missing = {
+                key: prompt
+                for key, prompt in requests.items()
+                if submitted.get(key) != hashes[key]
+            }
+            if missing:
+                print(
+                    f"Warning: {len(missing)} requests are not in batch job {job} or "
+                    f"have changed; they will be submitted in job {name}_extra"
+                )
+    if job is None:
+        with open(request_file, "w", encoding="utf-8") as file:
+            for key, prompt in requests.items():
+                schema = models.response_schemas[kind]
+                file.write(batch_request(key, prompt, schema) + "\n")
+        job = backend.submit_batch(request_file, display_name=name)
+        with open(job_file, "w") as file:
+            json.dump({"job": job, "model": backend.model, "hashes": hashes}, file)
+        print(f"Submitted batch job {job} with {len(requests)} requests")
+
+    while True:
+        state = backend.batch_state(job)
+        if state in BATCH_DONE_STATES:
+            break
+        print(f"Batch job {job}: {state}")
+        time.sleep(poll_seconds)
+    if state != "JOB_STATE_SUCCEEDED":
+        os.remove(job_file)
+        raise RuntimeError(f"Batch job {job} finished with {state}")
+
+    backend.download_batch(job, result_file)
+    # Remove the job file so the next run with this name submits a new job
+    os.remove(job_file)
+    results = {}
+    errors = 0
+    with open(result_file, encoding="utf-8") as file:
+        for line in file:
+            if not line.strip():
+                continue
+            key, text, error = batch_result(line)
+            # Leave out results for prompts that are no longer requested
+            if key not in requests or key in missing:
+                continue
+            if text is None:
+                errors += 1
+                continue
+            try:
+                results[key] = json.loads(text)
+            except json.JSONDecodeError:
+                errors += 1
+    if errors:
+        print(f"Batch job {job}: {errors} failed requests")
+    if missing:
+        # Submit the requests that were added or changed after the resumed job was
+        # submitted (a separate name keeps the files of the resumed job)
+        results.update(run_batch(missing, f"{name}_extra", kind, poll_seconds))
+    return results
+
+
+def judge_batch(
+    rows,
+    name,
+    mode="aligned-heuristic",
+    round=None,
+    use_cache=True,
+    prompt_mode="full",
+    poll_seconds=BATCH_POLL_SECONDS,
+):
+    """
+    Run the judge on many examples with a batch job.
+
+    Args:
+        rows: Dictionary of key -> (old_revision, new_revision, rationale_1, rationale_2)
+        name: Name of the job (used for the file names)
+        mode: Prompt mode: unaligned, aligned-fewshot, or aligned-heuristic
+        round: Round to use for heuristic alignment (None for latest)
+        use_cache: Use and store cached results for identical requests
+        prompt_mode: Revisions in prompt: full or diff
+        poll_seconds: Seconds between checks of the job state
+
+    Returns:
+        Dictionary of key -> result of judge() (failed requests are left out)
+    """
+    results = {}
+    requests = {}
+    cache_keys = {}
+    use_cache = use_cache and models.USE_LLM_CACHE
+    for key, (old_revision, new_revision, rationale_1, rationale_2) in rows.items():
+        key = str(key)
+        # Skip the model for equivalent revisions
+        if models.equivalent_revisions(old_revision, new_revision):
+            results[key] = {
+                "noteworthy": False,
+                "reasoning": models.SHORTCUT_RATIONALE,
+                "shortcut": True,
+            }
+            continue
+        prompt = models.make_judge_prompt(
+            old_revision,
+            new_revision,
+            rationale_1,
+            rationale_2,
+            mode,
+            round,
+            prompt_mode,
+        )
+        cache_keys[key] = models._cache_key(prompt, "judge")
+        if use_cache:
+            result = models.llm_cache.get(cache_keys[key])
+            if result is not None:
+                results[key] = result
+                continue
+        requests[key] = prompt
+
+    if requests:
+        batch_results = run_batch(requests, name, "judge", poll_seconds)
+        for key, result in batch_results.items():
+            if use_cache:
+                models.llm_cache.set(cache_keys[key], result)
+            results[key] = result
+    return results
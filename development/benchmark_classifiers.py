@@ -0,0 +1,82 @@
+import sys
+import time
+import asyncio
+from app_functions import (
+    _fetch_revisions,
+    _run_heuristic_classifier,
+    _run_fewshot_classifier,
+    _run_classifiers,
+    _run_judge,
+)
+
+# Pages and number of revisions behind for the benchmark
+EXAMPLES = [
+    ("Albert Einstein", 100),
+    ("Henry Purcell", 50),
+    ("Turin", 200),
+]
+
+
+def sequential(old_revision, new_revision):
+    """
+    Previous implementation: run the classifiers one after the other.
+    """
+    heuristic_result = _run_heuristic_classifier(old_revision, new_revision, False)
+    fewshot_result = _run_fewshot_classifier(old_revision, new_revision, False)
+    return heuristic_result + fewshot_result
+
+
+def concurrent(old_revision, new_revision):
+    """
+    Current implementation: run the classifiers at the same time.
+    """
+    return asyncio.run(_run_classifiers(old_revision, new_revision, use_cache=False))
+
+
+def benchmark(examples=EXAMPLES):
+    """
+    Compare end-to-end latency (classifiers and judge) for sequential and concurrent classifiers.
+    The revisions are fetched first so only the model calls are timed, and the result
+    cache isn't used so both runs call the model.
+    """
+    totals = {"sequential": 0.0, "concurrent": 0.0}
+    print(f"{'Title':30} {'Sequential s':>13} {'Concurrent s':>13}")
+    for title, number in examples:
+        new_revision, _, old_revision, _ = asyncio.run(
+            _fetch_revisions(title, number, "revisions")
+        )
+        seconds = {}
+        for name, function in [("sequential", sequential), ("concurrent", concurrent)]:
+            start = time.perf_counter()
+            results = function(old_revision, new_revision)
+            _run_judge(
+                old_revision,
+                new_revision,
+                results[0],
+                results[2],
+                results[1],
+                results[3],
+                use_cache=False,
+            )
+            seconds[name] = time.perf_counter() - start
+            totals[name] += seconds[name]
+        print(
+            f"{title[:30]:30} {seconds['sequential']:13.2f} {seconds['concurrent']:13.2f}"
+        )
+    print(
+        f"Mean end-to-end latency: {totals['sequential'] / len(examples):.2f} s sequential, "
+        f"{totals['concurrent'] / len(examples):.2f} s concurrent"
+    )
+
+
+if __name__ == "__main__":
+
+    """
+    Run the benchmark with 'python development/benchmark_classifiers.py [title number]'.
+    This calls the Gemini API (set the API key in .env).
+    """
+
+    if len(sys.argv) > 2:
+        benchmark([(sys.argv[1], int(sys.argv[2]))])
+    else:
+        benchmark()
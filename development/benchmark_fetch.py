@@ -0,0 +1,141 @@
+import sys
+import os
+import json
+import gzip
+import time
+from wiki_data_fetcher import (
+    BASE_URL,
+    get_session,
+    parse_params,
+    extract_introduction,
+    get_previous_revisions,
+    extract_revision_info,
+)
+
+# Recorded API responses are saved here
+FIXTURE_DIR = "development/fixtures"
+INDEX_FILE = os.path.join(FIXTURE_DIR, "index.json")
+# Articles with short and long introductions and bodies
+TITLES = [
+    "Albert Einstein",
+    "David Szalay",
+    "Henry Purcell",
+    "Turin",
+    "Kaman-Kalehöyük Archaeological Museum",
+]
+MODES = ["lead", "full"]
+
+
+def record(titles=TITLES):
+    """
+    Download the current revision of each article in lead and full modes and
+    save the responses with the bytes transferred and download time.
+    """
+    os.makedirs(FIXTURE_DIR, exist_ok=True)
+    index = []
+    for title in titles:
+        print(title)
+        json_data = get_previous_revisions(title, revisions=0)
+        revid = extract_revision_info(json_data)["revid"]
+        for mode in MODES:
+            start = time.perf_counter()
+            response = get_session().get(
+                BASE_URL, params=parse_params(revid, mode), stream=True
+            )
+            response.raise_for_status()
+            # Read the body as it was sent (compressed if the server used gzip)
+            raw = response.raw.read(decode_content=False)
+            fetch_seconds = time.perf_counter() - start
+            if response.headers.get("Content-Encoding") == "gzip":
+                body = gzip.decompress(raw)
+            else:
+                body = raw
+            fixture_file = f"{revid}_{mode}.json"
+            with open(os.path.join(FIXTURE_DIR, fixture_file), "wb") as file:
+                file.write(body)
+            index.append(
+                {
+                    "title": title,
+                    "revid": revid,
+                    "mode": mode,
+                    "file": fixture_file,
+                    "wire_bytes": len(raw),
+                    "body_bytes": len(body),
+                    "fetch_seconds": fetch_seconds,
+                }
+            )
+    with open(INDEX_FILE, "w") as file:
+        json.dump(index, file, indent=2)
+
+
+def benchmark(repeats=20):
+    """
+    Compare bytes transferred and wall time (download + extraction) for lead and full modes
+    using the recorded responses, and check that both modes give the same introduction.
+    """
+    if not os.path.exists(INDEX_FILE):
+        raise FileNotFoundError(
+            f"No recorded fixtures in {FIXTURE_DIR}; run with --record first"
+        )
+    with open(INDEX_FILE, "r") as file:
+        index = json.load(file)
+
+    totals = {mode: {"wire_bytes": 0, "seconds": 0.0} for mode in MODES}
+    introductions = {}
+    print(
+        f"{'Title':40} {'Mode':5} {'Wire KB':>9} {'Body KB':>9} {'Fetch s':>8} {'Parse ms':>9}"
+    )
+    for entry in index:
+        with open(os.path.join(FIXTURE_DIR, entry["file"]), "rb") as file:
+            body = file.read()
+        start = time.perf_counter()
+        for i in range(repeats):
+            json_data = json.loads(body)
+            introduction = extract_introduction(json_data["parse"]["text"]["*"])
+        parse_seconds = (time.perf_counter() - start) / repeats
+        introductions[(entry["revid"], entry["mode"])] = introduction
+        totals[entry["mode"]]["wire_bytes"] += entry["wire_bytes"]
+        totals[entry["mode"]]["seconds"] += entry["fetch_seconds"] + parse_seconds
+        print(
+            f"{entry['title'][:40]:40} {entry['mode']:5} "
+            f"{entry['wire_bytes'] / 1024:9.1f} {entry['body_bytes'] / 1024:9.1f} "
+            f"{entry['fetch_seconds']:8.3f} {parse_seconds * 1000:9.2f}"
+        )
+
+    print()
+    for mode in MODES:
+        print(
+            f"Total for {mode} mode: {totals[mode]['wire_bytes'] / 1024:.1f} KB, "
+            f"{totals[mode]['seconds']:.3f} s"
+        )
+    print(
+        f"Lead mode transfers {totals['full']['wire_bytes'] / totals['lead']['wire_bytes']:.1f}x "
+        f"fewer bytes and is {totals['full']['seconds'] / totals['lead']['seconds']:.1f}x faster"
+    )
+
+    # The modes should give identical introductions
+    revids = {entry["revid"] for entry in index}
+    mismatches = [
+        revid
+        for revid in revids
+        if introductions[(revid, "lead")] != introductions[(revid, "full")]
+    ]
+    if mismatches:
+        print(f"Introductions differ between modes for revids: {mismatches}")
+
+
+if __name__ == "__main__":
+
+    """
+    Record responses with 'python development/benchmark_fetch.py --record',
+    then run the benchmark with 'python development/benchmark_fetch.py'.
+    """
+
+    if len(sys.argv) > 1:
+        argument = sys.argv[1]
+        if argument == "--record":
+            record()
+        else:
+            raise ValueError(f"Unknown argument: {argument}")
+
+    benchmark()
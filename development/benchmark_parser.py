@@ -0,0 +1,148 @@
+import sys
+import os
+import re
+import glob
+import json
+import time
+import tracemalloc
+from html.parser import HTMLParser
+from wiki_data_fetcher import CHUNK_SIZE, clean_introduction, stream_introduction
+
+# Saved article HTML: full-article API responses recorded by benchmark_fetch.py
+# or .html files in a directory given on the command line
+FIXTURE_DIR = "development/fixtures"
+
+
+def load_corpus(directory=None):
+    """
+    Load the corpus as JSON response bodies (bytes) like those returned by the parse API.
+    """
+    if directory:
+        bodies = []
+        for file_name in sorted(glob.glob(os.path.join(directory, "*.html"))):
+            with open(file_name, "r", encoding="utf-8") as file:
+                response = {"parse": {"text": {"*": file.read()}}}
+            bodies.append(json.dumps(response, ensure_ascii=False).encode("utf-8"))
+        return bodies
+    bodies = []
+    for file_name in sorted(glob.glob(os.path.join(FIXTURE_DIR, "*_full.json"))):
+        with open(file_name, "rb") as file:
+            bodies.append(file.read())
+    return bodies
+
+
+def legacy_introduction(body):
+    """
+    Previous implementation: decode the whole response, split the HTML at the first <h2>,
+    and define a new parser class for each call.
+    """
+    html_content = json.loads(body)["parse"]["text"]["*"]
+    intro_html = re.split(r"<h2", html_content, maxsplit=1)[0]
+
+    class IntroParser(HTMLParser):
+        def __init__(self):
+            super().__init__()
+            self.text = []
+            self.in_p = False
+            self.skip = False
+
+        def handle_starttag(self, tag, attrs):
+            if tag == "p":
+                self.in_p = True
+            if tag in ["style", "script", "table", "div"]:
+                attrs_dict = dict(attrs)
+                if "class" in attrs_dict:
+                    if any(
+                        x in attrs_dict["class"]
+                        for x in ["infobox", "navbox", "metadata", "toc"]
+                    ):
+                        self.skip = True
+                if tag in ["style", "script"]:
+                    self.skip = True
+
+        def handle_endtag(self, tag):
+            if tag == "p":
+                if self.in_p and self.text and not self.text[-1].endswith("\n\n"):
+                    self.text.append("\n\n")
+                self.in_p = False
+            if tag in ["style", "script", "table", "div"]:
+                self.skip = False
+
+        def handle_data(self, data):
+            if self.in_p and not self.skip:
+                if data:
+                    self.text.append(data)
+
+    parser = IntroParser()
+    parser.feed(intro_html)
+    return clean_introduction("".join(parser.text))
+
+
+def streaming_introduction(body):
+    """
+    Current implementation: parse chunks of the response as they arrive and stop at the first <h2>.
+    """
+    chunks = (body[i : i + CHUNK_SIZE] for i in range(0, len(body), CHUNK_SIZE))
+    introduction, _, _ = stream_introduction(chunks)
+    return introduction
+
+
+def measure(function, bodies, repeats):
+    """
+    Get mean time per document (ms) and mean peak memory per document (KB).
+    The body is already in memory, so peak memory counts only the extraction.
+    """
+    start = time.perf_counter()
+    for i in range(repeats):
+        for body in bodies:
+            function(body)
+    milliseconds = (time.perf_counter() - start) * 1000 / repeats / len(bodies)
+
+    peaks = []
+    for body in bodies:
+        tracemalloc.start()
+        function(body)
+        peaks.append(tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    kilobytes = sum(peaks) / len(peaks) / 1024
+
+    return milliseconds, kilobytes
+
+
+def benchmark(directory=None, repeats=10):
+    """
+    Compare time and peak memory for the legacy and streaming introduction parsers.
+    """
+    bodies = load_corpus(directory)
+    if not bodies:
+        raise FileNotFoundError(
+            "No saved article HTML; run development/benchmark_fetch.py --record "
+            "or give a directory with .html files"
+        )
+
+    # Both parsers should give the same introductions
+    mismatches = sum(
+        legacy_introduction(body) != streaming_introduction(body) for body in bodies
+    )
+    if mismatches:
+        print(f"Introductions differ for {mismatches} of {len(bodies)} documents")
+
+    size = sum(len(body) for body in bodies) / len(bodies) / 1024
+    print(f"{len(bodies)} documents, mean size {size:.1f} KB")
+    for name, function in [
+        ("legacy", legacy_introduction),
+        ("streaming", streaming_introduction),
+    ]:
+        milliseconds, kilobytes = measure(function, bodies, repeats)
+        print(
+            f"{name:10} {milliseconds:8.2f} ms/document {kilobytes:10.1f} KB peak memory"
+        )
+
+
+if __name__ == "__main__":
+
+    """
+    Run the benchmark with 'python development/benchmark_parser.py [directory]'.
+    """
+
+    benchmark(sys.argv[1] if len(sys.argv) > 1 else None)
@@ -1,5 +1,5 @@
-import time
 import csv
+from rate_limiter import configure_limiter
 from wiki_data_fetcher import (
     get_previous_revisions,
     extract_revision_info,
@@ -14,6 +14,9 @@ intro_0, intro_10, intro_100 = [], [], []
 
 if __name__ == "__main__":
 
+    # Rate limit our API calls (about four requests per title every five seconds)
+    configure_limiter("wikipedia", rps=0.8)
+
     # Open the file in read mode
     with open("development/wikipedia_titles.txt", "r") as file:
         # Iterate through each line in the file
@@ -25,21 +28,28 @@ if __name__ == "__main__":
             title.append(this_title)
             # Get info for most recent 100 revisions
             json_data = get_previous_revisions(this_title, revisions=100)
-            # Append data for current revision
+            # Get data for current, 10th, and 100th revision before current
             info_0 = extract_revision_info(json_data, 0)
+            info_10 = extract_revision_info(json_data, 10, limit_revnum=False)
+            info_100 = extract_revision_info(json_data, 100, limit_revnum=False)
+            # Get the introductions from the rendered HTML (as shown in the app); the
+            # batched wikitext introductions don't render all templates
+            intros = [
+                get_wikipedia_introduction(info["revid"])
+                for info in [info_0, info_10, info_100]
+            ]
+            # Append data for current revision
             revid_0.append(info_0["revid"])
             ts_0.append(info_0["timestamp"])
-            intro_0.append(get_wikipedia_introduction(info_0["revid"]))
+            intro_0.append(intros[0])
             # Append data for 10th revision before current
-            info_10 = extract_revision_info(json_data, 10, limit_revnum=False)
             revid_10.append(info_10["revid"])
             ts_10.append(info_10["timestamp"])
-            intro_10.append(get_wikipedia_introduction(info_10["revid"]))
+            intro_10.append(intros[1])
             # Append data for 100th revision before current
-            info_100 = extract_revision_info(json_data, 100, limit_revnum=False)
             revid_100.append(info_100["revid"])
             ts_100.append(info_100["timestamp"])
-            intro_100.append(get_wikipedia_introduction(info_100["revid"]))
+            intro_100.append(intros[2])
 
             # Write the CSV in each loop in case we need to restart after an error
             # Combine the lists
@@ -66,6 +76,3 @@ if __name__ == "__main__":
                 wr.writerow(column_names)
                 # Write the combined data rows
                 wr.writerows(export_data)
-
-            # Rate limit our API calls
-            time.sleep(5)
@@ -1,29 +1,9 @@
 import pandas as pd
-from models import classifier
+from models import classify_many
 
-
-def run_classifier(row):
-    """
-    Run the model on one row of data from 'development/wikipedia_introductions.csv'.
-    The model is run up to four times: two prompt styles (heuristic and few-shot)
-    and two revision intervals (from 10th and 100th previous revisions to current).
-
-    Usage:
-
-    df = pd.read_csv("development/wikipedia_introductions.csv")
-    row = df.iloc[38]
-    run_classifier(row)
-    """
-
-    # Initialize output dict
-    output = {}
-
-    output["heuristic_10"] = classifier(row["intro_10"], row["intro_0"], "heuristic")
-    output["few-shot_10"] = classifier(row["intro_10"], row["intro_0"], "few-shot")
-    output["heuristic_100"] = classifier(row["intro_100"], row["intro_0"], "heuristic")
-    output["few-shot_100"] = classifier(row["intro_100"], row["intro_0"], "few-shot")
-
-    return output
+# Columns saved for each classifier result (shortcut results for equivalent revisions
+# have an extra "shortcut" key that is left out so all rows have the same columns)
+RESULT_FIELDS = ["noteworthy", "rationale"]
 
 
 if __name__ == "__main__":
@@ -42,11 +22,31 @@ if __name__ == "__main__":
     # Initialize output data frame
     df_out = None
 
+    # Pairs of revisions for all rows: 10th and 100th previous revisions to current
+    pairs = (
+        (row[old_column], row["intro_0"])
+        for _, row in df.iterrows()
+        for old_column in ["intro_10", "intro_100"]
+    )
+    # Run the classifiers concurrently; results come back in the same order as the pairs
+    results = classify_many(pairs, styles=["heuristic", "few-shot"])
+
     for index, row in df.iterrows():
         # Print the title to see progress
         print(row["title"])
-        # Run classifier
-        output = run_classifier(row)
+        # Get classifier results for this row
+        results_10 = next(results)
+        results_100 = next(results)
+        output = {
+            "heuristic_10": results_10["heuristic"],
+            "few-shot_10": results_10["few-shot"],
+            "heuristic_100": results_100["heuristic"],
+            "few-shot_100": results_100["few-shot"],
+        }
+        output = {
+            outer_k: {field: result.get(field) for field in RESULT_FIELDS}
+            for outer_k, result in output.items()
+        }
         print(output)
         # Create column names and row for data frame
         column_names = [
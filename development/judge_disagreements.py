@@ -1,6 +1,7 @@
 import sys
 import pandas as pd
 from models import judge
+from batch_jobs import judge_batch
 
 if __name__ == "__main__":
 
@@ -18,11 +19,13 @@ if __name__ == "__main__":
     # We run the unaligned judge unless the script is called with --aligned-fewshot or --aligned--heuristic
     mode = "unaligned"
     outfile = "development/AI_judgments_unaligned.csv"
-    # Check if an argument was passed
-    if len(sys.argv) > 1:
-        # sys.argv[0] is the script name, sys.argv[1] is the first argument
-        argument = sys.argv[1]
-        if argument == "--aligned-fewshot":
+    # Use --batch to run the judge as an offline batch job
+    batch = False
+    # sys.argv[0] is the script name
+    for argument in sys.argv[1:]:
+        if argument == "--batch":
+            batch = True
+        elif argument == "--aligned-fewshot":
             mode = "aligned-fewshot"
             outfile = "development/AI_judgments_fewshot.csv"
         elif argument == "--aligned-heuristic":
@@ -33,28 +36,48 @@ if __name__ == "__main__":
 
     print(f"Saving judgments to {outfile}")
 
-    for index, row in df.iterrows():
-        # Change this if needed (to restart after errors)
-        if index < 0:
-            next
-        else:
-            # Print the title to see progress
-            print(row["title"])
-            # Run judge
-            try:
-                output = judge(
-                    df.iloc[index]["old_revision"],
-                    df.iloc[index]["new_revision"],
-                    df.iloc[index]["heuristic_rationale"],
-                    df.iloc[index]["few-shot_rationale"],
-                    mode=mode,
-                    iteration=1,
+    if batch:
+        # Run all rows in one batch job and merge the results by row index
+        results = judge_batch(
+            {
+                index: (
+                    row["old_revision"],
+                    row["new_revision"],
+                    row["heuristic_rationale"],
+                    row["few-shot_rationale"],
                 )
-            except:
-                output = {"noteworthy": None, "reasoning": None}
-            print(output)
-            # Update data frame
+                for index, row in df.iterrows()
+            },
+            name=f"disagreements_{mode}",
+            mode=mode,
+        )
+        for index in df.index:
+            output = results.get(str(index), {"noteworthy": None, "reasoning": None})
             df.at[index, "noteworthy"] = output["noteworthy"]
             df.at[index, "reasoning"] = output["reasoning"]
-            # Write CSV in every loop to avoid data loss if errors occur
-            df.to_csv(outfile, index=False, encoding="utf-8")
+        df.to_csv(outfile, index=False, encoding="utf-8")
+    else:
+        for index, row in df.iterrows():
+            # Change this if needed (to restart after errors)
+            if index < 0:
+                next
+            else:
+                # Print the title to see progress
+                print(row["title"])
+                # Run judge
+                try:
+                    output = judge(
+                        df.iloc[index]["old_revision"],
+                        df.iloc[index]["new_revision"],
+                        df.iloc[index]["heuristic_rationale"],
+                        df.iloc[index]["few-shot_rationale"],
+                        mode=mode,
+                    )
+                except:
+                    output = {"noteworthy": None, "reasoning": None}
+                print(output)
+                # Update data frame
+                df.at[index, "noteworthy"] = output["noteworthy"]
+                df.at[index, "reasoning"] = output["reasoning"]
+                # Write CSV in every loop to avoid data loss if errors occur
+                df.to_csv(outfile, index=False, encoding="utf-8")
@@ -0,0 +1,146 @@
+import sqlite3
+import threading
+import json
+import time
+import os
+
+# Directory for persistent caches
+CACHE_DIR = os.environ.get("NOTEWORTHY_CACHE_DIR", ".cache")
+
+
+class DiskCache:
+    """
+    Persistent key-value cache stored in a SQLite database.
+
+    Values are stored as JSON. When the number of entries exceeds max_entries,
+    the least recently used entries are evicted. If ttl is given, entries older
+    than ttl seconds are treated as missing and removed. The database file is
+    created on first use, and one cache object can be shared between threads.
+
+    Example:
+        cache = DiskCache(".cache/introductions.sqlite", max_entries=1000)
+        cache.set("1143737878", "Albert Einstein was a German-born theoretical physicist ...")
+        cache.get("1143737878")
+        cache.stats()  # {'hits': 1, 'misses': 0, 'entries': 1}
+    """
+
+    def __init__(self, path: str, max_entries: int = 10000, ttl: float = None):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._connection = None
+        self._lock = threading.Lock()
+        self._last_access = 0.0
+
+    def _access_time(self) -> float:
+        """
+        Current time, strictly increasing so that LRU order is well defined.
+        """
+        self._last_access = max(time.time(), self._last_access + 1e-6)
+        return self._last_access
+
+    def _connect(self):
+        """
+        Open the database and create the table if needed (call with lock held).
+        """
+        if self._connection is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            connection = sqlite3.connect(self.path, check_same_thread=False)
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS cache "
+                "(key TEXT PRIMARY KEY, value TEXT, accessed REAL, created REAL)"
+            )
+            # Add the creation time to databases made before it was stored
+            columns = [row[1] for row in connection.execute("PRAGMA table_info(cache)")]
+            if "created" not in columns:
+                connection.execute("ALTER TABLE cache ADD COLUMN created REAL")
+                connection.execute("UPDATE cache SET created = accessed")
+            connection.execute(
+                "CREATE INDEX IF NOT EXISTS cache_accessed ON cache (accessed)"
+            )
+            connection.execute(
+                "CREATE INDEX IF NOT EXISTS cache_created ON cache (created)"
+            )
+            connection.commit()
+            self._connection = connection
+        return self._connection
+
+    def _expired(self, created: float) -> bool:
+        """
+        Check if an entry created at the given time is older than the TTL.
+        """
+        return self.ttl is not None and created < time.time() - self.ttl
+
+    def get(self, key: str, default=None):
+        """
+        Get the value for a key, or default if the key is not in the cache.
+        """
+        with self._lock:
+            connection = self._connect()
+            row = connection.execute(
+                "SELECT value, created FROM cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None and self._expired(row[1]):
+                connection.execute("DELETE FROM cache WHERE key = ?", (key,))
+                connection.commit()
+                row = None
+            if row is None:
+                self.misses += 1
+                return default
+            # Update access time for LRU eviction
+            connection.execute(
+                "UPDATE cache SET accessed = ? WHERE key = ?",
+                (self._access_time(), key),
+            )
+            connection.commit()
+            self.hits += 1
+            return json.loads(row[0])
+
+    def set(self, key: str, value):
+        """
+        Store a value and evict the least recently used entries if the cache is full.
+        """
+        with self._lock:
+            connection = self._connect()
+            now = self._access_time()
+            connection.execute(
+                "INSERT OR REPLACE INTO cache (key, value, accessed, created) "
+                "VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value), now, now),
+            )
+            if self.ttl is not None:
+                connection.execute(
+                    "DELETE FROM cache WHERE created < ?", (now - self.ttl,)
+                )
+            (entries,) = connection.execute("SELECT COUNT(*) FROM cache").fetchone()
+            if entries > self.max_entries:
+                connection.execute(
+                    "DELETE FROM cache WHERE key IN "
+                    "(SELECT key FROM cache ORDER BY accessed LIMIT ?)",
+                    (entries - self.max_entries,),
+                )
+            connection.commit()
+
+    def clear(self):
+        """
+        Remove all entries and reset the hit and miss counters.
+        """
+        with self._lock:
+            connection = self._connect()
+            connection.execute("DELETE FROM cache")
+            connection.commit()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict:
+        """
+        Get the hit and miss counters and the number of entries in the cache.
+        """
+        with self._lock:
+            connection = self._connect()
+            (entries,) = connection.execute("SELECT COUNT(*) FROM cache").fetchone()
+            return {"hits": self.hits, "misses": self.misses, "entries": entries}
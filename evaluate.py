@@ -1,9 +1,12 @@
 from datasets import load_dataset
 from dotenv import load_dotenv
 from datetime import datetime
-from models import judge
+from models import judge_many, make_judge_prompt, get_backend
+from batch_jobs import judge_batch
 import pandas as pd
 import logfire
+import time
+import os
 
 # Load API keys
 load_dotenv()
@@ -11,6 +14,11 @@ load_dotenv()
 logfire.configure()
 
 
+# Directories for evaluation results with each prompt mode
+# (diff mode results are kept separate from the results used in plot_evals.R)
+EVALUATION_DIRS = {"full": "evaluations", "diff": "evaluations_diff"}
+
+
 def select_round(dataset, split, round=None):
     """
     Select the production round for a given dataset and split.
@@ -122,13 +130,17 @@ def get_evalset(round=None):
         return df, y
 
 
-def evaluate(e_round=1, a_round=1, rep=1):
+def evaluate(e_round=1, a_round=1, rep=1, prompt_mode="full", workers=8, batch=False):
     """
     Run evaluation for a given evalset and alignment prompt.
 
     Args:
         e_round: The round of the evalset to use (> 0).
         a_round: The round of the alignment to use (>= 0).
+        rep: The evaluation repetition.
+        prompt_mode: Revisions in the judge prompt: full or diff.
+        workers: Number of concurrent judge calls.
+        batch: Run the judge as an offline batch job (see batch_jobs.py).
 
     Details:
         Round 0 corresponds to the unaligned judge.
@@ -136,15 +148,20 @@ def evaluate(e_round=1, a_round=1, rep=1):
         Rounds 2 and higher correspond to production evalsets and alignments.
 
     Results:
-        Saves results in 'evals/evalset_{e_round}_alignment_{a_round}.csv'.
+        Saves results in 'evaluations/evalset_{e_round}_alignment_{a_round}_rep_{rep}.csv'
+        (or in 'evaluations_diff' for the diff prompt mode).
     """
 
     span_name = f"Evalset {e_round}, alignment {a_round}"
-    with logfire.span(span_name):
+    with logfire.span(span_name, prompt_mode=prompt_mode):
         # Select judge mode
         judge_mode = "unaligned" if a_round == 0 else "aligned-heuristic"
         # Define output file
-        outfile = f"evaluations/evalset_{e_round}_alignment_{a_round}_rep_{rep}.csv"
+        outfile = os.path.join(
+            EVALUATION_DIRS[prompt_mode],
+            f"evalset_{e_round}_alignment_{a_round}_rep_{rep}.csv",
+        )
+        os.makedirs(EVALUATION_DIRS[prompt_mode], exist_ok=True)
         print(f"Saving evaluation results to {outfile}")
         # Get evalset and ground truth
         df, y = get_evalset(e_round)
@@ -155,39 +172,107 @@ def evaluate(e_round=1, a_round=1, rep=1):
         judge_noteworthy = []
         human_noteworthy = []
 
+        # Change this if needed (to restart after errors)
+        first_index = 0
+        rows = df.iloc[first_index:]
+        revisions_and_rationales = zip(
+            rows["old_revision"],
+            rows["new_revision"],
+            rows["heuristic_rationale"],
+            rows["fewshot_rationale"],
+        )
+        if batch:
+            # Run the judge as one batch job and match the results to rows by index
+            results = judge_batch(
+                dict(zip(rows.index, revisions_and_rationales)),
+                name=f"evalset_{e_round}_alignment_{a_round}_rep_{rep}_{prompt_mode}",
+                mode=judge_mode,
+                round=a_round,
+                use_cache=rep == 1,
+                prompt_mode=prompt_mode,
+            )
+            outputs = (
+                results.get(str(index), {"noteworthy": None, "reasoning": None})
+                for index in rows.index
+            )
+        else:
+            # Run the judge concurrently; outputs come back in the same order as the rows
+            outputs = judge_many(
+                revisions_and_rationales,
+                mode=judge_mode,
+                round=a_round,
+                workers=workers,
+                # Replicates resample the model; the first one uses the result cache
+                use_cache=rep == 1,
+                prompt_mode=prompt_mode,
+                return_exceptions=True,
+                # Trace the judge call for each row in a span named for the page
+                span_names=rows["page_title"],
+            )
+
+        start = time.perf_counter()
+        for (index, row), output in zip(rows.iterrows(), outputs):
+            if isinstance(output, Exception):
+                output = {"noteworthy": None, "reasoning": None}
+            print(output)
+            # Update output lists
+            page_title.append(row["page_title"])
+            judge_reasoning.append(output["reasoning"])
+            judge_noteworthy.append(output["noteworthy"])
+            human_noteworthy.append(y[index])
+            # Write CSV in every loop to avoid data loss if errors occur
+            data_list = list(
+                zip(page_title, judge_reasoning, judge_noteworthy, human_noteworthy)
+            )
+            columns = [
+                "page_title",
+                "judge_reasoning",
+                "judge_noteworthy",
+                "human_noteworthy",
+            ]
+            out_df = pd.DataFrame(data_list, columns=columns)
+            out_df.to_csv(outfile, index=False, encoding="utf-8")
+
+        if page_title:
+            seconds = time.perf_counter() - start
+            print(f"Mean time per example: {seconds / len(page_title):.2f} s")
+
+
+def accuracy(file):
+    """
+    Get the accuracy of the judge in an evaluation results file.
+    """
+    df = pd.read_csv(file)
+    return (df["judge_noteworthy"] == df["human_noteworthy"]).mean()
+
+
+def compare_prompt_modes(e_round=1, a_round=1, rep=1):
+    """
+    Compare the full and diff prompt modes for the judge.
+    Run evaluate() with prompt_mode="full" and prompt_mode="diff" first.
+
+    Prints the accuracy for each mode and the mean number of prompt tokens
+    (counted with the model backend) for the examples in the evalset.
+    """
+    df, _ = get_evalset(e_round)
+    judge_mode = "unaligned" if a_round == 0 else "aligned-heuristic"
+    for prompt_mode, directory in EVALUATION_DIRS.items():
+        file = os.path.join(
+            directory, f"evalset_{e_round}_alignment_{a_round}_rep_{rep}.csv"
+        )
+        tokens = []
         for index, row in df.iterrows():
-            # Change this if needed (to restart after errors)
-            if index < 0:
-                next
-            else:
-                # Run judge
-                try:
-                    with logfire.span(row["page_title"]):
-                        output = judge(
-                            df.iloc[index]["old_revision"],
-                            df.iloc[index]["new_revision"],
-                            df.iloc[index]["heuristic_rationale"],
-                            df.iloc[index]["fewshot_rationale"],
-                            mode=judge_mode,
-                            round=a_round,
-                        )
-                except:
-                    output = {"noteworthy": None, "reasoning": None}
-                print(output)
-                # Update output lists
-                page_title.append(row["page_title"])
-                judge_reasoning.append(output["reasoning"])
-                judge_noteworthy.append(output["noteworthy"])
-                human_noteworthy.append(y[index])
-                # Write CSV in every loop to avoid data loss if errors occur
-                data_list = list(
-                    zip(page_title, judge_reasoning, judge_noteworthy, human_noteworthy)
-                )
-                columns = [
-                    "page_title",
-                    "judge_reasoning",
-                    "judge_noteworthy",
-                    "human_noteworthy",
-                ]
-                out_df = pd.DataFrame(data_list, columns=columns)
-                out_df.to_csv(outfile, index=False, encoding="utf-8")
+            prompt = make_judge_prompt(
+                row["old_revision"],
+                row["new_revision"],
+                row["heuristic_rationale"],
+                row["fewshot_rationale"],
+                mode=judge_mode,
+                round=a_round,
+                prompt_mode=prompt_mode,
+            )
+            tokens.append(get_backend().count_tokens(prompt))
+        print(
+            f"{prompt_mode:5} mode: accuracy {accuracy(file):.3f}, "
+            f"mean prompt tokens {sum(tokens) / len(tokens):.0f}"
+        )
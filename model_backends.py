@@ -0,0 +1,421 @@
+"""
+Model backends for the classifier, judge, and alignment update.
+
+GeminiBackend calls the Gemini API. FakeBackend is a local stand-in with configurable
+latency, failure rate, and outputs, for tests and load tests without network access.
+
+Select the backend with the NOTEWORTHY_BACKEND environment variable (gemini or fake)
+or with models.set_backend().
+
+Example:
+    from model_backends import FakeBackend
+    import models
+
+    # Half a second to two seconds per call and 5% failures
+    models.set_backend(FakeBackend(latency=(0.5, 2.0), failure_rate=0.05, seed=1))
+    models.classifier(old_revision, new_revision, "heuristic")
+"""
+
+from rate_limiter import acquire, estimate_tokens
+from threading import Lock
+import itertools
+import random
+import json
+import time
+import re
+
+# Default Gemini model
+GEMINI_MODEL = "gemini-2.5-flash"
+
+
+class MissingAPIKeyError(ValueError):
+    """
+    Raised when the Gemini client can't be created because no API key is set.
+    """
+
+
+class GeminiBackend:
+    """
+    Backend for the Gemini API. The client is created on first use.
+    Requests wait for the shared Gemini rate limiter (see rate_limiter.py).
+    """
+
+    def __init__(self, model: str = GEMINI_MODEL):
+        self.model = model
+        self._client = None
+        self._configs = {}
+        self._lock = Lock()
+
+    @property
+    def client(self):
+        """
+        Gemini client (created on first use so importing doesn't need an API key).
+        """
+        with self._lock:
+            if self._client is None:
+                from google import genai
+
+                try:
+                    self._client = genai.Client()
+                except ValueError as e:
+                    # Retrying doesn't help until GOOGLE_API_KEY is set
+                    raise MissingAPIKeyError(str(e)) from e
+            return self._client
+
+    def _config(self, schema, cached_content):
+        """
+        Get the generation config for a response schema and cached content (made once and reused).
+        """
+        from google.genai import types
+
+        key = (schema, cached_content)
+        if key not in self._configs:
+            config = {}
+            if schema is not None:
+                config["response_mime_type"] = "application/json"
+                config["response_schema"] = schema.model_json_schema()
+            if cached_content is not None:
+                config["cached_content"] = cached_content
+            self._configs[key] = types.GenerateContentConfig(**config)
+        return self._configs[key]
+
+    def wait_for_rate_limit(self, contents: str) -> float:
+        """
+        Wait for the shared Gemini rate limiter before sending a prompt.
+
+        Returns:
+            Seconds spent waiting
+        """
+        return acquire("gemini", estimate_tokens(contents))
+
+    def generate(
+        self,
+        contents: str,
+        schema=None,
+        cached_content: str = None,
+        rate_limit: bool = True,
+    ) -> str:
+        """
+        Generate a response.
+
+        Args:
+            contents: Prompt text
+            schema: Pydantic model for a JSON response (None for a text response)
+            cached_content: Name of cached content with the start of the prompt
+            rate_limit: Wait for the rate limiter (False if the caller already called wait_for_rate_limit())
+
+        Returns:
+            Text of the response
+        """
+        if rate_limit:
+            self.wait_for_rate_limit(contents)
+        response = self.client.models.generate_content(
+            model=self.model,
+            contents=contents,
+            config=self._config(schema, cached_content),
+        )
+        return response.text
+
+    def count_tokens(self, contents: str) -> int:
+        """
+        Count the tokens in a prompt.
+        """
+        acquire("gemini")
+        response = self.client.models.count_tokens(model=self.model, contents=contents)
+        return response.total_tokens
+
+    def create_cache(self, contents: str, ttl: int) -> str:
+        """
+        Cache the start of a prompt on the server for ttl seconds and return the cache name.
+        """
+        from google.genai import types
+
+        acquire("gemini", estimate_tokens(contents))
+        cache = self.client.caches.create(
+            model=self.model,
+            config=types.CreateCachedContentConfig(
+                contents=[contents],
+                ttl=f"{ttl}s",
+                display_name="noteworthy-differences",
+            ),
+        )
+        return cache.name
+
+    def delete_cache(self, name: str):
+        """
+        Delete a cache on the server.
+        """
+        self.client.caches.delete(name=name)
+
+    def submit_batch(self, path: str, display_name: str) -> str:
+        """
+        Upload a JSONL request file (see batch_request()) and start a batch job.
+
+        Returns:
+            Name of the batch job
+        """
+        from google.genai import types
+
+        uploaded = self.client.files.upload(
+            file=path,
+            config=types.UploadFileConfig(display_name=display_name, mime_type="jsonl"),
+        )
+        job = self.client.batches.create(
+            model=self.model,
+            src=uploaded.name,
+            config={"display_name": display_name},
+        )
+        return job.name
+
+    def batch_state(self, name: str) -> str:
+        """
+        Get the state of a batch job (e.g. JOB_STATE_RUNNING or JOB_STATE_SUCCEEDED).
+        """
+        return self.client.batches.get(name=name).state.name
+
+    def download_batch(self, name: str, path: str):
+        """
+        Save the JSONL result file of a finished batch job.
+        """
+        job = self.client.batches.get(name=name)
+        content = self.client.files.download(file=job.dest.file_name)
+        with open(path, "wb") as file:
+            file.write(content)
+
+
+# States of finished batch jobs
+BATCH_DONE_STATES = {
+    "JOB_STATE_SUCCEEDED",
+    "JOB_STATE_FAILED",
+    "JOB_STATE_CANCELLED",
+    "JOB_STATE_EXPIRED",
+}
+
+
+def batch_request(key: str, contents: str, schema=None) -> str:
+    """
+    Make a line of a JSONL batch request file (the format used by the Gemini Batch API).
+
+    Args:
+        key: Key used to match the result to the request
+        contents: Prompt text
+        schema: Pydantic model for a JSON response (None for a text response)
+    """
+    request = {"contents": [{"role": "user", "parts": [{"text": contents}]}]}
+    if schema is not None:
+        request["generation_config"] = {
+            "response_mime_type": "application/json",
+            "response_json_schema": schema.model_json_schema(),
+        }
+    return json.dumps({"key": key, "request": request})
+
+
+def batch_result(line: str) -> tuple:
+    """
+    Parse a line of a JSONL batch result file.
+
+    Returns:
+        Tuple of (key, text, error) where text is None if the request failed
+    """
+    data = json.loads(line)
+    if "error" in data:
+        return data["key"], None, data["error"]
+    try:
+        parts = data["response"]["candidates"][0]["content"]["parts"]
+        return data["key"], "".join(part.get("text", "") for part in parts), None
+    except (KeyError, IndexError):
+        return data["key"], None, data.get("response")
+
+
+class FakeBackendError(Exception):
+    """
+    Simulated failure of a model call.
+    """
+
+
+# Revisions in a prompt with the full text of both revisions
+OLD_REVISION = re.compile(r"<old_revision>\n(.*?)\n</old_revision>", re.S)
+NEW_REVISION = re.compile(r"<new_revision>\n(.*?)\n</new_revision>", re.S)
+# Differences in a prompt with a diff of the revisions, and the changes in them
+DIFFERENCES = re.compile(r"<differences>\n(.*?)\n</differences>", re.S)
+DIFF_CHANGE = re.compile(r"\[-(.*?)-\]|\{\+(.*?)\+\}")
+
+
+class FakeBackend:
+    """
+    Local stand-in for a model backend.
+
+    Args:
+        latency: Seconds per call: a number, a (low, high) tuple for a uniform distribution,
+          or a function that takes a random.Random and returns seconds
+        failure_rate: Fraction of calls that raise FakeBackendError
+        outputs: Output for JSON responses: None for rule-based output (noteworthy if at least
+          min_changed_words words changed), a dictionary, or a function that takes the prompt
+          and returns a dictionary
+        text: Output for text responses
+        min_changed_words: Number of changed words for rule-based noteworthy output
+        seed: Random seed for latency and failures
+        batch_polls: Number of state checks before a batch job is finished
+
+    The number of calls, failures, cached prefixes, and batch jobs are kept for checks in tests.
+    Batch jobs are run locally when the results are downloaded, with the same failure rate
+    for each request and no latency.
+    """
+
+    model = "fake"
+
+    def __init__(
+        self,
+        latency=0.0,
+        failure_rate: float = 0.0,
+        outputs=None,
+        text: str = "Fake response",
+        min_changed_words: int = 5,
+        seed: int = None,
+        batch_polls: int = 1,
+    ):
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.outputs = outputs
+        self.text = text
+        self.min_changed_words = min_changed_words
+        self.batch_polls = batch_polls
+        self.calls = 0
+        self.failures = 0
+        # Cache name -> cached prompt start
+        self.caches = {}
+        self._cache_ids = itertools.count()
+        # Batch job name -> {"path", "polls"}
+        self.batches = {}
+        self._batch_ids = itertools.count()
+        self._random = random.Random(seed)
+        self._lock = Lock()
+
+    def _sleep(self):
+        """
+        Wait for a latency sampled from the distribution and maybe raise a simulated failure.
+        """
+        with self._lock:
+            self.calls += 1
+            if callable(self.latency):
+                seconds = self.latency(self._random)
+            elif isinstance(self.latency, tuple):
+                seconds = self._random.uniform(*self.latency)
+            else:
+                seconds = self.latency
+            failed = self._random.random() < self.failure_rate
+            if failed:
+                self.failures += 1
+        time.sleep(seconds)
+        if failed:
+            raise FakeBackendError("Simulated model failure")
+
+    def changed_words(self, prompt: str) -> int:
+        """
+        Count the words that changed between the revisions in a prompt.
+        """
+        differences = DIFFERENCES.search(prompt)
+        if differences:
+            changes = DIFF_CHANGE.findall(differences.group(1))
+            return sum(
+                len((deleted or inserted).split()) for deleted, inserted in changes
+            )
+        old_match = OLD_REVISION.search(prompt)
+        new_match = NEW_REVISION.search(prompt)
+        if not old_match or not new_match:
+            return 0
+        # Imported here because models imports this module
+        from models import changed_words
+
+        return changed_words(old_match.group(1), new_match.group(1))
+
+    def _output(self, prompt: str, json_schema: dict) -> dict:
+        """
+        Get the output for a JSON response with a JSON schema.
+        """
+        if callable(self.outputs):
+            return self.outputs(prompt)
+        if self.outputs is not None:
+            return dict(self.outputs)
+        changed = self.changed_words(prompt)
+        output = {}
+        for field, info in json_schema["properties"].items():
+            if info.get("type") == "boolean":
+                output[field] = changed >= self.min_changed_words
+            else:
+                output[field] = f"Fake {field}: {changed} words changed."
+        return output
+
+    def wait_for_rate_limit(self, contents: str) -> float:
+        # The fake backend has no rate limit
+        return 0.0
+
+    def generate(
+        self,
+        contents: str,
+        schema=None,
+        cached_content: str = None,
+        rate_limit: bool = True,
+    ) -> str:
+        self._sleep()
+        prompt = self.caches.get(cached_content, "") + contents
+        if schema is None:
+            return self.text
+        return json.dumps(self._output(prompt, schema.model_json_schema()))
+
+    def count_tokens(self, contents: str) -> int:
+        return len(contents.split())
+
+    def create_cache(self, contents: str, ttl: int) -> str:
+        with self._lock:
+            name = f"cachedContents/fake-{next(self._cache_ids)}"
+            self.caches[name] = contents
+        return name
+
+    def delete_cache(self, name: str):
+        with self._lock:
+            self.caches.pop(name, None)
+
+    def submit_batch(self, path: str, display_name: str) -> str:
+        with self._lock:
+            name = f"batches/fake-{next(self._batch_ids)}"
+            self.batches[name] = {"path": path, "polls": 0}
+        return name
+
+    def batch_state(self, name: str) -> str:
+        batch = self.batches[name]
+        batch["polls"] += 1
+        if batch["polls"] < self.batch_polls:
+            return "JOB_STATE_RUNNING"
+        return "JOB_STATE_SUCCEEDED"
+
+    def download_batch(self, name: str, path: str):
+        with open(self.batches[name]["path"]) as file:
+            requests = [json.loads(line) for line in file if line.strip()]
+        with open(path, "w") as file:
+            for line in requests:
+                request = line["request"]
+                prompt = "".join(
+                    part["text"] for part in request["contents"][0]["parts"]
+                )
+                with self._lock:
+                    self.calls += 1
+                    failed = self._random.random() < self.failure_rate
+                    if failed:
+                        self.failures += 1
+                if failed:
+                    result = {"error": {"message": "Simulated model failure"}}
+                else:
+                    config = request.get("generation_config")
+                    if config is None:
+                        text = self.text
+                    else:
+                        text = json.dumps(
+                            self._output(prompt, config["response_json_schema"])
+                        )
+                    result = {
+                        "response": {
+                            "candidates": [{"content": {"parts": [{"text": text}]}}]
+                        }
+                    }
+                file.write(json.dumps({"key": line["key"], **result}) + "\n")
@@ -2,15 +2,29 @@
 # Classification of noteworthy differences between revisions of Wikipedia articles: an AI alignment project
 # 20251114 jmd version 1
 
-from google import genai
-from google.genai import types
 from pydantic import BaseModel
 from dotenv import load_dotenv
 import json
 import os
 import pandas as pd
-from prompts import classifier_prompts, judge_prompt
-from retry_with_backoff import retry_with_backoff
+from prompts import (
+    PromptTemplate,
+    classifier_templates,
+    judge_template,
+    revisions_templates,
+)
+from retry_with_backoff import retry_with_backoff, reset_breaker, RetryPolicy
+from rate_limiter import get_limiter
+from disk_cache import DiskCache, CACHE_DIR
+from model_backends import GeminiBackend, FakeBackend, GEMINI_MODEL, MissingAPIKeyError
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from collections import deque
+import contextvars
+import threading
+import hashlib
+import difflib
+import time
+from opentelemetry import trace
 import logfire
 import re
 import glob
@@ -22,8 +36,490 @@ load_dotenv()
 # to capture prompts, responses, and metadata
 logfire.instrument_google_genai()
 
-# Initialize the Gemini LLM
-client = genai.Client()
+# Model used for the classifier and judge
+MODEL = os.environ.get("NOTEWORTHY_MODEL", GEMINI_MODEL)
+
+
+def make_backend(name=None):
+    """
+    Make a model backend.
+
+    Args:
+        name: gemini or fake (None to use the NOTEWORTHY_BACKEND environment variable, default gemini)
+    """
+    name = name or os.environ.get("NOTEWORTHY_BACKEND", "gemini")
+    if name == "gemini":
+        return GeminiBackend(MODEL)
+    elif name == "fake":
+        return FakeBackend()
+    else:
+        raise ValueError(f"Unknown backend: {name}")
+
+
+# Backend for the classifier and judge (the Gemini client is created on first use)
+backend = make_backend()
+
+
+def get_backend():
+    """
+    Get the model backend.
+    """
+    return backend
+
+
+def set_backend(new_backend):
+    """
+    Use a different model backend (e.g. FakeBackend for offline tests).
+    Cached prompt prefixes and the circuit breaker state belong to a backend, so they
+    are forgotten.
+    """
+    global backend
+    context_cache.reset()
+    reset_breaker("model")
+    backend = new_backend
+
+
+# A missing API key gives the same error when retried
+MODEL_POLICIES = {MissingAPIKeyError: RetryPolicy(retry=False)}
+
+# The result cache is on unless disabled with an environment variable
+USE_LLM_CACHE = os.environ.get("NOTEWORTHY_LLM_CACHE", "1") != "0"
+# Persistent cache of model results (entries expire after 30 days)
+llm_cache = DiskCache(
+    os.path.join(CACHE_DIR, "llm_results.sqlite"),
+    max_entries=20000,
+    ttl=30 * 24 * 60 * 60,
+)
+
+
+def get_llm_cache_stats():
+    """
+    Get hit and miss counts and the number of entries in the model result cache.
+    """
+    return llm_cache.stats()
+
+
+# Response schemas
+class ClassifierResponse(BaseModel):
+    noteworthy: bool
+    rationale: str
+
+
+class JudgeResponse(BaseModel):
+    noteworthy: bool
+    reasoning: str
+
+
+# Response schema for each kind of response
+response_schemas = {"classifier": ClassifierResponse, "judge": JudgeResponse}
+# Schema part of the cache key for each kind of response
+_config_keys = {
+    kind: json.dumps(schema.model_json_schema(), sort_keys=True)
+    for kind, schema in response_schemas.items()
+}
+
+
+def _cache_key(prompt, kind):
+    """
+    Content-addressed key for a model request.
+    The prompt contains the prompt style or judge mode, alignment text, revisions,
+    and rationales, so a change to any of them gives a different key.
+    """
+    request = "\0".join([backend.model, _config_keys[kind], prompt])
+    return hashlib.sha256(request.encode()).hexdigest()
+
+
+# Lifetime of cached prompt prefixes in seconds
+CONTEXT_CACHE_TTL = 3600
+# Cached prefixes are re-created when they have less than this many seconds left
+CONTEXT_CACHE_MARGIN = 60
+# The API doesn't cache prefixes with fewer tokens than this
+MIN_CONTEXT_CACHE_TOKENS = 1024
+
+
+class ContextCache:
+    """
+    Explicit Gemini context caching of static prompt prefixes.
+
+    The static part of each prompt (instructions, examples, and alignment text) comes before
+    the revisions and rationales, so it can be cached on the server and referenced by name.
+    Each prompt kind (e.g. judge in aligned-heuristic mode) has a slot that holds one cached
+    prefix; when the prefix changes (e.g. for a new alignment round), the old cache is deleted
+    and a new one is created. Caches are re-created before they expire, and prefixes that
+    are too short to cache are remembered so they are only counted once.
+
+    Enable it with NOTEWORTHY_CONTEXT_CACHE=1 or `context_cache.enabled = True`.
+    """
+
+    def __init__(self, enabled: bool = False, ttl: int = CONTEXT_CACHE_TTL):
+        self.enabled = enabled
+        self.ttl = ttl
+        # Slot -> {"key", "name", "expires"} for the cached prefix
+        self._slots = {}
+        # Keys of prefixes that are too short to cache
+        self._uncacheable = set()
+        self._lock = threading.Lock()
+        # Slot -> lock held while the cache for the slot is created
+        self._slot_locks = {}
+
+    def _create(self, prefix):
+        """
+        Create a cache for a prefix and return (name, expire time), or None if it's too short.
+        """
+        if backend.count_tokens(prefix) < MIN_CONTEXT_CACHE_TOKENS:
+            return None
+        name = backend.create_cache(prefix, self.ttl)
+        return name, time.time() + self.ttl
+
+    def _delete(self, name):
+        """
+        Delete a cache on the server (errors are ignored because the cache expires anyway).
+        """
+        try:
+            backend.delete_cache(name)
+        except Exception:
+            pass
+
+    def _lookup(self, slot, key):
+        """
+        Get the name of a cache for a prefix key that isn't about to expire (call with lock held).
+        """
+        entry = self._slots.get(slot)
+        if entry and entry["key"] == key:
+            if entry["expires"] - time.time() > CONTEXT_CACHE_MARGIN:
+                return entry["name"]
+        return None
+
+    def get(self, prefix, slot):
+        """
+        Get the name of the cache for a prompt prefix, creating it if needed.
+        Caches are created and deleted without holding the lock, so requests for other
+        slots aren't blocked by these API calls.
+
+        Args:
+            prefix: Static prompt prefix
+            slot: Prompt kind that uses the prefix
+
+        Returns:
+            Name of the cached content, or None if the prefix isn't cached
+        """
+        key = hashlib.sha256(f"{backend.model}\0{prefix}".encode()).hexdigest()
+        with self._lock:
+            if key in self._uncacheable:
+                return None
+            name = self._lookup(slot, key)
+            if name:
+                return name
+            slot_lock = self._slot_locks.setdefault(slot, threading.Lock())
+        # Only one thread creates the cache for a slot; the others wait and then use it
+        with slot_lock:
+            with self._lock:
+                if key in self._uncacheable:
+                    return None
+                name = self._lookup(slot, key)
+                if name:
+                    return name
+                # The prefix changed or the cache is about to expire
+                stale = self._slots.pop(slot, None)
+            if stale:
+                self._delete(stale["name"])
+            created = self._create(prefix)
+            with self._lock:
+                if created is None:
+                    self._uncacheable.add(key)
+                    return None
+                name, expires = created
+                self._slots[slot] = {"key": key, "name": name, "expires": expires}
+            return name
+
+    def invalidate(self, name):
+        """
+        Delete a cache (e.g. after a request using it failed) so it is re-created on next use.
+        """
+        with self._lock:
+            for slot, entry in list(self._slots.items()):
+                if entry["name"] == name:
+                    del self._slots[slot]
+        self._delete(name)
+
+    def clear(self):
+        """
+        Delete all caches created by this object.
+        """
+        with self._lock:
+            names = [entry["name"] for entry in self._slots.values()]
+        self.reset()
+        for name in names:
+            self._delete(name)
+
+    def reset(self):
+        """
+        Forget all caches without deleting them.
+        """
+        with self._lock:
+            self._slots.clear()
+            self._uncacheable.clear()
+
+
+# Context caching is off unless enabled with an environment variable
+context_cache = ContextCache(enabled=os.environ.get("NOTEWORTHY_CONTEXT_CACHE") == "1")
+
+
+# Latency percentile after which a duplicate request is sent
+HEDGE_PERCENTILE = 0.9
+# Seconds to wait before hedging until enough latencies are known
+HEDGE_DELAY = 5.0
+# Number of latencies needed to use the percentile
+HEDGE_MIN_SAMPLES = 20
+# Maximum number of hedged requests as a fraction of all requests
+HEDGE_BUDGET = 0.1
+
+
+class Hedger:
+    """
+    Hedged model requests to cut the long tail of response times.
+
+    If a request hasn't returned after the given percentile of recent response times for
+    its kind (or HEDGE_DELAY seconds before enough times are known), a duplicate request is
+    sent and the first successful response is used. The number of hedged requests is capped
+    at a fraction of all requests. The slower request can't be stopped once it has been
+    sent, so its response is discarded; a hedge that hasn't started yet is cancelled.
+
+    Response times are measured from when a request is sent: waiting for the local rate
+    limiter or for a worker thread doesn't count. No hedges are sent while requests are
+    waiting for the rate limiter, because a hedge would only add to the queue.
+
+    Enable it with NOTEWORTHY_HEDGE=1 or `hedger.enabled = True`.
+
+    Example:
+        hedger.enabled = True
+        classifier(old_revision, new_revision, "heuristic", use_cache=False)
+        get_hedge_stats()
+        # {'requests': 1, 'hedges': 0, 'hedge_wins': 0, 'over_budget': 0, 'rate_limited': 0, 'thresholds': {...}}
+    """
+
+    def __init__(
+        self,
+        enabled: bool = False,
+        percentile: float = HEDGE_PERCENTILE,
+        budget: float = HEDGE_BUDGET,
+        workers: int = 16,
+        limiter: str = "gemini",
+    ):
+        self.enabled = enabled
+        self.percentile = percentile
+        self.budget = budget
+        self.workers = workers
+        self.limiter = limiter
+        self._executor = None
+        # Kind -> recent response times in seconds
+        self._latencies = {}
+        self._lock = threading.Lock()
+        self.reset_stats()
+
+    def reset_stats(self):
+        """
+        Reset the counters of requests and hedges.
+        """
+        with self._lock:
+            self.requests = 0
+            self.hedges = 0
+            self.hedge_wins = 0
+            self.over_budget = 0
+            self.rate_limited = 0
+
+    def threshold(self, kind) -> float:
+        """
+        Get the seconds to wait before hedging a request of a kind.
+        """
+        with self._lock:
+            latencies = sorted(self._latencies.get(kind, []))
+        if len(latencies) < HEDGE_MIN_SAMPLES:
+            return HEDGE_DELAY
+        return latencies[int(self.percentile * (len(latencies) - 1))]
+
+    def _timed(self, function, kind, before, started):
+        """
+        Call a function and record its response time (only for successful calls).
+        The before function (e.g. waiting for the rate limiter) isn't timed.
+        """
+        try:
+            if before is not None:
+                before()
+        finally:
+            started.set()
+        start = time.perf_counter()
+        result = function()
+        with self._lock:
+            latencies = self._latencies.setdefault(kind, deque(maxlen=200))
+            latencies.append(time.perf_counter() - start)
+        return result
+
+    def _submit(self, function, kind, before=None):
+        """
+        Start a call in a worker thread (copying the context so Logfire spans nest).
+
+        Returns:
+            Tuple of (future, started): started is an event that is set when the request is sent
+        """
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix="hedge"
+                )
+        context = contextvars.copy_context()
+        started = threading.Event()
+        future = self._executor.submit(
+            context.run, self._timed, function, kind, before, started
+        )
+        return future, started
+
+    def _rate_limited(self) -> bool:
+        """
+        Check if requests are waiting for the rate limiter.
+        """
+        return self.limiter is not None and get_limiter(self.limiter).waiting > 0
+
+    def run(self, function, kind, before=None):
+        """
+        Call a function that sends a request, hedging it if it is slow.
+
+        Args:
+            function: Function without arguments that sends the request and returns the response
+            kind: Kind of request (response times are kept separately for each kind)
+            before: Function without arguments called before each request is sent, which
+              isn't included in the response time (e.g. waiting for the rate limiter)
+
+        Returns:
+            The first successful response
+        """
+        threshold = self.threshold(kind)
+        with self._lock:
+            self.requests += 1
+        primary, started = self._submit(function, kind, before)
+        # Start the hedge timer when the request is sent
+        started.wait()
+        done, _ = wait([primary], timeout=threshold)
+        if done:
+            return primary.result()
+        rate_limited = self._rate_limited()
+        with self._lock:
+            allowed = not rate_limited and self.hedges < self.budget * self.requests
+            if allowed:
+                self.hedges += 1
+            elif rate_limited:
+                self.rate_limited += 1
+            else:
+                self.over_budget += 1
+        if not allowed:
+            return primary.result()
+        logfire.info("Hedged request", kind=kind, threshold=threshold)
+        hedge, _ = self._submit(function, kind, before)
+        pending = {primary, hedge}
+        error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is not None:
+                    error = future.exception()
+                    continue
+                for loser in pending:
+                    loser.cancel()
+                if future is hedge:
+                    with self._lock:
+                        self.hedge_wins += 1
+                return future.result()
+        raise error
+
+    def stats(self) -> dict:
+        """
+        Get the number of requests, hedged requests, hedges that returned first, hedges
+        skipped because of the budget or because requests were waiting for the rate limiter,
+        and the current threshold for each kind.
+        """
+        thresholds = {kind: self.threshold(kind) for kind in list(self._latencies)}
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "hedges": self.hedges,
+                "hedge_wins": self.hedge_wins,
+                "over_budget": self.over_budget,
+                "rate_limited": self.rate_limited,
+                "thresholds": thresholds,
+            }
+
+
+# Hedging is off unless enabled with an environment variable
+hedger = Hedger(enabled=os.environ.get("NOTEWORTHY_HEDGE") == "1")
+
+
+def get_hedge_stats():
+    """
+    Get the counts of hedged model requests (see Hedger.stats()).
+    """
+    return hedger.stats()
+
+
+def generate_json(prompt, kind, use_cache=True, prefix=None, slot=None):
+    """
+    Generate a JSON response from the model, using the result cache.
+
+    Args:
+        prompt: Prompt text
+        kind: Kind of response: classifier or judge
+        use_cache: Use the result cache (False to resample the model without reading or
+          writing the cache; the cache is also off with NOTEWORTHY_LLM_CACHE=0)
+        prefix: Static start of the prompt that can be cached on the server (see ContextCache)
+        slot: Prompt kind that uses the prefix (default: kind)
+
+    Returns:
+        Dictionary parsed from the JSON response
+    """
+    key = _cache_key(prompt, kind)
+    use_cache = use_cache and USE_LLM_CACHE
+    if use_cache:
+        result = llm_cache.get(key)
+        if result is not None:
+            return result
+
+    contents = prompt
+    cache_name = None
+    # Send the full prompt without a cache if it doesn't start with the prefix
+    if prefix and context_cache.enabled and prompt.startswith(prefix):
+        cache_name = context_cache.get(prefix, slot or kind)
+    if cache_name:
+        # Send only the part of the prompt after the cached prefix
+        contents = prompt[len(prefix) :]
+
+    def request(rate_limit=True):
+        return backend.generate(
+            contents,
+            schema=response_schemas[kind],
+            cached_content=cache_name,
+            rate_limit=rate_limit,
+        )
+
+    try:
+        if hedger.enabled:
+            # Send a duplicate request if the response is slow (the hedger waits for the
+            # rate limiter before timing the request)
+            text = hedger.run(
+                lambda: request(rate_limit=False),
+                kind,
+                before=lambda: backend.wait_for_rate_limit(contents),
+            )
+        else:
+            text = request()
+    except Exception:
+        if cache_name:
+            # The cache may have been deleted on the server
+            context_cache.invalidate(cache_name)
+        raise
+    result = json.loads(text)
+
+    if use_cache:
+        llm_cache.set(key, result)
+    return result
 
 
 def get_latest_round():
@@ -51,51 +547,313 @@ def get_latest_round():
     return max_round
 
 
-@retry_with_backoff()
-def classifier(old_revision, new_revision, prompt_style):
+# Minimum time between checks for new or changed alignment files
+ALIGNMENT_CHECK_SECONDS = 10
+
+
+class AlignmentRegistry:
+    """
+    Alignment texts for the judge, read from disk once and reused.
+
+    The latest round and the modification time of each alignment file are checked at most
+    once every ALIGNMENT_CHECK_SECONDS, so a new round or an edited file is picked up
+    without doing filesystem work on every call. Judge prompt templates with the alignment
+    text already inserted are kept for each mode, round, and prompt mode.
+
+    Example:
+        alignments.latest_round()                       # 3
+        alignments.text("aligned-heuristic", round=2)   # Contents of production/alignment_2.txt
+        alignments.judge_template("aligned-heuristic")  # Judge prompt for the latest round
+    """
+
+    def __init__(self):
+        # File path -> (modification time, text)
+        self._texts = {}
+        # File path -> time of last modification check
+        self._checked = {}
+        self._latest_round = None
+        self._round_checked = 0.0
+        # (mode, round, prompt mode) -> (alignment text, judge prompt template)
+        self._templates = {}
+        self._lock = threading.RLock()
+
+    def latest_round(self) -> int:
+        """
+        Get the latest round of heuristic alignment (see get_latest_round()).
+        """
+        with self._lock:
+            now = time.monotonic()
+            if (
+                self._latest_round is None
+                or now - self._round_checked > ALIGNMENT_CHECK_SECONDS
+            ):
+                self._latest_round = get_latest_round()
+                self._round_checked = now
+            return self._latest_round
+
+    @staticmethod
+    def path(mode, round=None):
+        """
+        Get the path of the alignment file for a judge mode and round (None for no file).
+        """
+        if mode == "unaligned":
+            return None
+        elif mode == "aligned-fewshot":
+            return "development/alignment_fewshot.txt"
+        elif mode == "aligned-heuristic":
+            return f"production/alignment_{str(round)}.txt"
+        else:
+            raise ValueError(f"Unknown mode: {mode}")
+
+    def text(self, mode, round=None) -> str:
+        """
+        Get the alignment text for a judge mode and round (None for latest).
+        """
+        if mode == "aligned-heuristic" and round is None:
+            round = self.latest_round()
+        path = self.path(mode, round)
+        if path is None:
+            return ""
+        with self._lock:
+            now = time.monotonic()
+            if (
+                path not in self._texts
+                or now - self._checked[path] > ALIGNMENT_CHECK_SECONDS
+            ):
+                mtime = os.path.getmtime(path)
+                if path not in self._texts or self._texts[path][0] != mtime:
+                    with open(path, "r") as file:
+                        lines = file.readlines()
+                        self._texts[path] = (mtime, "".join(lines))
+                self._checked[path] = now
+            return self._texts[path][1]
+
+    def judge_template(self, mode, round=None, prompt_mode="full") -> PromptTemplate:
+        """
+        Get the judge prompt template with the alignment text for a judge mode and round (None for latest).
+        The revisions and rationales are added with the template's fill() method.
+        """
+        if mode == "aligned-heuristic" and round is None:
+            round = self.latest_round()
+        alignment_text = self.text(mode, round)
+        with self._lock:
+            key = (mode, round, prompt_mode)
+            if key not in self._templates or self._templates[key][0] != alignment_text:
+                template = judge_template.partial(
+                    alignment_text=alignment_text,
+                    revisions=revisions_templates[prompt_mode],
+                )
+                self._templates[key] = (alignment_text, template)
+            return self._templates[key][1]
+
+    def clear(self):
+        """
+        Forget all loaded alignments (they are read again on next use).
+        """
+        with self._lock:
+            self._texts.clear()
+            self._checked.clear()
+            self._templates.clear()
+            self._latest_round = None
+
+
+# Alignments shared by all judge calls
+alignments = AlignmentRegistry()
+
+
+# Footnote markers like [1], [a], or [n 1], which follow a word, punctuation, or another
+# marker without a space (so bracketed text like "in [2024]" isn't a marker)
+REFERENCE_MARKER = re.compile(r"(?<=\S)(?:\[(?:[a-z]+ ?)?\d+\]|\[[a-z]\])")
+# Explanation returned when the models are skipped
+SHORTCUT_RATIONALE = "Shortcut: the revisions are identical after normalizing whitespace and reference markers."
+
+
+def normalize_revision(text):
+    """
+    Remove reference markers and collapse whitespace in the text of a revision.
+    """
+    text = REFERENCE_MARKER.sub("", text)
+    return " ".join(text.split())
+
+
+def _tag_shortcut():
+    """
+    Mark the current Logfire span (e.g. "Run heuristic classifier") as a shortcut result.
+    """
+    trace.get_current_span().set_attribute("shortcut", True)
+
+
+def equivalent_revisions(old_revision, new_revision):
+    """
+    Check if revisions have the same text apart from whitespace and reference markers.
+    The differences between such revisions are not noteworthy, so the models aren't needed.
+    """
+    if old_revision == new_revision:
+        return True
+    return normalize_revision(old_revision) == normalize_revision(new_revision)
+
+
+# Number of unchanged words shown before and after each change in diff mode
+DIFF_CONTEXT_WORDS = 8
+
+
+def diff_revisions(old_revision, new_revision, context=DIFF_CONTEXT_WORDS):
+    """
+    Get a word-level diff of two revisions with only the changes and nearby unchanged text.
+
+    Deleted words are marked as [-deleted-], inserted words as {+inserted+}, and
+    unchanged text more than context words away from a change is replaced by "...".
+
+    Example:
+        diff_revisions("He was an English composer.", "He was an English composer and organist.")
+        # 'He was an English [-composer.-] {+composer and organist.+}'
+    """
+    old_words = old_revision.split()
+    new_words = new_revision.split()
+    matcher = difflib.SequenceMatcher(a=old_words, b=new_words, autojunk=False)
+    opcodes = matcher.get_opcodes()
+    parts = []
+    for i, (tag, i1, i2, j1, j2) in enumerate(opcodes):
+        if tag == "equal":
+            words = old_words[i1:i2]
+            # Keep context after the previous change and before the next change
+            head = words[:context] if i > 0 else []
+            tail = words[-context:] if i < len(opcodes) - 1 else []
+            if len(words) > len(head) + len(tail):
+                parts.extend(part for part in [" ".join(head), "..."] if part)
+                if tail:
+                    parts.append(" ".join(tail))
+            else:
+                parts.append(" ".join(words))
+            continue
+        if i1 < i2:
+            parts.append("[-" + " ".join(old_words[i1:i2]) + "-]")
+        if j1 < j2:
+            parts.append("{+" + " ".join(new_words[j1:j2]) + "+}")
+    return " ".join(parts)
+
+
+def changed_words(old_revision, new_revision):
+    """
+    Count the words that changed between two revisions (the larger of the deleted and
+    inserted words for each change). This is a cheap local score of how much the text changed.
+
+    Example:
+        changed_words("He was an English composer.", "He was an English composer and organist.")
+        # 3
+    """
+    matcher = difflib.SequenceMatcher(
+        a=old_revision.split(), b=new_revision.split(), autojunk=False
+    )
+    return sum(
+        max(i2 - i1, j2 - j1)
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes()
+        if tag != "equal"
+    )
+
+
+def revision_values(old_revision, new_revision, prompt_mode="full"):
+    """
+    Get the values for the revision placeholders in a prompt template.
+
+    Args:
+        old_revision: Old revision of article
+        new_revision: New revision of article
+        prompt_mode: full (both revisions) or diff (changes with nearby unchanged text)
+    """
+    if prompt_mode == "full":
+        return {"old_revision": old_revision, "new_revision": new_revision}
+    elif prompt_mode == "diff":
+        return {"differences": diff_revisions(old_revision, new_revision)}
+    else:
+        raise ValueError(f"Unknown prompt mode: {prompt_mode}")
+
+
+def make_classifier_prompt(
+    old_revision, new_revision, prompt_style, prompt_mode="full"
+):
+    """
+    Make the prompt for a classifier. See classifier() for the arguments.
+    """
+    # Get prompt template for given style
+    template = classifier_templates[(prompt_style, prompt_mode)]
+
+    # Add article revisions to prompt
+    return template.fill(**revision_values(old_revision, new_revision, prompt_mode))
+
+
+@retry_with_backoff(max_elapsed=30, breaker="model", policies=MODEL_POLICIES)
+def classifier(
+    old_revision, new_revision, prompt_style, use_cache=True, prompt_mode="full"
+):
     """
     Classify noteworthy differences between revisions of a Wikipedia article
 
     Args:
         old_revision: Old revision of article
         new_revision: New revision of article
+        prompt_style: Prompt style: heuristic or few-shot
+        use_cache: Use cached result for an identical request
+        prompt_mode: Revisions in prompt: full (both revisions) or diff (only changes and nearby text)
 
     Returns:
         noteworthy: True if the differences are noteworthy; False if not
         rationale: One-sentence rational for the classification
+        shortcut: True if the model was skipped for equivalent revisions (only present in that case)
     """
 
     # Return None for missing revisions
     if not pd.notna(old_revision) or not pd.notna(new_revision):
         return {"noteworthy": None, "rationale": None}
 
-    # Get prompt template for given style
-    prompt_template = classifier_prompts[prompt_style]
+    # Skip the model for equivalent revisions
+    if equivalent_revisions(old_revision, new_revision):
+        _tag_shortcut()
+        return {"noteworthy": False, "rationale": SHORTCUT_RATIONALE, "shortcut": True}
 
-    # Add article revisions to prompt
-    prompt = prompt_template.replace("{{old_revision}}", old_revision).replace(
-        "{{new_revision}}", new_revision
+    prompt = make_classifier_prompt(
+        old_revision, new_revision, prompt_style, prompt_mode
     )
 
-    # Define response schema
-    class Response(BaseModel):
-        noteworthy: bool
-        rationale: str
-
-    # Generate response
-    response = client.models.generate_content(
-        model="gemini-2.5-flash",
-        contents=prompt,
-        config=types.GenerateContentConfig(
-            response_mime_type="application/json",
-            response_schema=Response.model_json_schema(),
-        ),
+    # Generate response (the instructions before the revisions are a static prefix)
+    prefix = classifier_templates[(prompt_style, prompt_mode)].prefix
+    return generate_json(
+        prompt,
+        "classifier",
+        use_cache=use_cache,
+        prefix=prefix,
+        slot=f"classifier:{prompt_style}:{prompt_mode}",
     )
 
-    return json.loads(response.text)
+
+def make_judge_prompt(
+    old_revision,
+    new_revision,
+    rationale_1,
+    rationale_2,
+    mode="aligned-heuristic",
+    round=None,
+    prompt_mode="full",
+    template=None,
+):
+    """
+    Make the prompt for the judge. See judge() for the arguments.
+    Pass the template from alignments.judge_template() to use the same template
+    for the prompt and its cached prefix (the latest round may change between calls).
+    """
+    # Get prompt template with alignment text
+    if template is None:
+        template = alignments.judge_template(mode, round, prompt_mode)
+
+    # Add article revisions and rationales to prompt
+    return template.fill(
+        model_1_rationale=rationale_1,
+        model_2_rationale=rationale_2,
+        **revision_values(old_revision, new_revision, prompt_mode),
+    )
 
 
-@retry_with_backoff()
+@retry_with_backoff(max_elapsed=30, breaker="model", policies=MODEL_POLICIES)
 def judge(
     old_revision,
     new_revision,
@@ -103,6 +861,8 @@ def judge(
     rationale_2,
     mode="aligned-heuristic",
     round=None,
+    use_cache=True,
+    prompt_mode="full",
 ):
     """
     AI judge to settle disagreements between classification models
@@ -114,54 +874,174 @@ def judge(
         rationale_2: Rationale provided by model 2 (i.e., few-shot prompt)
         mode: Prompt mode: unaligned, aligned-fewshot, or aligned-heuristic
         round: Round to use for heuristic alignment (None for latest)
+        use_cache: Use cached result for an identical request
+        prompt_mode: Revisions in prompt: full (both revisions) or diff (only changes and nearby text)
 
     Returns:
         noteworthy: True if the differences are noteworthy; False if not
         reasoning: One-sentence reason for the judgment
+        shortcut: True if the model was skipped for equivalent revisions (only present in that case)
     """
 
-    prompt = judge_prompt
-    # Add article revisions to prompt
-    prompt = prompt.replace("{{old_revision}}", old_revision).replace(
-        "{{new_revision}}", new_revision
+    # Skip the model for equivalent revisions
+    if equivalent_revisions(old_revision, new_revision):
+        _tag_shortcut()
+        return {"noteworthy": False, "reasoning": SHORTCUT_RATIONALE, "shortcut": True}
+
+    # Get the template once so the prompt and prefix are for the same round
+    template = alignments.judge_template(mode, round, prompt_mode)
+    prompt = make_judge_prompt(
+        old_revision,
+        new_revision,
+        rationale_1,
+        rationale_2,
+        mode,
+        round,
+        prompt_mode,
+        template=template,
     )
-    # Add rationales to prompt
-    prompt = prompt.replace("{{model_1_rationale}}", rationale_1).replace(
-        "{{model_2_rationale}}", rationale_2
+
+    # Generate response (the instructions and alignment text before the revisions are a static prefix)
+    return generate_json(
+        prompt,
+        "judge",
+        use_cache=use_cache,
+        prefix=template.prefix,
+        slot=f"judge:{mode}:{round}:{prompt_mode}",
     )
 
-    # Optionally add alignment text to prompt
-    if mode == "unaligned":
-        alignment_text = ""
-    elif mode == "aligned-fewshot":
-        with open("development/alignment_fewshot.txt", "r") as file:
-            lines = file.readlines()
-            alignment_text = "".join(lines)
-    elif mode == "aligned-heuristic":
-        # Use latest round if round is None
-        if round is None:
-            round = get_latest_round()
-        with open(f"production/alignment_{str(round)}.txt", "r") as file:
-            lines = file.readlines()
-            alignment_text = "".join(lines)
-    else:
-        raise ValueError(f"Unknown mode: {mode}")
-
-    prompt = prompt.replace("{{alignment_text}}", alignment_text)
-
-    # Define response schema
-    class Response(BaseModel):
-        noteworthy: bool
-        reasoning: str
-
-    # Generate response
-    response = client.models.generate_content(
-        model="gemini-2.5-flash",
-        contents=prompt,
-        config=types.GenerateContentConfig(
-            response_mime_type="application/json",
-            response_schema=Response.model_json_schema(),
-        ),
+
+# Default number of worker threads for classify_many() and judge_many()
+MAX_WORKERS = 8
+
+
+def _map_ordered(function, items, workers=MAX_WORKERS, return_exceptions=False):
+    """
+    Run a function on items in worker threads and yield the results in input order.
+
+    Items are taken from the iterable as workers become free (at most twice as many
+    calls are pending as there are workers), so long or lazy iterables are streamed.
+    Each result is yielded as soon as it and all earlier results are done.
+
+    Args:
+        function: Function that takes one item
+        items: Iterable of items
+        workers: Number of worker threads
+        return_exceptions: Yield exceptions in place of results instead of raising them
+    """
+    items = iter(items)
+    pending = deque()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+
+        def submit():
+            for item in items:
+                # Copy the context so Logfire spans in the calls nest under the caller's span
+                context = contextvars.copy_context()
+                pending.append(executor.submit(context.run, function, item))
+                if len(pending) >= 2 * workers:
+                    break
+
+        try:
+            submit()
+            while pending:
+                future = pending.popleft()
+                try:
+                    result = future.result()
+                except Exception as e:
+                    if not return_exceptions:
+                        raise
+                    result = e
+                submit()
+                yield result
+        finally:
+            # Don't start calls that haven't started yet if the caller stops early
+            for future in pending:
+                future.cancel()
+
+
+def classify_many(
+    pairs,
+    styles=("heuristic", "few-shot"),
+    workers=MAX_WORKERS,
+    use_cache=True,
+    prompt_mode="full",
+    return_exceptions=False,
+):
+    """
+    Classify the differences between many pairs of revisions concurrently.
+
+    Args:
+        pairs: Iterable of (old_revision, new_revision) tuples
+        styles: Prompt styles to run for each pair
+        workers: Number of concurrent classifier calls
+        use_cache: Use cached results for identical requests
+        prompt_mode: Revisions in prompt: full or diff
+        return_exceptions: Yield exceptions in place of failed results instead of raising them
+
+    Yields:
+        A dictionary for each pair (in input order) with the result of classifier() for each style
+
+    Example:
+        pairs = [(old_revision, new_revision), (older_revision, new_revision)]
+        for results in classify_many(pairs):
+            print(results["heuristic"]["noteworthy"], results["few-shot"]["noteworthy"])
+    """
+    styles = list(styles)
+    calls = (
+        (old_revision, new_revision, style)
+        for old_revision, new_revision in pairs
+        for style in styles
     )
 
-    return json.loads(response.text)
+    def run(call):
+        old_revision, new_revision, style = call
+        return classifier(old_revision, new_revision, style, use_cache, prompt_mode)
+
+    results = {}
+    for result in _map_ordered(run, calls, workers, return_exceptions):
+        results[styles[len(results)]] = result
+        if len(results) == len(styles):
+            yield results
+            results = {}
+
+
+def judge_many(
+    rows,
+    mode="aligned-heuristic",
+    round=None,
+    workers=MAX_WORKERS,
+    use_cache=True,
+    prompt_mode="full",
+    return_exceptions=False,
+    span_names=None,
+):
+    """
+    Run the judge on many examples concurrently.
+
+    Args:
+        rows: Iterable of (old_revision, new_revision, rationale_1, rationale_2) tuples
+        mode: Prompt mode: unaligned, aligned-fewshot, or aligned-heuristic
+        round: Round to use for heuristic alignment (None for latest)
+        workers: Number of concurrent judge calls
+        use_cache: Use cached results for identical requests
+        prompt_mode: Revisions in prompt: full or diff
+        return_exceptions: Yield exceptions in place of failed results instead of raising them
+        span_names: Iterable of Logfire span names for the rows (e.g. page titles), so each
+          judge call is traced in its own span (None for no spans)
+
+    Yields:
+        The result of judge() for each row, in input order
+    """
+
+    def run(item):
+        row, span_name = item
+        if span_name is None:
+            return judge(*row, mode, round, use_cache, prompt_mode)
+        with logfire.span(span_name):
+            return judge(*row, mode, round, use_cache, prompt_mode)
+
+    if span_names is None:
+        items = ((row, None) for row in rows)
+    else:
+        items = zip(rows, span_names)
+    yield from _map_ordered(run, items, workers, return_exceptions)
@@ -1,3 +1,24 @@
+import re
+
+# Full text of the revisions
+revisions_full = """<old_revision>
+{{old_revision}}
+</old_revision>
+
+<new_revision>
+{{new_revision}}
+</new_revision>"""
+
+# Differences between the revisions (for prompt_mode="diff")
+revisions_diff = """The differences between the old and new revisions are shown instead of the full text of both revisions.
+Unchanged text is shown only near the changes, and "..." marks unchanged text that is left out.
+Text that is only in the old revision is marked as [-deleted text-].
+Text that is only in the new revision is marked as {+inserted text+}.
+
+<differences>
+{{differences}}
+</differences>"""
+
 skeleton = """
 You are a reading assistant tasked with finding noteworthy differences between revisions of a Wikipedia article.
 Decide if the differences between the old and new revisions are noteworthy.
@@ -8,13 +29,7 @@ Return a JSON-formatted response with keys for:
     - 'noteworthy' (True if differences between revisions are noteworthy or False if they are not)
     - 'rationale' (one sentence explaining why the differences are or are not noteworthy, including a summary of the differences)
 
-<old_revision>
-{{old_revision}}
-</old_revision>
-
-<new_revision>
-{{new_revision}}
-</new_revision>
+{{revisions}}
 """
 
 classifier_prompts = {
@@ -73,13 +88,7 @@ Return a JSON-formatted response with keys for:
     - 'noteworthy' (True if differences between revisions are noteworthy or False if they are not)
     - 'reasoning' (one sentence explaining how you made the judgment)
 
-<old_revision>
-{{old_revision}}
-</old_revision>
-
-<new_revision>
-{{new_revision}}
-</new_revision>
+{{revisions}}
 
 <model_1_rationale>
 {{model_1_rationale}}
@@ -108,3 +117,89 @@ Respond only with the updated alignment text.
 {{feedback_data}}
 </feedback_data>
 """
+
+
+class PromptTemplate:
+    """
+    Prompt template split into static segments at its {{placeholders}}.
+
+    The template is parsed once, and a prompt is made with a single join.
+    Values are inserted as literal text (placeholders in the values are not replaced).
+
+    Example:
+        template = PromptTemplate("Old: {{old}}\nNew: {{new}}")
+        template.fill(old="A", new="B")  # 'Old: A\nNew: B'
+    """
+
+    PLACEHOLDER = re.compile(r"\{\{(\w+)\}\}")
+
+    def __init__(self, text=None, segments=None, names=None):
+        if text is not None:
+            parts = self.PLACEHOLDER.split(text)
+            segments, names = parts[0::2], parts[1::2]
+        # There is one more segment than names; names[i] goes between segments[i] and segments[i + 1]
+        self.segments = segments
+        self.names = names
+
+    def fill(self, **values) -> str:
+        """
+        Make the prompt with values for all the placeholders.
+        """
+        pieces = [self.segments[0]]
+        for name, segment in zip(self.names, self.segments[1:]):
+            pieces.append(values[name])
+            pieces.append(segment)
+        return "".join(pieces)
+
+    def partial(self, **values) -> "PromptTemplate":
+        """
+        Make a new template with values for some of the placeholders.
+        A value can be text or another template, whose placeholders are kept.
+        """
+        segments = [self.segments[0]]
+        names = []
+        for name, segment in zip(self.names, self.segments[1:]):
+            value = values.get(name)
+            if value is None:
+                names.append(name)
+                segments.append(segment)
+                continue
+            if isinstance(value, str):
+                value = PromptTemplate(segments=[value], names=[])
+            # Join the first and last segments of the value with the neighboring segments
+            segments[-1] += value.segments[0]
+            names.extend(value.names)
+            segments.extend(value.segments[1:])
+            segments[-1] += segment
+        return PromptTemplate(segments=segments, names=names)
+
+    @property
+    def prefix(self) -> str:
+        """
+        Static text before the first placeholder (the same for every prompt made from the template).
+        """
+        return self.segments[0]
+
+    @property
+    def text(self) -> str:
+        """
+        Template text with the remaining placeholders.
+        """
+        return self.fill(**{name: "{{" + name + "}}" for name in self.names})
+
+
+# Revisions block for each prompt mode
+revisions_templates = {
+    "full": PromptTemplate(revisions_full),
+    "diff": PromptTemplate(revisions_diff),
+}
+
+# Classifier templates for each prompt style and prompt mode
+classifier_templates = {
+    (prompt_style, prompt_mode): PromptTemplate(prompt).partial(revisions=revisions)
+    for prompt_style, prompt in classifier_prompts.items()
+    for prompt_mode, revisions in revisions_templates.items()
+}
+
+# Judge template (the alignment text is added for each mode and round)
+judge_template = PromptTemplate(judge_prompt)
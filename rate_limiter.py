@@ -0,0 +1,212 @@
+"""
+Process-wide rate limiters for the upstream APIs (Gemini and Wikipedia).
+
+Each upstream has a token-bucket limiter with a budget of requests per second and,
+optionally, tokens per minute. Every call acquires from the limiter before sending the
+request, so concurrent app users, batch helpers, and scripts share one budget instead of
+all running into 429 errors and backing off together. Callers that must wait are queued
+in order of arrival, and the time spent waiting is recorded.
+
+Example:
+    from rate_limiter import acquire, configure_limiter, get_rate_limiter_stats
+
+    configure_limiter("wikipedia", rps=2)
+    acquire("wikipedia")               # Wait for a Wikipedia request slot
+    acquire("gemini", tokens=1500)     # Wait for a Gemini request slot and 1500 tokens
+    get_rate_limiter_stats()
+    # {'gemini': {'requests': 1, 'tokens': 1500, 'waiting': 0, 'mean_wait': 0.0, 'max_wait': 0.0}, ...}
+"""
+
+import threading
+import asyncio
+import time
+import os
+
+# Default budgets for each upstream (None for no limit)
+DEFAULT_LIMITS = {
+    "gemini": {
+        "rps": float(os.environ.get("NOTEWORTHY_MODEL_RPS", 5)),
+        "tpm": float(os.environ.get("NOTEWORTHY_MODEL_TPM", 1000000)),
+    },
+    "wikipedia": {
+        "rps": float(os.environ.get("NOTEWORTHY_WIKIPEDIA_RPS", 10)),
+        "tpm": None,
+    },
+}
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate the number of model tokens in a text (about four characters per token).
+    """
+    return len(text) // 4 + 1
+
+
+class TokenBucketLimiter:
+    """
+    Rate limiter with token buckets for requests per second and tokens per minute.
+
+    The request bucket holds up to burst requests (default: one second of requests), and
+    the token bucket holds up to one minute of tokens. A call reserves its share of both
+    buckets and then waits until the reservation is covered, so waiting callers are served
+    in order of arrival. One limiter can be shared between threads and event loops.
+
+    Args:
+        name: Name of the upstream (for stats)
+        rps: Requests per second (None for no limit)
+        tpm: Tokens per minute (None for no limit)
+        burst: Maximum number of requests sent at once after an idle period
+    """
+
+    def __init__(self, name: str, rps: float = None, tpm: float = None, burst=None):
+        self.name = name
+        self._lock = threading.Lock()
+        self.configure(rps, tpm, burst)
+        self.reset_stats()
+
+    def configure(self, rps: float = None, tpm: float = None, burst=None):
+        """
+        Change the budgets (the buckets start full).
+        """
+        with self._lock:
+            self.rps = rps
+            self.tpm = tpm
+            self.burst = burst or max(1.0, rps or 1.0)
+            self._updated = time.monotonic()
+            self._requests = self.burst
+            self._tokens = tpm or 0.0
+
+    def reset_stats(self):
+        """
+        Reset the counters of requests, tokens, and waiting time.
+        """
+        with self._lock:
+            self.requests = 0
+            self.tokens = 0
+            self.waiting = 0
+            self.total_wait = 0.0
+            self.max_wait = 0.0
+
+    def _reserve(self, tokens: int) -> float:
+        """
+        Take a request and tokens from the buckets and get the seconds to wait until they are available.
+        """
+        with self._lock:
+            now = time.monotonic()
+            elapsed = now - self._updated
+            self._updated = now
+            wait = 0.0
+            if self.rps:
+                self._requests = min(self.burst, self._requests + elapsed * self.rps)
+                self._requests -= 1
+                if self._requests < 0:
+                    wait = -self._requests / self.rps
+            if self.tpm:
+                # A request can't use more than the whole bucket
+                tokens = min(tokens, self.tpm)
+                self._tokens = min(self.tpm, self._tokens + elapsed * self.tpm / 60)
+                self._tokens -= tokens
+                if self._tokens < 0:
+                    wait = max(wait, -self._tokens / (self.tpm / 60))
+            self.requests += 1
+            self.tokens += tokens
+            if wait > 0:
+                self.waiting += 1
+            return wait
+
+    def _record_wait(self, wait: float):
+        """
+        Record the time a caller waited.
+        """
+        with self._lock:
+            if wait > 0:
+                self.waiting -= 1
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+
+    def acquire(self, tokens: int = 0) -> float:
+        """
+        Wait until a request with a number of tokens is allowed.
+
+        Returns:
+            Seconds spent waiting
+        """
+        wait = self._reserve(tokens)
+        # Record the wait even if the caller is cancelled or interrupted while waiting
+        try:
+            if wait > 0:
+                time.sleep(wait)
+        finally:
+            self._record_wait(wait)
+        return wait
+
+    async def acquire_async(self, tokens: int = 0) -> float:
+        """
+        Wait until a request with a number of tokens is allowed, without blocking the event loop.
+
+        Returns:
+            Seconds spent waiting
+        """
+        wait = self._reserve(tokens)
+        # Record the wait even if the caller is cancelled or interrupted while waiting
+        try:
+            if wait > 0:
+                await asyncio.sleep(wait)
+        finally:
+            self._record_wait(wait)
+        return wait
+
+    def stats(self) -> dict:
+        """
+        Get the number of requests and tokens, the number of callers now waiting,
+        and the mean and maximum waiting time in seconds.
+        """
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "tokens": self.tokens,
+                "waiting": self.waiting,
+                "mean_wait": self.total_wait / self.requests if self.requests else 0.0,
+                "max_wait": self.max_wait,
+            }
+
+
+# Limiter for each upstream, shared by the whole process
+limiters = {
+    name: TokenBucketLimiter(name, **limits) for name, limits in DEFAULT_LIMITS.items()
+}
+
+
+def get_limiter(name: str) -> TokenBucketLimiter:
+    """
+    Get the limiter for an upstream (gemini or wikipedia).
+    """
+    return limiters[name]
+
+
+def configure_limiter(name: str, rps: float = None, tpm: float = None, burst=None):
+    """
+    Change the budgets for an upstream (None for no limit).
+    """
+    limiters[name].configure(rps, tpm, burst)
+
+
+def acquire(name: str, tokens: int = 0) -> float:
+    """
+    Wait until a request to an upstream is allowed. See TokenBucketLimiter.acquire().
+    """
+    return limiters[name].acquire(tokens)
+
+
+async def acquire_async(name: str, tokens: int = 0) -> float:
+    """
+    Wait until a request to an upstream is allowed. See TokenBucketLimiter.acquire_async().
+    """
+    return await limiters[name].acquire_async(tokens)
+
+
+def get_rate_limiter_stats() -> dict:
+    """
+    Get the stats for each upstream (see TokenBucketLimiter.stats()).
+    """
+    return {name: limiter.stats() for name, limiter in limiters.items()}
@@ -1,41 +1,372 @@
 import time
+import asyncio
+import inspect
 import functools
+import threading
 import random
+import json
+import re
+
+# Seconds to wait before retrying (from Retry-After headers or RetryInfo details)
+RETRY_DELAY = re.compile(r"^\s*(\d+(?:\.\d+)?)s?\s*$")
+# HTTP status codes that are worth retrying (timeouts, rate limits, and server errors)
+RETRYABLE_STATUS = {408, 429, 500, 502, 503, 504}
+
+
+class RetryPolicy:
+    """
+    How to retry an exception class.
+
+    Args:
+        retry: Retry the exception (False to raise it at once)
+        max_retries: Maximum number of retries (None for the decorator's value)
+        base_delay: Initial delay in seconds (None for the decorator's value)
+    """
+
+    def __init__(self, retry=True, max_retries=None, base_delay=None):
+        self.retry = retry
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+
+
+class CircuitOpenError(Exception):
+    """
+    Raised without calling the function while the circuit breaker for an upstream is open.
+    """
+
+
+# Exceptions that give the same result when retried: invalid responses and programming errors
+DEFAULT_POLICIES = {
+    json.JSONDecodeError: RetryPolicy(retry=False),
+    TypeError: RetryPolicy(retry=False),
+    KeyError: RetryPolicy(retry=False),
+    FileNotFoundError: RetryPolicy(retry=False),
+    CircuitOpenError: RetryPolicy(retry=False),
+}
+try:
+    from pydantic import ValidationError
+
+    DEFAULT_POLICIES[ValidationError] = RetryPolicy(retry=False)
+except ImportError:
+    pass
+
+
+def status_code(exception):
+    """
+    Get the HTTP status code of an exception from Gemini, requests, or httpx (None if not known).
+    """
+    # Gemini API errors have the status in code
+    code = getattr(exception, "code", None)
+    if isinstance(code, int):
+        return code
+    response = getattr(exception, "response", None)
+    return getattr(response, "status_code", None)
+
+
+def retry_after(exception):
+    """
+    Get the delay in seconds the server asked for in an error (None if not given).
+    Looks for a Retry-After header and for RetryInfo details in Gemini errors.
+    """
+    response = getattr(exception, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    match = RETRY_DELAY.match(str(headers.get("Retry-After", "")))
+    if match:
+        return float(match.group(1))
+    # Gemini errors include e.g. {"@type": "type.googleapis.com/google.rpc.RetryInfo", "retryDelay": "17s"}
+    details = getattr(exception, "details", None)
+    if isinstance(details, dict):
+        details = details.get("error", details).get("details", [])
+    for detail in details if isinstance(details, list) else []:
+        if isinstance(detail, dict) and "retryDelay" in detail:
+            match = RETRY_DELAY.match(str(detail["retryDelay"]))
+            if match:
+                return float(match.group(1))
+    return None
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker that fails fast while an upstream is down.
+
+    After failure_threshold consecutive failures, the circuit opens and calls raise
+    CircuitOpenError without running. After reset_timeout seconds, one trial call is
+    allowed (half-open); the circuit closes if it succeeds and opens again if it fails.
+    """
+
+    def __init__(self, name, failure_threshold=5, reset_timeout=30):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened = None
+        self._trial = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        """
+        State of the circuit: closed, open, or half-open.
+        """
+        if self.opened is None:
+            return "closed"
+        if time.monotonic() - self.opened < self.reset_timeout:
+            return "open"
+        return "half-open"
+
+    def before_call(self):
+        """
+        Raise CircuitOpenError if calls aren't allowed now.
+
+        Returns:
+            True if this call is the half-open trial call, False otherwise
+        """
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return False
+            if state == "half-open" and not self._trial:
+                self._trial = True
+                return True
+        _record(self.name, "breaker_rejected")
+        raise CircuitOpenError(f"Circuit breaker for {self.name} is open")
+
+    def success(self):
+        """
+        Record a successful call (closes the circuit).
+        """
+        with self._lock:
+            if self.opened is not None:
+                _record(self.name, "breaker_closed")
+            self.failures = 0
+            self.opened = None
+            self._trial = False
+
+    def release(self):
+        """
+        End a half-open trial call without a result (e.g. when it is cancelled), so the
+        next call can be a trial. Only the trial call (before_call() returned True) may
+        release it; other calls ending early leave a running trial alone.
+        """
+        with self._lock:
+            self._trial = False
+
+    def failure(self):
+        """
+        Record a failed call (opens the circuit after too many failures).
+        """
+        with self._lock:
+            self.failures += 1
+            if self._trial or self.failures >= self.failure_threshold:
+                if self.opened is None or self._trial:
+                    _record(self.name, "breaker_opened")
+                self.opened = time.monotonic()
+                self._trial = False
+
+
+# Circuit breaker for each upstream
+breakers = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(name, failure_threshold=5, reset_timeout=30):
+    """
+    Get the circuit breaker for an upstream, creating it if needed.
+    """
+    with _breakers_lock:
+        if name not in breakers:
+            breakers[name] = CircuitBreaker(name, failure_threshold, reset_timeout)
+        return breakers[name]
+
+
+def reset_breaker(name):
+    """
+    Forget the circuit breaker for an upstream (e.g. when it is replaced), so the next
+    call gets a closed breaker.
+    """
+    with _breakers_lock:
+        breakers.pop(name, None)
+
+
+# Counters of calls, retries, and breaker events for each function or upstream
+_stats = {}
+_stats_lock = threading.Lock()
+
+
+def _record(name, event):
+    """
+    Count a retry or breaker event.
+    """
+    with _stats_lock:
+        counts = _stats.setdefault(name, {})
+        counts[event] = counts.get(event, 0) + 1
+
+
+def get_retry_stats():
+    """
+    Get the counts of calls, retries, giveups (exceptions raised to the caller),
+    and breaker events (breaker_opened, breaker_closed, breaker_rejected) by name.
+    """
+    with _stats_lock:
+        return {name: dict(counts) for name, counts in _stats.items()}
+
+
+def clear_retry_stats():
+    """
+    Reset the retry and breaker counters.
+    """
+    with _stats_lock:
+        _stats.clear()
 
 
 def retry_with_backoff(
-    max_retries=5, base_delay=2, backoff_factor=2, exceptions=(Exception,)
+    max_retries=5,
+    base_delay=2,
+    backoff_factor=2,
+    exceptions=(Exception,),
+    policies=None,
+    max_delay=60,
+    max_elapsed=None,
+    breaker=None,
 ):
     """
-    Decorator to retry a function with exponential backoff.
+    Decorator to retry a function or coroutine function with exponential backoff.
+
+    Exceptions are looked up in the retry policies by class (including base classes).
+    Invalid responses and programming errors (see DEFAULT_POLICIES) and HTTP errors with
+    status codes that aren't worth retrying (e.g. 400 or 404) are raised at once.
+    If the server asks for a delay (Retry-After header or RetryInfo details), it is used
+    instead of the backoff delay. Coroutine functions wait with asyncio.sleep, so they
+    don't block the event loop.
 
     Args:
         max_retries (int): Maximum number of retries before giving up.
         base_delay (float): Initial delay in seconds before retrying.
         backoff_factor (float): Multiplier for delay after each failure.
         exceptions (tuple): Exception types to catch and retry on.
+        policies (dict): Exception class -> RetryPolicy (added to DEFAULT_POLICIES).
+        max_delay (float): Maximum delay in seconds before one retry.
+        max_elapsed (float): Give up instead of retrying after this many seconds (None for no limit).
+        breaker (str): Name of an upstream to use a shared circuit breaker (see get_breaker()).
+            The breaker is looked up for each call, so reset_breaker() takes effect at once.
+
+    Example:
+        @retry_with_backoff(max_retries=3, breaker="gemini")
+        async def generate(prompt):
+            ...
+
+        get_retry_stats()  # {'generate': {'calls': 2, 'retries': 1}, 'gemini': {...}}
     """
+    all_policies = dict(DEFAULT_POLICIES)
+    all_policies.update(policies or {})
+
+    def policy_for(exception):
+        for cls in type(exception).__mro__:
+            if cls in all_policies:
+                return all_policies[cls]
+        code = status_code(exception)
+        if code is not None and code >= 400 and code not in RETRYABLE_STATUS:
+            return RetryPolicy(retry=False)
+        return RetryPolicy()
 
     def decorator(func):
+        name = func.__qualname__
+
+        def handle(exception, attempt, delay, start, circuit):
+            """
+            Decide whether to retry after an exception and get the delay (None to raise).
+            """
+            policy = policy_for(exception)
+            retries = max_retries if policy.max_retries is None else policy.max_retries
+            if circuit:
+                # Only failures that may be caused by the upstream count for the breaker;
+                # other errors (e.g. an invalid response) show that the upstream is up
+                if policy.retry:
+                    circuit.failure()
+                else:
+                    circuit.success()
+            if not policy.retry or attempt >= retries:
+                _record(name, "giveups")
+                return None
+            if attempt == 1 and policy.base_delay is not None:
+                delay = policy.base_delay
+            wait = retry_after(exception)
+            wait = min(max_delay, delay if wait is None else wait)
+            if (
+                max_elapsed is not None
+                and time.monotonic() - start + wait > max_elapsed
+            ):
+                _record(name, "giveups")
+                return None
+            _record(name, "retries")
+            print(
+                f"[Retry {attempt}/{retries}] Error: {exception}. Retrying in {wait:.2f}s..."
+            )
+            return wait
+
+        if inspect.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                _record(name, "calls")
+                circuit = get_breaker(breaker) if breaker else None
+                delay = base_delay
+                attempt = 0
+                start = time.monotonic()
+                while True:
+                    trial = circuit.before_call() if circuit else False
+                    try:
+                        result = await func(*args, **kwargs)
+                    except exceptions as e:
+                        attempt += 1
+                        wait = handle(e, attempt, delay, start, circuit)
+                        if wait is None:
+                            raise
+                        await asyncio.sleep(wait)
+                        # Exponential backoff with jitter
+                        delay *= backoff_factor + random.uniform(0, 1)
+                        continue
+                    except BaseException:
+                        # Don't keep a half-open trial if the call is cancelled or interrupted
+                        if trial:
+                            circuit.release()
+                        raise
+                    if circuit:
+                        circuit.success()
+                    return result
+
+            return async_wrapper
+
         @functools.wraps(func)
         def wrapper(*args, **kwargs):
+            _record(name, "calls")
+            circuit = get_breaker(breaker) if breaker else None
             delay = base_delay
             attempt = 0
-            while attempt < max_retries:
+            start = time.monotonic()
+            while True:
+                trial = circuit.before_call() if circuit else False
                 try:
                     # Pass args and kwargs
-                    return func(*args, **kwargs)
+                    result = func(*args, **kwargs)
                 except exceptions as e:
                     attempt += 1
-                    if attempt >= max_retries:
-                        # Raise the last exception if max retries reached
+                    wait = handle(e, attempt, delay, start, circuit)
+                    if wait is None:
+                        # Raise the exception if it isn't retried or max retries reached
                         raise
-                    print(
-                        f"[Retry {attempt}/{max_retries}] Error: {e}. Retrying in {delay:.2f}s..."
-                    )
-                    time.sleep(delay)
+                    time.sleep(wait)
                     # Exponential backoff with jitter
                     delay *= backoff_factor + random.uniform(0, 1)
+                    continue
+                except BaseException:
+                    # Don't keep a half-open trial if the call is interrupted
+                    if trial:
+                        circuit.release()
+                    raise
+                if circuit:
+                    circuit.success()
+                return result
 
         return wrapper
 
@@ -0,0 +1,260 @@
+from wiki_data_fetcher import (
+    run_get_request,
+    get_revision_from_age,
+    get_revisions_behind,
+)
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Dict
+import threading
+import bisect
+import time
+
+# Revision metadata stored in the index
+RVPROP = "ids|timestamp|size"
+# Maximum number of revisions per request (API limit)
+RVLIMIT = 500
+# Maximum number of revisions behind the current one loaded for one page; older
+# revisions are looked up with the API by age or revid, and revision numbers are
+# limited to this range
+MAX_REVISIONS = 5000
+# Minimum time between checks for new revisions of a page
+REFRESH_SECONDS = 30
+# Maximum number of pages kept in memory
+MAX_TITLES = 200
+
+
+def _timestamp(age_days: float) -> str:
+    """
+    Get the timestamp (in API format) for an age in days.
+    """
+    target_date = datetime.now(timezone.utc) - timedelta(days=age_days)
+    return target_date.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+class RevisionIndex:
+    """
+    Local index of the revision history of a Wikipedia page.
+
+    Revisions (revid, timestamp, parentid, size) are loaded newest first, and older
+    revisions are loaded only when a lookup needs them. A refresh downloads only
+    the revisions newer than the head of the index. Lookups by revision number,
+    age, and revid use the loaded revisions without API calls.
+
+    Example:
+        index = get_revision_index("Albert Einstein")
+        index.revision(0)             # Current revision
+        index.revision(100)           # 100th revision before current
+        index.revision_from_age(10)   # Revision from 10 days ago
+        index.revisions_behind(index.revision(100)["revid"])  # 100
+    """
+
+    def __init__(self, title: str):
+        self.title = title
+        # Revisions oldest first (so new revisions are appended)
+        self._revisions = []
+        self._timestamps = []
+        # Position of each revid in self._revisions
+        self._positions = {}
+        # Continuation token for loading older revisions (None when complete)
+        self._continue = None
+        self._loaded = False
+        self._last_refresh = 0.0
+        self._lock = threading.RLock()
+
+    def _query(self, limit=RVLIMIT, **params) -> tuple:
+        """
+        Run a query for revisions of this page and return (revisions, continue token).
+        """
+        params.update(
+            action="query",
+            prop="revisions",
+            titles=self.title,
+            rvprop=RVPROP,
+            rvlimit=limit,
+            format="json",
+        )
+        json_data = run_get_request(params)
+        pages = json_data.get("query", {}).get("pages", {})
+        revisions = []
+        for page_id, page in pages.items():
+            if page_id != "-1":
+                revisions = page.get("revisions", [])
+        token = json_data.get("continue", {}).get("rvcontinue")
+        return revisions, token
+
+    def _rebuild(self):
+        """
+        Update the timestamp and revid lookups after revisions are added.
+        """
+        self._timestamps = [revision["timestamp"] for revision in self._revisions]
+        self._positions = {
+            revision["revid"]: i for i, revision in enumerate(self._revisions)
+        }
+
+    def _load_older(self) -> bool:
+        """
+        Load the next batch of older revisions. Returns False if there are no more to load.
+        """
+        # The current revision and MAX_REVISIONS revisions behind it
+        remaining = MAX_REVISIONS + 1 - len(self._revisions)
+        if self._loaded and (self._continue is None or remaining <= 0):
+            return False
+        params = {"rvdir": "older"}
+        if self._loaded:
+            params["rvcontinue"] = self._continue
+        revisions, self._continue = self._query(
+            limit=min(RVLIMIT, max(remaining, 1)), **params
+        )
+        if not self._loaded:
+            self._loaded = True
+            self._last_refresh = time.monotonic()
+        # Revisions are returned newest first
+        self._revisions = revisions[::-1] + self._revisions
+        self._rebuild()
+        return bool(revisions)
+
+    def refresh(self, force: bool = False):
+        """
+        Load revisions newer than the head of the index.
+        This is skipped if the index was refreshed in the last REFRESH_SECONDS unless force is True.
+        """
+        with self._lock:
+            if not self._loaded:
+                self._load_older()
+                return
+            if not force and time.monotonic() - self._last_refresh < REFRESH_SECONDS:
+                return
+            self._last_refresh = time.monotonic()
+            if not self._revisions:
+                # The page didn't exist when the index was created
+                self._loaded = False
+                self._load_older()
+                return
+            head = self._revisions[-1]
+            new_revisions = []
+            params = {"rvdir": "newer", "rvstart": head["timestamp"]}
+            while True:
+                revisions, token = self._query(**params)
+                new_revisions.extend(
+                    revision
+                    for revision in revisions
+                    if revision["revid"] not in self._positions
+                )
+                if not token:
+                    break
+                params["rvcontinue"] = token
+            if new_revisions:
+                self._revisions.extend(new_revisions)
+                self._rebuild()
+
+    def _info(self, position: int) -> Dict:
+        """
+        Revision info (as returned by extract_revision_info()) with revnum counted from the head.
+        """
+        revision = dict(self._revisions[position])
+        revision["revnum"] = len(self._revisions) - 1 - position
+        return revision
+
+    def revision(self, revnum: int = 0, limit_revnum: bool = True) -> Dict:
+        """
+        Get the revision a number of revisions before the current one.
+
+        Args:
+            revnum: Revision before current (0 for current)
+            limit_revnum: Limit revnum to earliest available revision
+
+        Returns:
+            Dictionary with revid, timestamp, parentid, size, and revnum
+            (None values if the page or revision is not found)
+        """
+        with self._lock:
+            self.refresh()
+            while revnum >= len(self._revisions) and self._load_older():
+                pass
+            if not self._revisions or (
+                revnum >= len(self._revisions) and not limit_revnum
+            ):
+                return {"revid": None, "timestamp": None, "revnum": None}
+            revnum = min(revnum, len(self._revisions) - 1)
+            return self._info(len(self._revisions) - 1 - revnum)
+
+    def revision_from_age(self, age_days: float = 0) -> Dict:
+        """
+        Get the most recent revision that is at least age_days old.
+
+        Returns:
+            Dictionary with revid, timestamp, parentid, size, and revnum
+            (None values if the page is not found or is newer than age_days)
+        """
+        target = _timestamp(age_days)
+        with self._lock:
+            self.refresh()
+            while (
+                not self._timestamps or self._timestamps[0] > target
+            ) and self._load_older():
+                pass
+            if not self._revisions:
+                return {"revid": None, "timestamp": None, "revnum": None}
+            position = bisect.bisect_right(self._timestamps, target) - 1
+            if position >= 0:
+                return self._info(position)
+            if self._continue is None:
+                # The page is newer than age_days
+                return {"revid": None, "timestamp": None, "revnum": None}
+        # The revision is older than the loaded history
+        revision = get_revision_from_age(self.title, age_days)
+        if revision.get("revid"):
+            revision["revnum"] = get_revisions_behind(self.title, revision["revid"])
+        return revision
+
+    def revisions_behind(self, revid: int) -> int:
+        """
+        Get the number of revisions a given revid is behind the current revision.
+        Revisions older than the loaded history are counted with get_revisions_behind().
+        """
+        with self._lock:
+            self.refresh()
+            position = self._positions.get(int(revid))
+            # Revision ids increase over time, so older revids are further back in the history
+            while (
+                position is None
+                and self._revisions
+                and int(revid) < self._revisions[0]["revid"]
+                and self._load_older()
+            ):
+                position = self._positions.get(int(revid))
+            if position is not None:
+                return len(self._revisions) - 1 - position
+        return get_revisions_behind(self.title, revid)
+
+    def __len__(self):
+        return len(self._revisions)
+
+
+# Indexes for recently used pages
+_indexes = OrderedDict()
+_indexes_lock = threading.Lock()
+
+
+def get_revision_index(title: str, store: bool = True) -> RevisionIndex:
+    """
+    Get the revision index for a page (shared between threads), creating it if needed.
+    The least recently used indexes are removed when there are more than MAX_TITLES.
+
+    Args:
+        title: Page title
+        store: Keep a new index for later lookups (False for one-off lookups, e.g. of random
+          pages, so they don't remove the indexes of pages in use)
+    """
+    with _indexes_lock:
+        if not store:
+            index = _indexes.get(title)
+            return RevisionIndex(title) if index is None else index
+        index = _indexes.pop(title, None)
+        if index is None:
+            index = RevisionIndex(title)
+        _indexes[title] = index
+        while len(_indexes) > MAX_TITLES:
+            _indexes.popitem(last=False)
+    return index
@@ -0,0 +1,60 @@
+import json
+import httpx
+import asyncio
+import async_wiki_data_fetcher
+from async_wiki_data_fetcher import get_wikipedia_introduction
+
+
+def use_transport(handler, max_concurrency):
+    """
+    Use a client with a mock transport in the running event loop.
+    """
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    semaphore = asyncio.Semaphore(max_concurrency)
+    async_wiki_data_fetcher._clients[asyncio.get_running_loop()] = (client, semaphore)
+
+
+# pytest -vv test_async_wiki_data_fetcher.py
+def test_concurrent_introductions():
+    """Introductions are fetched concurrently up to the concurrency limit."""
+    active = []
+    peak = []
+
+    async def handler(request):
+        active.append(request)
+        peak.append(len(active))
+        await asyncio.sleep(0.01)
+        active.remove(request)
+        revid = request.url.params["oldid"]
+        html = (
+            f'<div class="mw-parser-output"><p>Revision {revid}.</p><h2>Life</h2></div>'
+        )
+        return httpx.Response(200, json={"parse": {"text": {"*": html}}})
+
+    async def main():
+        use_transport(handler, max_concurrency=2)
+        return await asyncio.gather(
+            *[get_wikipedia_introduction(revid, use_cache=False) for revid in range(5)]
+        )
+
+    introductions = asyncio.run(main())
+    # Revid 0 is treated as missing
+    assert introductions == [None] + [f"Revision {revid}." for revid in range(1, 5)]
+    assert max(peak) == 2
+
+
+def test_introduction_error():
+    """No fallback to the full article for a missing revision."""
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        error = {"code": "nosuchrevid", "info": "There is no revision with ID 1."}
+        return httpx.Response(200, content=json.dumps({"error": error}).encode())
+
+    async def main():
+        use_transport(handler, max_concurrency=2)
+        return await get_wikipedia_introduction(1, use_cache=False)
+
+    assert asyncio.run(main()) is None
+    assert len(requests) == 1
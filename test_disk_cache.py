@@ -0,0 +1,43 @@
+import time
+from disk_cache import DiskCache
+
+
+# pytest -vv test_disk_cache.py
+def test_get_and_set(tmp_path):
+    """Values round-trip through the cache and hits/misses are counted."""
+    cache = DiskCache(str(tmp_path / "cache.sqlite"))
+    assert cache.get("1") is None
+    cache.set("1", "Introduction text")
+    assert cache.get("1") == "Introduction text"
+    assert cache.stats() == {"hits": 1, "misses": 1, "entries": 1}
+
+
+def test_persistence(tmp_path):
+    """A new cache object reads entries written by an earlier one."""
+    path = str(tmp_path / "cache.sqlite")
+    DiskCache(path).set("1", {"noteworthy": True})
+    assert DiskCache(path).get("1") == {"noteworthy": True}
+
+
+def test_lru_eviction(tmp_path):
+    """The least recently used entry is evicted when the cache is full."""
+    cache = DiskCache(str(tmp_path / "cache.sqlite"), max_entries=2)
+    cache.set("1", "one")
+    cache.set("2", "two")
+    # Use the first entry so the second one becomes least recently used
+    cache.get("1")
+    cache.set("3", "three")
+    assert cache.get("2") is None
+    assert cache.get("1") == "one"
+    assert cache.get("3") == "three"
+
+
+def test_ttl(tmp_path, monkeypatch):
+    """Entries older than the TTL are treated as missing."""
+    cache = DiskCache(str(tmp_path / "cache.sqlite"), ttl=60)
+    cache.set("1", "one")
+    assert cache.get("1") == "one"
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now + 120)
+    assert cache.get("1") is None
+    assert cache.stats()["entries"] == 0
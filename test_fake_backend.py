@@ -0,0 +1,306 @@
+"""
+Offline tests of the model functions with the fake backend (no API key or Logfire setup needed).
+"""
+
+from models import (
+    classifier,
+    judge,
+    diff_revisions,
+    changed_words,
+    classify_many,
+    judge_many,
+)
+import models
+import retry_with_backoff
+from prompts import PromptTemplate
+import os
+import time
+from types import SimpleNamespace
+from model_backends import (
+    FakeBackend,
+    FakeBackendError,
+    GeminiBackend,
+    MissingAPIKeyError,
+)
+from disk_cache import DiskCache
+import batch_jobs
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def offline_state(tmp_path, monkeypatch):
+    """
+    Use the fake backend, an empty result cache, and fresh context caches, hedger,
+    alignment files, and circuit breakers for each test.
+    """
+    monkeypatch.setattr(models, "backend", FakeBackend())
+    monkeypatch.setattr(models, "llm_cache", DiskCache(str(tmp_path / "llm.sqlite")))
+    monkeypatch.setattr(models, "context_cache", models.ContextCache(enabled=False))
+    monkeypatch.setattr(models, "hedger", models.Hedger(enabled=False))
+    monkeypatch.setattr(models, "alignments", models.AlignmentRegistry())
+    monkeypatch.setattr(retry_with_backoff, "breakers", {})
+
+
+# pytest -vv test_fake_backend.py::test_shortcut
+def test_shortcut():
+    """Revisions that differ only in whitespace and reference markers skip the models."""
+    old_revision = "Turin is a city in Italy.[1]  It is the capital of Piedmont.[n 2]"
+    new_revision = "Turin is a city in Italy. It is the capital of Piedmont.[3][a]"
+    result = classifier(old_revision, new_revision, "heuristic")
+    assert result["noteworthy"] is False and result["shortcut"] is True
+    result = judge(old_revision, new_revision, "", "", mode="unaligned")
+    assert result["noteworthy"] is False and result["shortcut"] is True
+    # Changed words are not a shortcut
+    result = classifier(old_revision, new_revision.replace("city", "town"), "heuristic")
+    assert "shortcut" not in result
+    # Bracketed numbers that aren't footnote markers are text
+    assert not models.equivalent_revisions("It opened [2024].", "It opened [2025].")
+    assert models.equivalent_revisions("It opened.[2024]", "It opened.[2025]")
+
+
+# pytest -vv test_fake_backend.py::test_diff_revisions
+def test_diff_revisions():
+    """The diff shows changed words with nearby text and leaves out distant unchanged text."""
+    old_revision = " ".join(f"word{i}" for i in range(40))
+    new_revision = old_revision.replace("word20", "changed")
+    differences = diff_revisions(old_revision, new_revision, context=3)
+    assert (
+        differences
+        == "... word17 word18 word19 [-word20-] {+changed+} word21 word22 word23 ..."
+    )
+
+
+# pytest -vv test_fake_backend.py::test_changed_words
+def test_changed_words():
+    """Replaced words count once, and inserted or deleted words count each."""
+    old_revision = "Turin is a city in Italy."
+    assert changed_words(old_revision, old_revision) == 0
+    assert changed_words(old_revision, "Turin is a town in Italy.") == 1
+    assert changed_words(old_revision, "Turin is a large city in northern Italy.") == 2
+
+
+# pytest -vv test_fake_backend.py::test_alignment_registry
+def test_alignment_registry(tmp_path, monkeypatch):
+    """Alignment files are read once and reloaded when a round is added or a file changes."""
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "production").mkdir()
+    alignment_1 = tmp_path / "production" / "alignment_1.txt"
+    alignment_1.write_text("Round 1")
+    registry = models.AlignmentRegistry()
+    assert registry.text("aligned-heuristic") == "Round 1"
+    # No checks for changes within ALIGNMENT_CHECK_SECONDS
+    (tmp_path / "production" / "alignment_2.txt").write_text("Round 2")
+    assert registry.latest_round() == 1
+    monkeypatch.setattr(models, "ALIGNMENT_CHECK_SECONDS", 0)
+    assert "Round 2" in registry.judge_template("aligned-heuristic").text
+    # An edited file is read again
+    alignment_1.write_text("Round 1 edited")
+    os.utime(alignment_1, (0, 0))
+    assert registry.text("aligned-heuristic", round=1) == "Round 1 edited"
+
+
+# pytest -vv test_fake_backend.py::test_prompt_template
+def test_prompt_template():
+    """Templates are filled with a single join, and values are inserted as literal text."""
+    template = PromptTemplate("A {{x}} B {{y}} C").partial(
+        x=PromptTemplate("<{{z}}>"), y="{{literal}}"
+    )
+    assert template.names == ["z"]
+    assert template.fill(z="{{y}}") == "A <{{y}}> B {{literal}} C"
+
+
+# pytest -vv test_fake_backend.py::test_context_cache
+def test_context_cache(tmp_path, monkeypatch):
+    """The static prompt prefix is cached once and re-created when the alignment changes."""
+    fake_backend = FakeBackend()
+    monkeypatch.setattr(models, "backend", fake_backend)
+    monkeypatch.setattr(models, "MIN_CONTEXT_CACHE_TOKENS", 10)
+    monkeypatch.setattr(models, "context_cache", models.ContextCache(enabled=True))
+    monkeypatch.setattr(models, "ALIGNMENT_CHECK_SECONDS", 0)
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "production").mkdir()
+    (tmp_path / "production" / "alignment_1.txt").write_text("Round 1")
+    for new_revision in ["B", "C"]:
+        judge("A", new_revision, "r1", "r2", use_cache=False)
+    assert list(fake_backend.caches) == ["cachedContents/fake-0"]
+    assert "Round 1" in fake_backend.caches["cachedContents/fake-0"]
+    # A new alignment round replaces the cached prefix
+    (tmp_path / "production" / "alignment_2.txt").write_text("Round 2")
+    judge("A", "D", "r1", "r2", use_cache=False)
+    assert list(fake_backend.caches) == ["cachedContents/fake-1"]
+    assert "Round 2" in fake_backend.caches["cachedContents/fake-1"]
+    # A prompt that doesn't start with the prefix is sent in full without the cache
+    requests = []
+
+    def generate(contents, schema=None, cached_content=None, rate_limit=True):
+        requests.append((contents, cached_content))
+        return '{"noteworthy": false, "reasoning": ""}'
+
+    monkeypatch.setattr(fake_backend, "generate", generate)
+    prefix = fake_backend.caches["cachedContents/fake-1"]
+    models.generate_json("Other prompt", "judge", use_cache=False, prefix=prefix)
+    assert requests == [("Other prompt", None)]
+    # An invalidated cache is deleted on the server
+    models.context_cache.invalidate("cachedContents/fake-1")
+    assert fake_backend.caches == {}
+
+
+# pytest -vv test_fake_backend.py::test_fake_backend
+def test_fake_backend(monkeypatch):
+    """The fake backend gives rule-based outputs and simulated failures."""
+    monkeypatch.setattr(models, "backend", FakeBackend(min_changed_words=3))
+    old_revision = "Turin is a city in Italy."
+    new_revision = "Turin is a city and comune in Piedmont, northern Italy."
+    for prompt_mode in ["full", "diff"]:
+        result = classifier(old_revision, new_revision, "heuristic", False, prompt_mode)
+        assert result["noteworthy"] is True
+    result = classifier(old_revision, "Turin is a city in Italy!", "heuristic", False)
+    assert result["noteworthy"] is False
+    # Resampled results aren't written to the result cache
+    assert models.llm_cache.stats()["entries"] == 0
+    # Simulated failures are raised by the backend
+    fake_backend = FakeBackend(failure_rate=0.5, seed=1)
+    failures = 0
+    for _ in range(20):
+        try:
+            fake_backend.generate("Hello")
+        except FakeBackendError:
+            failures += 1
+    assert 0 < failures < 20
+    assert fake_backend.failures == failures
+
+
+# pytest -vv test_fake_backend.py::test_missing_api_key
+def test_missing_api_key(monkeypatch):
+    """A missing API key is raised at once without retries or opening the breaker."""
+    monkeypatch.delenv("GOOGLE_API_KEY", raising=False)
+    monkeypatch.delenv("GEMINI_API_KEY", raising=False)
+    models.set_backend(GeminiBackend())
+    retry_with_backoff.clear_retry_stats()
+    with pytest.raises(MissingAPIKeyError):
+        classifier("Turin is a city.", "Turin is a town.", "heuristic", use_cache=False)
+    assert "retries" not in retry_with_backoff.get_retry_stats()["classifier"]
+    assert retry_with_backoff.get_breaker("model").state == "closed"
+
+
+# pytest -vv test_fake_backend.py::test_classify_many
+def test_classify_many(monkeypatch):
+    """Batch calls run concurrently and keep the input order."""
+    # The fake model returns the prompt as the rationale or reasoning
+    fake_backend = FakeBackend(
+        latency=(0.0, 0.05),
+        outputs=lambda prompt: {
+            "noteworthy": True,
+            "rationale": prompt,
+            "reasoning": prompt,
+        },
+        seed=1,
+    )
+    monkeypatch.setattr(models, "backend", fake_backend)
+    old_revisions = [f"Turin is city number {i}." for i in range(20)]
+    pairs = [(old_revision, "Turin is a city.") for old_revision in old_revisions]
+    results = list(classify_many(pairs, workers=4, use_cache=False))
+    assert fake_backend.calls == 40
+    assert len(results) == 20
+    for old_revision, result in zip(old_revisions, results):
+        assert list(result) == ["heuristic", "few-shot"]
+        assert old_revision in result["heuristic"]["rationale"]
+        assert old_revision in result["few-shot"]["rationale"]
+    # Shortcut results for equivalent revisions stay in their rows
+    rows = [(old_revision, old_revision, "", "") for old_revision in old_revisions]
+    rows[5] = (old_revisions[5], "Turin is a city.", "", "")
+    results = list(judge_many(rows, mode="unaligned", workers=4, use_cache=False))
+    assert [result.get("shortcut") for result in results].count(True) == 19
+    assert old_revisions[5] in results[5]["reasoning"]
+
+
+# pytest -vv test_fake_backend.py::test_judge_batch
+def test_judge_batch(tmp_path, monkeypatch):
+    """Batch job results are merged back by key and saved in the result cache."""
+    monkeypatch.setattr(
+        models, "backend", FakeBackend(min_changed_words=3, batch_polls=2)
+    )
+    monkeypatch.setattr(batch_jobs, "BATCH_DIR", str(tmp_path / "batches"))
+    old_revision = "Turin is a city in Italy."
+    rows = {
+        "small": (old_revision, "Turin is a city in Italy!", "", ""),
+        "large": (old_revision, "Turin is the capital city of Piedmont.", "", ""),
+        "same": (old_revision, old_revision + "[1]", "", ""),
+    }
+    results = batch_jobs.judge_batch(rows, "test", mode="unaligned", poll_seconds=0)
+    assert results["small"]["noteworthy"] is False
+    assert results["large"]["noteworthy"] is True
+    assert results["same"]["shortcut"] is True
+    # Only the revisions with changed words were sent, and the results are cached
+    assert models.backend.calls == 2
+    assert judge(*rows["large"], mode="unaligned") == results["large"]
+    assert models.backend.calls == 2
+
+
+# pytest -vv test_fake_backend.py::test_run_batch_resume
+def test_run_batch_resume(tmp_path, monkeypatch):
+    """Requests added or changed after a job was submitted are sent in a follow-up job."""
+    fake_backend = FakeBackend(
+        outputs=lambda prompt: {"noteworthy": True, "rationale": prompt},
+        batch_polls=2,
+    )
+    monkeypatch.setattr(models, "backend", fake_backend)
+    monkeypatch.setattr(batch_jobs, "BATCH_DIR", str(tmp_path / "batches"))
+    # Submit a job and stop before it is done
+    with monkeypatch.context() as patch:
+        patch.setattr(batch_jobs.time, "sleep", lambda seconds: 1 / 0)
+        with pytest.raises(ZeroDivisionError):
+            batch_jobs.run_batch(
+                {"a": "Prompt a", "b": "Old prompt b"}, "test", "classifier"
+            )
+    requests = {"a": "Prompt a", "b": "Prompt b", "c": "Prompt c"}
+    results = batch_jobs.run_batch(requests, "test", "classifier", poll_seconds=0)
+    assert {key: result["rationale"] for key, result in results.items()} == requests
+    # The first job was resumed, and the changed and new requests were in a second job
+    assert len(fake_backend.batches) == 2
+    request_file = tmp_path / "batches" / "test_requests.jsonl"
+    assert "Old prompt b" in request_file.read_text()
+    extra_file = tmp_path / "batches" / "test_extra_requests.jsonl"
+    assert extra_file.read_text().count('"key"') == 2
+
+
+# pytest -vv test_fake_backend.py::test_hedged_requests
+def test_hedged_requests(monkeypatch):
+    """A slow request is hedged and the faster duplicate wins, within the budget."""
+    latencies = iter([0.5, 0.0, 0.5])
+    fake_backend = FakeBackend(latency=lambda rng: next(latencies, 0.0))
+    monkeypatch.setattr(models, "backend", fake_backend)
+    monkeypatch.setattr(models, "HEDGE_DELAY", 0.05)
+    monkeypatch.setattr(models, "hedger", models.Hedger(enabled=True, budget=0.5))
+    old_revision = "Turin is a city in Italy."
+    new_revision = "Turin is the capital city of Piedmont."
+    start = time.perf_counter()
+    classifier(old_revision, new_revision, "heuristic", use_cache=False)
+    assert time.perf_counter() - start < 0.4
+    assert models.get_hedge_stats()["hedge_wins"] == 1
+    # The second slow request is over the budget (one hedge for two requests)
+    classifier(old_revision, new_revision, "few-shot", use_cache=False)
+    stats = models.get_hedge_stats()
+    assert stats["requests"] == 2 and stats["hedges"] == 1
+    assert stats["over_budget"] == 1
+    assert fake_backend.calls == 3
+
+
+# pytest -vv test_fake_backend.py::test_hedge_rate_limit
+def test_hedge_rate_limit(monkeypatch):
+    """Waiting for the rate limiter isn't timed, and no hedges are sent while requests wait."""
+    monkeypatch.setattr(models, "HEDGE_DELAY", 0.05)
+    hedger = models.Hedger(enabled=True, budget=1.0)
+    # A slow wait before the request isn't a slow response
+    hedger.run(lambda: "ok", "test", before=lambda: time.sleep(0.1))
+    assert hedger.stats()["hedges"] == 0
+    assert max(hedger._latencies["test"]) < 0.05
+    # A slow response isn't hedged while requests are waiting for the rate limiter
+    fake_backend = FakeBackend(latency=0.1)
+    monkeypatch.setattr(models, "backend", fake_backend)
+    monkeypatch.setattr(models, "hedger", hedger)
+    monkeypatch.setattr(models, "get_limiter", lambda name: SimpleNamespace(waiting=1))
+    classifier("Turin is a city.", "Turin is a town.", "heuristic", use_cache=False)
+    stats = models.get_hedge_stats()
+    assert stats["hedges"] == 0 and stats["rate_limited"] == 1
+    assert fake_backend.calls == 1
@@ -2,7 +2,6 @@ from models import classifier, judge
 from dotenv import load_dotenv
 import logfire
 
-
 # Load API keys
 load_dotenv()
 # Setup Logfire
@@ -25,9 +24,9 @@ def classifier_logic(i):
     new_revision = """Henry Purcell (/ˈpɜːrsəl/, rare: /pərˈsɛl/;[n 1] c. 10 September 1659[n 2] – 21 November 1695) was an English composer and organist of the middle Baroque era.  He composed more than 100 songs, a tragic opera Dido and Aeneas, and wrote incidental music to a version of Shakespeare's A Midsummer Night's Dream called The Fairy Queen."""
 
     with logfire.span("classifier_logic {i}", i=i):
-        # Run classifier models
-        heuristic = classifier(old_revision, new_revision, "heuristic")
-        few_shot = classifier(old_revision, new_revision, "few-shot")
+        # Run classifier models (without the result cache to sample the models each time)
+        heuristic = classifier(old_revision, new_revision, "heuristic", use_cache=False)
+        few_shot = classifier(old_revision, new_revision, "few-shot", use_cache=False)
         heuristic_true = heuristic["noteworthy"] is True
         few_shot_true = few_shot["noteworthy"] is True
 
@@ -58,14 +57,15 @@ def judge_logic(i):
     new_revision = """The Kaman-Kalehöyük Archaeological Museum (Turkish: Kaman-Kalehöyük Arkeoloji Müzesi) is an archaeological museum in Çağırkan, Kaman District, Kırşehir Province, Turkey. It exhibits artifacts of seven civilizations excavated in the nearby multi-period mound Kaman-Kalehöyük. It opened in 2010. A Japanese garden is next to the museum building.[1][2]"""
 
     with logfire.span("judge_logic {i}", i=i):
-        heuristic = classifier(old_revision, new_revision, "heuristic")
-        few_shot = classifier(old_revision, new_revision, "few-shot")
+        heuristic = classifier(old_revision, new_revision, "heuristic", use_cache=False)
+        few_shot = classifier(old_revision, new_revision, "few-shot", use_cache=False)
         judge_few_shot = judge(
             old_revision,
             new_revision,
             heuristic["rationale"],
             few_shot["rationale"],
             mode="aligned-fewshot",
+            use_cache=False,
         )
         judge_heuristic = judge(
             old_revision,
@@ -73,6 +73,7 @@ def judge_logic(i):
             heuristic["rationale"],
             few_shot["rationale"],
             mode="aligned-heuristic",
+            use_cache=False,
         )
 
     # Test condition is True if aligned judges both give False
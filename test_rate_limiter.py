@@ -0,0 +1,70 @@
+from rate_limiter import TokenBucketLimiter
+import threading
+import asyncio
+import time
+
+
+# pytest -vv test_rate_limiter.py::test_requests_per_second
+def test_requests_per_second():
+    """Requests beyond the burst wait for the bucket to refill."""
+    limiter = TokenBucketLimiter("test", rps=20, burst=2)
+    start = time.monotonic()
+    for _ in range(6):
+        limiter.acquire()
+    # Two requests are sent at once and four wait 0.05 s each
+    assert 0.18 < time.monotonic() - start < 0.5
+    stats = limiter.stats()
+    assert stats["requests"] == 6
+    assert stats["waiting"] == 0
+    assert stats["max_wait"] > 0.04
+
+
+# pytest -vv test_rate_limiter.py::test_tokens_per_minute
+def test_tokens_per_minute():
+    """Large requests wait for the token budget."""
+    limiter = TokenBucketLimiter("test", tpm=600)
+    # The bucket starts full, then refills at 10 tokens per second
+    assert limiter.acquire(tokens=600) == 0
+    wait = limiter.acquire(tokens=2)
+    assert 0.15 < wait < 0.3
+    assert limiter.stats()["tokens"] == 602
+
+
+# pytest -vv test_rate_limiter.py::test_shared_limiter
+def test_shared_limiter():
+    """Threads and coroutines share one budget."""
+    limiter = TokenBucketLimiter("test", rps=50, burst=1)
+
+    async def acquire_many():
+        await asyncio.gather(*[limiter.acquire_async() for _ in range(5)])
+
+    start = time.monotonic()
+    threads = [threading.Thread(target=limiter.acquire) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    asyncio.run(acquire_many())
+    for thread in threads:
+        thread.join()
+    # Ten requests at 50 per second with one sent at once
+    assert 0.15 < time.monotonic() - start < 0.5
+    assert limiter.stats()["requests"] == 10
+
+
+# pytest -vv test_rate_limiter.py::test_cancelled_wait
+def test_cancelled_wait():
+    """A caller cancelled while waiting is no longer counted as waiting."""
+    limiter = TokenBucketLimiter("test", rps=1, burst=1)
+
+    async def main():
+        await limiter.acquire_async()
+        task = asyncio.create_task(limiter.acquire_async())
+        await asyncio.sleep(0.01)
+        assert limiter.stats()["waiting"] == 1
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+    asyncio.run(main())
+    assert limiter.stats()["waiting"] == 0
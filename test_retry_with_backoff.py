@@ -0,0 +1,188 @@
+import retry_with_backoff as retry_module
+from retry_with_backoff import (
+    retry_with_backoff,
+    get_breaker,
+    reset_breaker,
+    get_retry_stats,
+    CircuitOpenError,
+    RetryPolicy,
+)
+from types import SimpleNamespace
+import asyncio
+import json
+import time
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def fresh_breakers(monkeypatch):
+    """
+    Give each test its own circuit breakers.
+    """
+    monkeypatch.setattr(retry_module, "breakers", {})
+
+
+class FakeHTTPError(Exception):
+    """HTTP error with a response like those from requests and httpx."""
+
+    def __init__(self, status_code, headers=None):
+        super().__init__(f"HTTP {status_code}")
+        self.response = SimpleNamespace(status_code=status_code, headers=headers or {})
+
+
+def flaky(errors):
+    """Make a function that raises the given errors and then returns 'ok'."""
+    errors = list(errors)
+
+    def function():
+        if errors:
+            raise errors.pop(0)
+        return "ok"
+
+    return function
+
+
+# pytest -vv test_retry_with_backoff.py::test_retry_policies
+def test_retry_policies():
+    """Transient errors are retried and invalid responses are raised at once."""
+    retry = retry_with_backoff(base_delay=0.01)
+    assert retry(flaky([ConnectionError(), FakeHTTPError(503)]))() == "ok"
+    with pytest.raises(json.JSONDecodeError):
+        retry(flaky([json.JSONDecodeError("Expecting value", "", 0)]))()
+    with pytest.raises(FakeHTTPError):
+        retry(flaky([FakeHTTPError(400)]))()
+    # Policies for an exception class
+    retry = retry_with_backoff(
+        base_delay=0.01, policies={ConnectionError: RetryPolicy(retry=False)}
+    )
+    with pytest.raises(ConnectionError):
+        retry(flaky([ConnectionError()]))()
+
+
+# pytest -vv test_retry_with_backoff.py::test_retry_after
+def test_retry_after():
+    """The delay in a Retry-After header is used instead of the backoff delay."""
+
+    function = flaky([FakeHTTPError(429, {"Retry-After": "0.2"})])
+    start = time.monotonic()
+    assert retry_with_backoff(base_delay=5)(function)() == "ok"
+    assert 0.2 <= time.monotonic() - start < 1
+    assert get_retry_stats()["flaky.<locals>.function"]["retries"] >= 1
+
+
+# pytest -vv test_retry_with_backoff.py::test_async_retry
+def test_async_retry():
+    """Coroutine functions are retried without blocking the event loop."""
+    errors = [ConnectionError(), ConnectionError()]
+
+    @retry_with_backoff(base_delay=0.05, backoff_factor=1)
+    async def function():
+        if errors:
+            raise errors.pop(0)
+        return "ok"
+
+    async def main():
+        ticks = 0
+
+        async def tick():
+            nonlocal ticks
+            for _ in range(5):
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        result, _ = await asyncio.gather(function(), tick())
+        return result, ticks
+
+    assert asyncio.run(main()) == ("ok", 5)
+
+
+# pytest -vv test_retry_with_backoff.py::test_circuit_breaker
+def test_circuit_breaker():
+    """The breaker opens after repeated failures and closes after a successful trial call."""
+    breaker = get_breaker("test", failure_threshold=2, reset_timeout=0.1)
+    calls = []
+
+    @retry_with_backoff(max_retries=1, breaker="test")
+    def function(fail=True):
+        calls.append(fail)
+        if fail:
+            raise ConnectionError()
+        return "ok"
+
+    for _ in range(2):
+        with pytest.raises(ConnectionError):
+            function()
+    assert breaker.state == "open"
+    # Calls fail fast while the breaker is open
+    with pytest.raises(CircuitOpenError):
+        function(fail=False)
+    assert len(calls) == 2
+    time.sleep(0.1)
+    assert breaker.state == "half-open"
+    assert function(fail=False) == "ok"
+    assert breaker.state == "closed"
+    assert get_retry_stats()["test"] == {
+        "breaker_opened": 1,
+        "breaker_rejected": 1,
+        "breaker_closed": 1,
+    }
+
+
+# pytest -vv test_retry_with_backoff.py::test_cancelled_trial
+def test_cancelled_trial():
+    """A cancelled half-open trial call lets the next call be a trial."""
+    breaker = get_breaker("cancelled", failure_threshold=1, reset_timeout=0.05)
+
+    @retry_with_backoff(max_retries=0, breaker="cancelled")
+    async def function(seconds=0.0):
+        await asyncio.sleep(seconds)
+        return "ok"
+
+    breaker.failure()
+    assert breaker.state == "open"
+    time.sleep(0.05)
+
+    async def main():
+        trial = asyncio.create_task(function(10))
+        await asyncio.sleep(0.01)
+        trial.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await trial
+        return await function()
+
+    assert asyncio.run(main()) == "ok"
+    assert breaker.state == "closed"
+
+
+# pytest -vv test_retry_with_backoff.py::test_trial_owner
+def test_trial_owner():
+    """Only the trial call can release the half-open trial, and a reset breaker is closed."""
+    breaker = get_breaker("owner", failure_threshold=1, reset_timeout=0.05)
+
+    @retry_with_backoff(max_retries=0, breaker="owner")
+    async def function(seconds=0.0):
+        await asyncio.sleep(seconds)
+        return "ok"
+
+    async def main():
+        # A call that started while the breaker was closed is cancelled during the trial
+        earlier = asyncio.create_task(function(10))
+        await asyncio.sleep(0.01)
+        breaker.failure()
+        await asyncio.sleep(0.05)
+        trial = asyncio.create_task(function(10))
+        await asyncio.sleep(0.01)
+        earlier.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await earlier
+        # The trial is still running, so other calls are rejected
+        with pytest.raises(CircuitOpenError):
+            await function()
+        trial.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await trial
+
+    asyncio.run(main())
+    assert breaker.state == "half-open"
+    reset_breaker("owner")
+    assert get_breaker("owner").state == "closed"
@@ -0,0 +1,109 @@
+import revision_index
+from datetime import datetime, timedelta, timezone
+from revision_index import RevisionIndex, get_revision_index
+
+
+def fake_api(history, requests):
+    """
+    Fake run_get_request() for a revision history (oldest first) of one page.
+    """
+
+    def run_get_request(params):
+        requests.append(params)
+        if params["rvdir"] == "older":
+            revisions = history[::-1]
+            if "rvcontinue" in params:
+                revisions = [r for r in revisions if r["revid"] <= params["rvcontinue"]]
+        else:
+            revisions = [r for r in history if r["timestamp"] >= params["rvstart"]]
+            if "rvcontinue" in params:
+                revisions = [r for r in revisions if r["revid"] >= params["rvcontinue"]]
+        limit = params["rvlimit"]
+        json_data = {"query": {"pages": {"1": {"revisions": revisions[:limit]}}}}
+        if len(revisions) > limit:
+            json_data["continue"] = {"rvcontinue": revisions[limit]["revid"]}
+        return json_data
+
+    return run_get_request
+
+
+def make_history(n, end=None):
+    """
+    Revision history with one revision per hour, oldest first.
+    """
+    end = end or datetime.now(timezone.utc)
+    return [
+        {
+            "revid": 1000 + i,
+            "parentid": 999 + i,
+            "timestamp": (end - timedelta(hours=n - 1 - i)).strftime(
+                "%Y-%m-%dT%H:%M:%SZ"
+            ),
+            "size": 5000 + i,
+        }
+        for i in range(n)
+    ]
+
+
+# pytest -vv test_revision_index.py
+def test_lookups(monkeypatch):
+    """Lookups by revnum, age and revid are local after older revisions are loaded."""
+    history = make_history(1200)
+    requests = []
+    monkeypatch.setattr(revision_index, "run_get_request", fake_api(history, requests))
+    index = RevisionIndex("Title")
+    assert index.revision(0)["revid"] == history[-1]["revid"]
+    assert len(requests) == 1
+    # Loading 1000 revisions behind needs two more batches of 500
+    assert index.revision(1000)["revid"] == history[-1001]["revid"]
+    assert len(requests) == 3
+    # Two days behind is 48 revisions behind (one revision per hour)
+    assert index.revision_from_age(2)["revnum"] == 48
+    assert index.revisions_behind(history[-101]["revid"]) == 100
+    assert len(requests) == 3
+    # Revision numbers are limited to the earliest revision
+    assert index.revision(5000)["revid"] == history[0]["revid"]
+
+
+def test_max_revisions(monkeypatch):
+    """The index holds MAX_REVISIONS revisions behind the current one."""
+    history = make_history(1200)
+    requests = []
+    monkeypatch.setattr(revision_index, "run_get_request", fake_api(history, requests))
+    monkeypatch.setattr(revision_index, "MAX_REVISIONS", 600)
+    index = RevisionIndex("Title")
+    assert index.revision(600)["revnum"] == 600
+    assert len(index) == 601
+    # Revision numbers beyond MAX_REVISIONS are limited
+    assert index.revision(700)["revnum"] == 600
+    assert [params["rvlimit"] for params in requests] == [500, 101]
+
+
+def test_refresh(monkeypatch):
+    """A refresh loads only the revisions newer than the head of the index."""
+    history = make_history(100)
+    requests = []
+    monkeypatch.setattr(revision_index, "run_get_request", fake_api(history, requests))
+    index = RevisionIndex("Title")
+    old_head = index.revision(0)
+    history.append(
+        dict(old_head, revid=old_head["revid"] + 1, parentid=old_head["revid"])
+    )
+    # No request before the refresh interval has passed
+    assert index.revision(0)["revid"] == old_head["revid"]
+    index.refresh(force=True)
+    assert requests[-1]["rvdir"] == "newer"
+    assert index.revision(0)["revid"] == old_head["revid"] + 1
+    assert index.revisions_behind(old_head["revid"]) == 1
+    assert len(index) == 101
+
+
+def test_unstored_index(monkeypatch):
+    """One-off lookups don't add indexes to the shared indexes."""
+    monkeypatch.setattr(revision_index, "_indexes", revision_index.OrderedDict())
+    stored = get_revision_index("Stored")
+    assert get_revision_index("Stored", store=False) is stored
+    assert get_revision_index("Random", store=False) is not get_revision_index(
+        "Random", store=False
+    )
+    assert list(revision_index._indexes) == ["Stored"]
@@ -0,0 +1,203 @@
+import json
+import wiki_data_fetcher
+from datetime import datetime, timedelta, timezone
+from wiki_data_fetcher import (
+    extract_introduction,
+    get_revisions_behind,
+    get_random_wikipedia_titles,
+    get_wikipedia_introductions,
+    removed_templates,
+    stream_introduction,
+    wikitext_to_text,
+)
+
+# Lead section of an article as wikitext and as rendered HTML (abridged)
+wikitext = """{{Short description|English composer (1659–1695)}}
+{{Use dmy dates|date=May 2024}}
+{{Infobox person
+| name = Henry Purcell
+| image = Henry Purcell Closterman.jpg
+| birth_date = {{circa}} 10 September 1659
+}}
+[[File:Henry Purcell.jpg|thumb|Portrait of [[Henry Purcell]]]]
+'''Henry Purcell''' ({{IPAc-en|ˈ|p|ɜːr|s|əl}};<ref group="n">Or {{IPAc-en|p|ər|ˈ|s|ɛ|l}}.</ref> {{circa|10 September 1659}} – 21 November 1695) was an English [[composer]] of [[Baroque music|Baroque]] music.<ref name="grove">{{cite book |title=Grove}}</ref>
+
+<!-- Keep this paragraph short -->
+He composed more than 100 songs, a tragic opera ''[[Dido and Aeneas]]'',<ref>{{cite web |url=https://example.org |title=Dido}}</ref> and wrote incidental music.<ref name="grove" />{{citation needed|date=May 2024}}
+* A list item that isn't part of a paragraph
+"""
+
+html = """<div class="mw-content-ltr mw-parser-output" lang="en" dir="ltr"><div class="shortdescription nomobile noexcerpt noprint searchaux" style="display:none">English composer (1659–1695)</div>
+<table class="infobox vcard"><tbody><tr><th colspan="2" class="infobox-above">Henry Purcell</th></tr></tbody></table>
+<figure class="mw-default-size" typeof="mw:File/Thumb"><a href="/wiki/File:Henry_Purcell.jpg" class="mw-file-description"><img src="//upload.wikimedia.org/Henry_Purcell.jpg" /></a><figcaption>Portrait of <a class="mw-selflink selflink">Henry Purcell</a></figcaption></figure>
+<p><b>Henry Purcell</b> (<span class="rt-commentedText nowrap"><span class="IPA nopopups noexcerpt" lang="en-fonipa"><a href="/wiki/Help:IPA/English" title="Help:IPA/English">/<span style="border-bottom:1px dotted"><span title="/ˈ/: primary stress follows">ˈ</span><span title="&#39;p&#39; in &#39;pie&#39;">p</span><span title="/ɜːr/: &#39;ur&#39; in &#39;fur&#39;">ɜːr</span><span title="&#39;s&#39; in &#39;sigh&#39;">s</span><span title="/əl/: &#39;le&#39; in &#39;bottle&#39;">əl</span></span>/</a></span></span>;<sup id="cite_ref-1" class="reference"><a href="#cite_note-1"><span class="cite-bracket">&#91;</span>n 1<span class="cite-bracket">&#93;</span></a></sup> <abbr title="circa">c.</abbr>&#8201;10 September 1659 – 21 November 1695) was an English <a href="/wiki/Composer" title="Composer">composer</a> of <a href="/wiki/Baroque_music" title="Baroque music">Baroque</a> music.<sup id="cite_ref-grove_2-0" class="reference"><a href="#cite_note-grove-2"><span class="cite-bracket">&#91;</span>1<span class="cite-bracket">&#93;</span></a></sup>
+</p><p>He composed more than 100 songs, a tragic opera <i><a href="/wiki/Dido_and_Aeneas" title="Dido and Aeneas">Dido and Aeneas</a></i>,<sup id="cite_ref-3" class="reference"><a href="#cite_note-3"><span class="cite-bracket">&#91;</span>2<span class="cite-bracket">&#93;</span></a></sup> and wrote incidental music.<sup id="cite_ref-grove_2-1" class="reference"><a href="#cite_note-grove-2"><span class="cite-bracket">&#91;</span>1<span class="cite-bracket">&#93;</span></a></sup><sup class="noprint Inline-Template Template-Fact">&#91;<i><a href="/wiki/Wikipedia:Citation_needed" title="Wikipedia:Citation needed"><span title="This claim needs references to reliable sources. (May 2024)">citation needed</span></a></i>&#93;</sup>
+</p>
+<ul><li>A list item that isn't part of a paragraph</li></ul>
+</div>"""
+
+
+# pytest -vv test_wiki_data_fetcher.py
+def test_extract_introduction():
+    """Introduction from HTML keeps paragraph text and reference markers."""
+    introduction = extract_introduction(html)
+    assert introduction.startswith("Henry Purcell (/ˈpɜːrsəl/;[n 1] c.")
+    assert introduction.endswith("and wrote incidental music.[1][citation needed]")
+    assert "list item" not in introduction
+
+
+def test_extract_introduction_stops_at_heading():
+    """Text after the first section heading is not part of the introduction."""
+    heading = (
+        '<div class="mw-heading mw-heading2"><h2>Life</h2></div><p>Later text.</p>'
+    )
+    full_html = html[: -len("</div>")] + heading + "</div>"
+    assert extract_introduction(full_html) == extract_introduction(html)
+
+
+def test_wikitext_to_text():
+    """Introduction from wikitext matches the introduction from rendered HTML except for removed templates."""
+    introduction = wikitext_to_text(wikitext)
+    # Pronunciations are not rendered from wikitext
+    expected = extract_introduction(html).replace("/ˈpɜːrsəl/", "")
+    assert introduction == expected
+
+
+def test_wikitext_date_templates():
+    """Date, "as of", number, and convert templates are rendered as in the HTML."""
+    assert wikitext_to_text("Born {{birth date|1974|1|5}}.") == (
+        "Born  (1974-01-05) January 5, 1974."
+    )
+    age = datetime.now(timezone.utc).year - 1951
+    assert f"(1951-01-01) 1 January 1951 (age\xa0{age})" in wikitext_to_text(
+        "Born {{birth date and age|1951|1|1|df=y}}."
+    )
+    assert wikitext_to_text("Died {{death date and age|2020|5|1|1950|6|2}}.") == (
+        "Died  (2020-05-01) May 1, 2020 (aged\xa069)."
+    )
+    assert wikitext_to_text("{{as of|2024|5}}, {{formatnum:12345}} people.") == (
+        "As of May 2024, 12,345 people."
+    )
+    assert wikitext_to_text("It is {{convert|100|km|mi}} long.") == (
+        "It is 100 kilometres (62 mi) long."
+    )
+
+
+def test_removed_templates():
+    """Templates removed from the paragraphs are found, but not rendered or block templates."""
+    wikitext = (
+        "{{Short description|City in Italy}}\n{{Infobox settlement\n| image = {{Photo}}\n}}\n"
+        "'''Turin''' ({{IPA|it|toˈriːno|lang}}<ref>{{cite web|url=x}}</ref>) is a city "
+        "<!-- {{hidden}} -->{{citation needed}} of {{convert|130|km2}}."
+    )
+    assert removed_templates(wikitext) == ["{{IPA|it|toˈriːno|lang}}"]
+    assert wikitext_to_text(wikitext) == (
+        "Turin ([1]) is a city [citation needed] of 130 square kilometres (50 sq mi)."
+    )
+
+
+def test_get_wikipedia_introductions(monkeypatch):
+    """Introductions for many revids are fetched in batches and returned in input order."""
+    requests = []
+
+    def run_get_request(params):
+        revids = [int(revid) for revid in params["revids"].split("|")]
+        requests.append(revids)
+        # Revision 3 is deleted
+        revisions = [
+            {"revid": revid, "slots": {"main": {"*": f"Revision '''{revid}'''."}}}
+            for revid in revids
+            if revid != 3
+        ]
+        revisions += [{"revid": 3, "slots": {"main": {"texthidden": ""}}}]
+        return {"query": {"pages": {"1": {"revisions": revisions}}}}
+
+    monkeypatch.setattr(wiki_data_fetcher, "run_get_request", run_get_request)
+    revids = list(range(60, 0, -1)) + [None, 60]
+    introductions = get_wikipedia_introductions(revids, use_cache=False)
+    # Two requests for 60 unique revids
+    assert [len(batch) for batch in requests] == [50, 10]
+    assert introductions[0] == "Revision 60."
+    assert introductions[59] == "Revision 1."
+    assert introductions[57] is None
+    assert introductions[-2:] == [None, "Revision 60."]
+
+
+def test_get_random_wikipedia_titles(monkeypatch):
+    """Many random titles are requested at once, up to the API limit."""
+    requests = []
+
+    def run_get_request(params):
+        requests.append(params)
+        titles = [f"Page {i}" for i in range(params["rnlimit"])]
+        return {"query": {"random": [{"id": 1, "title": title} for title in titles]}}
+
+    monkeypatch.setattr(wiki_data_fetcher, "run_get_request", run_get_request)
+    assert get_random_wikipedia_titles(3) == ["Page 0", "Page 1", "Page 2"]
+    assert len(get_random_wikipedia_titles(1000)) == 500
+    assert len(requests) == 2 and requests[0]["list"] == "random"
+
+
+def test_stream_introduction():
+    """Streaming extraction from small chunks of a JSON response stops at the first heading."""
+    heading = (
+        '<div class="mw-heading mw-heading2"><h2>Life</h2></div><p>Later text.</p>'
+    )
+    full_html = html[: -len("</div>")] + heading + "</div>" + "<p>Padding</p>" * 1000
+    response = {"parse": {"title": "Henry Purcell", "text": {"*": full_html}}}
+    body = json.dumps(response, separators=(",", ":")).encode()
+    # Chunks of 7 bytes split escape sequences and multibyte characters
+    chunks = [body[i : i + 7] for i in range(0, len(body), 7)]
+    introduction, json_data, nbytes = stream_introduction(chunks)
+    assert introduction == extract_introduction(html)
+    assert json_data is None
+    assert nbytes < len(body) / 2
+
+
+def test_stream_introduction_error():
+    """The JSON response is returned for API errors."""
+    body = b'{"error":{"code":"nosuchrevid","info":"There is no revision with ID 1."}}'
+    introduction, json_data, nbytes = stream_introduction([body[:10], body[10:]])
+    assert introduction is None
+    assert json_data["error"]["code"] == "nosuchrevid"
+
+
+def test_get_revisions_behind(monkeypatch):
+    """Revisions behind is exact for revisions older than the REST API count limit."""
+    # Revision history with one revision per hour, oldest first
+    start = datetime(2010, 1, 1, tzinfo=timezone.utc)
+    history = [
+        (1000 + i, (start + timedelta(hours=i)).strftime("%Y-%m-%dT%H:%M:%SZ"))
+        for i in range(70000)
+    ]
+    requests = []
+
+    def run_get_request(params, url=None):
+        requests.append(params)
+        if url:
+            # REST API edit count between two revisions (excluding both)
+            i = params["from"] - 1000
+            j = params["to"] - 1000
+            count = j - i - 1
+            if count > 30000:
+                return {"count": 30000, "limit": True}
+            return {"count": count, "limit": False}
+        if "revids" in params:
+            revisions = [history[params["revids"] - 1000]]
+        elif "rvstart" in params:
+            if params["rvdir"] == "older":
+                revisions = [r for r in history if r[1] <= params["rvstart"]][-1:]
+            else:
+                revisions = [r for r in history if r[1] >= params["rvstart"]][:1]
+        else:
+            revisions = history[-1:]
+        revisions = [{"revid": r[0], "timestamp": r[1]} for r in revisions]
+        return {"query": {"pages": {"1": {"revisions": revisions}}}}
+
+    monkeypatch.setattr(wiki_data_fetcher, "run_get_request", run_get_request)
+    assert get_revisions_behind("Title", history[-1][0]) == 0
+    assert get_revisions_behind("Title", history[-2][0]) == 1
+    assert get_revisions_behind("Title", history[-1001][0]) == 1000
+    requests.clear()
+    assert get_revisions_behind("Title", history[0][0]) == 69999
+    assert len(requests) < 15
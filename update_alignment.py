@@ -1,9 +1,9 @@
 from datasets import load_dataset
-from google import genai
 from dotenv import load_dotenv
 from retry_with_backoff import retry_with_backoff
 from prompts import update_prompt
 from evaluate import select_round
+from models import get_backend
 import logfire
 
 # Load API keys
@@ -14,9 +14,6 @@ load_dotenv()
 logfire.configure()
 logfire.instrument_google_genai()
 
-# Initialize the Gemini LLM
-client = genai.Client()
-
 
 @logfire.instrument("Update alignment")
 def update_alignment(round=None):
@@ -63,17 +60,13 @@ def update_alignment(round=None):
     # Function to generate response
     @retry_with_backoff()
     def get_response():
-        response = client.models.generate_content(
-            model="gemini-2.5-flash",
-            contents=prompt,
-        )
-        return response
+        return get_backend().generate(prompt)
 
     # Get the response
-    response = get_response()
+    response_text = get_response()
     # Save to new alignment text file
     with open(f"production/alignment_{str(round)}.txt", "w") as file:
-        file.write(response.text)
+        file.write(response_text)
 
 
 if __name__ == "__main__":
@@ -1,21 +1,159 @@
 import requests
-from datetime import datetime, timedelta
+from requests.adapters import HTTPAdapter
+from collections import deque
+from datetime import date, datetime, timedelta
+from urllib.parse import quote
 from typing import Dict, Optional
+from html.parser import HTMLParser
+from disk_cache import DiskCache, CACHE_DIR
+from rate_limiter import acquire
+import threading
+import codecs
+import json
+import html
+import time
+import os
 import re
 
+# Wikipedia API endpoints
+BASE_URL = "https://en.wikipedia.org/w/api.php"
+REST_URL = "https://en.wikipedia.org/w/rest.php/v1"
 
-def run_get_request(params: dict):
+# We need to supply headers for the request to work
+HEADERS = {
+    "User-Agent": f"NoteworthyDifferences/1.0 (j3ffdick@gmail.com) requests/{requests.__version__}"
+}
+
+# Default settings for the shared HTTP session
+POOL_SIZE = 10
+# Connect and read timeouts in seconds
+TIMEOUT = (5, 30)
+
+# Shared session (created on first use) and its settings
+_session = None
+_session_settings = {"pool_size": POOL_SIZE, "timeout": TIMEOUT, "gzip": True}
+_session_lock = threading.Lock()
+
+# Persistent cache of introductions keyed by revid (the content of a revision never changes)
+introduction_cache = DiskCache(
+    os.path.join(CACHE_DIR, "introductions.sqlite"), max_entries=5000
+)
+
+# Timings for the most recent requests
+_request_timings = deque(maxlen=1000)
+_timings_lock = threading.Lock()
+
+
+def configure_session(pool_size: int = POOL_SIZE, timeout=TIMEOUT, gzip: bool = True):
     """
-    Utility function to run GET request against Wikipedia API
+    Configure the shared HTTP session used for all Wikipedia API calls.
+    The existing session (if any) is closed and a new one is created on the next request.
+
+    Args:
+        pool_size: Maximum number of keep-alive connections kept in the pool
+        timeout: Timeout in seconds, either a number or a (connect, read) tuple
+        gzip: Request gzip-compressed responses
+    """
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+        _session = None
+        _session_settings.update(pool_size=pool_size, timeout=timeout, gzip=gzip)
+
+
+def get_session() -> requests.Session:
+    """
+    Return the shared connection-pooled session, creating it if needed.
+    The session is safe to share between threads (e.g. Gradio workers).
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(
+                pool_connections=1, pool_maxsize=_session_settings["pool_size"]
+            )
+            session.mount("https://", adapter)
+            session.headers.update(HEADERS)
+            if _session_settings["gzip"]:
+                session.headers["Accept-Encoding"] = "gzip"
+            else:
+                session.headers["Accept-Encoding"] = "identity"
+            _session = session
+        return _session
+
+
+def _connection_count(session: requests.Session) -> int:
+    """
+    Number of connections opened so far by the session's connection pools.
     """
-    base_url = "https://en.wikipedia.org/w/api.php"
+    pools = session.get_adapter(BASE_URL).poolmanager.pools
+    return sum(pools[key].num_connections for key in pools.keys())
+
+
+def get_request_timings() -> list:
+    """
+    Get timings for the most recent Wikipedia API requests.
+
+    Returns:
+        List of dictionaries (oldest first) containing:
+        - 'action': API action (e.g. 'query' or 'parse')
+        - 'new_connection': True if a new TCP+TLS connection was opened for the request
+        - 'elapsed': Seconds from sending the request until the response headers arrived
+        - 'total': Seconds for the complete request including download and JSON decoding
+        - 'bytes': Size of the (decompressed) response body
 
-    # We need to supply headers for the request to work
-    headers = {
-        "User-Agent": f"NoteworthyDifferences/1.0 (j3ffdick@gmail.com) requests/{requests.__version__}"
+    Note:
+        new_connection is inferred from the pool's connection count,
+        so it is approximate when several threads make requests at the same time.
+    """
+    with _timings_lock:
+        return list(_request_timings)
+
+
+def get_request_stats() -> Dict[str, float]:
+    """
+    Summarize the request timings to show how much latency comes from connection setup.
+
+    Returns:
+        Dictionary with number of requests and new connections and the mean total time
+        (in seconds) for requests on new and reused connections
+    """
+    timings = get_request_timings()
+    new = [t["total"] for t in timings if t["new_connection"]]
+    reused = [t["total"] for t in timings if not t["new_connection"]]
+    return {
+        "requests": len(timings),
+        "new_connections": len(new),
+        "mean_total_new": sum(new) / len(new) if new else None,
+        "mean_total_reused": sum(reused) / len(reused) if reused else None,
     }
 
-    response = requests.get(base_url, params=params, headers=headers)
+
+def clear_request_timings():
+    """
+    Remove all recorded request timings.
+    """
+    with _timings_lock:
+        _request_timings.clear()
+
+
+def run_get_request(params: dict, url: str = BASE_URL):
+    """
+    Utility function to run GET request against Wikipedia API
+
+    Args:
+        params: Query parameters
+        url: URL of the Action API (default) or a REST API endpoint
+    """
+    session = get_session()
+    # Wait for the shared Wikipedia rate limiter
+    acquire("wikipedia")
+    connections_before = _connection_count(session)
+    start = time.perf_counter()
+
+    response = session.get(url, params=params, timeout=_session_settings["timeout"])
     # Handle HTTP errors
     response.raise_for_status()
 
@@ -24,9 +162,33 @@ def run_get_request(params: dict):
     except Exception:
         raise ValueError(f"Unable to parse response: {response}")
 
+    # Record timing for this request
+    _record_timing(
+        params.get("action", "rest"),
+        _connection_count(session) > connections_before,
+        response.elapsed.total_seconds(),
+        start,
+        len(response.content),
+    )
+
     return json_data
 
 
+def _record_timing(action, new_connection, elapsed, start, nbytes):
+    """
+    Save the timing of a completed request (see get_request_timings()).
+    """
+    timing = {
+        "action": action,
+        "new_connection": new_connection,
+        "elapsed": elapsed,
+        "total": time.perf_counter() - start,
+        "bytes": nbytes,
+    }
+    with _timings_lock:
+        _request_timings.append(timing)
+
+
 def extract_revision_info(json_data, revnum=0, limit_revnum=True):
     """
     Utility function to extract page revision info from JSON data returned from API call
@@ -75,11 +237,22 @@ def get_revision_from_age(title: str, age_days: int = 0) -> Dict[str, str]:
         - 'timestamp': Timestamp of the article revision
     """
 
+    # Run GET request
+    json_data = run_get_request(revision_from_age_params(title, age_days))
+
+    # Return revision info
+    return extract_revision_info(json_data)
+
+
+def revision_from_age_params(title: str, age_days: int = 0) -> dict:
+    """
+    Get the API parameters for get_revision_from_age().
+    """
     # Get the target date
     target_date = datetime.utcnow() - timedelta(days=age_days)
 
     # Get the revision closest to the target date
-    params = {
+    return {
         "action": "query",
         "titles": title,
         "prop": "revisions",
@@ -90,12 +263,6 @@ def get_revision_from_age(title: str, age_days: int = 0) -> Dict[str, str]:
         "format": "json",
     }
 
-    # Run GET request
-    json_data = run_get_request(params)
-
-    # Return revision info
-    return extract_revision_info(json_data)
-
 
 def get_previous_revisions(title: str, revisions: int = 0) -> Dict[str, str]:
     """
@@ -117,8 +284,18 @@ def get_previous_revisions(title: str, revisions: int = 0) -> Dict[str, str]:
         This is why we use rvlimit = revision + 1
     """
 
-    # Get the revision closest to the target date
-    params = {
+    # Run GET request
+    json_data = run_get_request(previous_revisions_params(title, revisions))
+
+    # Return info for all revisions
+    return json_data
+
+
+def previous_revisions_params(title: str, revisions: int = 0) -> dict:
+    """
+    Get the API parameters for get_previous_revisions().
+    """
+    return {
         "action": "query",
         "prop": "revisions",
         "titles": title,
@@ -128,19 +305,335 @@ def get_previous_revisions(title: str, revisions: int = 0) -> Dict[str, str]:
         "format": "json",
     }
 
-    # Run GET request
-    json_data = run_get_request(params)
 
-    # Return info for all revisions
-    return json_data
+def get_introduction_cache_stats() -> Dict[str, int]:
+    """
+    Get the hit and miss counters and number of entries for the introduction cache.
+    """
+    return introduction_cache.stats()
+
+
+# API error codes for revisions that can't be parsed in any mode
+REVISION_ERROR_CODES = ["nosuchrevid", "permissiondenied"]
+
+
+def parse_params(revid: int, mode: str = "lead") -> dict:
+    """
+    Get the API parameters to download the rendered HTML of a revision.
+
+    Args:
+        revid: Revision id of the article
+        mode: "lead" to get only the lead section (section 0) or "full" for the whole article
+    """
+    params = {
+        "action": "parse",
+        "oldid": revid,
+        "prop": "text",
+        "format": "json",
+        "utf8": 1,
+    }
+    if mode == "lead":
+        # Only the introduction is needed, so skip the rest of the article
+        # and the parts of the output we don't use
+        params.update(
+            section=0, disablelimitreport=1, disableeditsection=1, disabletoc=1
+        )
+    elif mode != "full":
+        raise ValueError(f"Unknown mode: {mode}")
+    return params
+
+
+class IntroParser(HTMLParser):
+    """
+    Incremental parser for the text of the paragraphs in an introduction.
+
+    HTML can be fed in chunks. Parsing stops at the first <h2> tag (the first section heading),
+    after which `done` is True and further input is ignored.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.text = []
+        self.in_p = False
+        self.skip = False
+        self.done = False
+
+    def feed(self, data):
+        if not self.done:
+            super().feed(data)
+
+    def close(self):
+        if not self.done:
+            super().close()
+
+    def handle_starttag(self, tag, attrs):
+        if self.done:
+            return
+        # Stop at the first section heading
+        if tag == "h2":
+            self.done = True
+            return
+        if tag == "p":
+            self.in_p = True
+        # Skip certain elements
+        if tag in ["style", "script", "table", "div"]:
+            attrs_dict = dict(attrs)
+            # Skip infoboxes, navboxes, etc.
+            if "class" in attrs_dict:
+                if any(
+                    x in attrs_dict["class"]
+                    for x in ["infobox", "navbox", "metadata", "toc"]
+                ):
+                    self.skip = True
+            if tag in ["style", "script"]:
+                self.skip = True
+
+    def handle_endtag(self, tag):
+        if self.done:
+            return
+        if tag == "p":
+            if self.in_p and self.text and not self.text[-1].endswith("\n\n"):
+                self.text.append("\n\n")
+            self.in_p = False
+        if tag in ["style", "script", "table", "div"]:
+            self.skip = False
+
+    def handle_data(self, data):
+        if self.in_p and not self.skip and not self.done:
+            # *Don't* clean up whitespace here - it makes run-on words
+            # text = " ".join(data.split())
+            text = data
+            if text:
+                self.text.append(text)
+
+    def introduction(self) -> str:
+        """
+        Get the cleaned-up text of the introduction parsed so far.
+        """
+        return clean_introduction("".join(self.text))
+
+
+def extract_introduction(html_content: str) -> str:
+    """
+    Extract the text of the introduction from the rendered HTML of an article.
+
+    Args:
+        html_content: HTML of the whole article or only its lead section
+
+    Returns:
+        Text of the paragraphs before the first section heading
+    """
+    parser = IntroParser()
+    parser.feed(html_content)
+    parser.close()
+    return parser.introduction()
+
+
+# Characters in a JSON string that can be copied without decoding
+UNESCAPED_RUN = re.compile(r'[^"\\]+')
+
+# Size of chunks read from streamed responses
+CHUNK_SIZE = 8192
+
+
+class ParseTextStream:
+    """
+    Incremental decoder for the HTML string in the JSON response of a parse API request.
+
+    Each chunk of the response body is passed to feed(), which returns the HTML decoded so far,
+    without buffering the whole response. If the response has no HTML (e.g. an API error),
+    the body is kept in `buffer` so it can be parsed as JSON.
+    """
+
+    # The HTML is the string value of this key
+    KEY = re.compile(r'"text"\s*:\s*\{\s*"\*"\s*:\s*"')
+    ESCAPES = {
+        '"': '"',
+        "\\": "\\",
+        "/": "/",
+        "b": "\b",
+        "f": "\f",
+        "n": "\n",
+        "r": "\r",
+        "t": "\t",
+    }
+
+    def __init__(self):
+        self.buffer = ""
+        self.found = False
+        self.finished = False
+
+    def feed(self, text: str) -> str:
+        if self.finished:
+            return ""
+        self.buffer += text
+        if not self.found:
+            match = self.KEY.search(self.buffer)
+            if not match:
+                return ""
+            self.found = True
+            self.buffer = self.buffer[match.end() :]
+
+        html = []
+        buffer = self.buffer
+        i = 0
+        while i < len(buffer):
+            # Copy runs of unescaped characters
+            match = UNESCAPED_RUN.match(buffer, i)
+            if match:
+                html.append(match.group(0))
+                i = match.end()
+                continue
+            if buffer[i] == '"':
+                # End of the string
+                self.finished = True
+                break
+            # Wait for the rest of an escape sequence that is split between chunks
+            if i + 1 >= len(buffer):
+                break
+            escape = buffer[i + 1]
+            if escape != "u":
+                html.append(self.ESCAPES[escape])
+                i += 2
+                continue
+            if i + 6 > len(buffer):
+                break
+            code = int(buffer[i + 2 : i + 6], 16)
+            if 0xD800 <= code < 0xDC00:
+                # Surrogate pair
+                if i + 12 > len(buffer):
+                    break
+                low = int(buffer[i + 8 : i + 12], 16)
+                html.append(chr(0x10000 + ((code - 0xD800) << 10) + (low - 0xDC00)))
+                i += 12
+            else:
+                html.append(chr(code))
+                i += 6
+        self.buffer = buffer[i:]
+        return "".join(html)
+
+
+class IntroductionStream:
+    """
+    Extract the introduction from chunks of the JSON response of a parse API request.
+    Chunks are passed to feed() until it returns True (the first section heading was reached)
+    or the response ends, then result() gives the introduction.
+    """
+
+    def __init__(self):
+        self.decoder = codecs.getincrementaldecoder("utf-8")()
+        self.stream = ParseTextStream()
+        self.parser = IntroParser()
+        self.nbytes = 0
+
+    def feed(self, chunk: bytes) -> bool:
+        self.nbytes += len(chunk)
+        self.parser.feed(self.stream.feed(self.decoder.decode(chunk)))
+        # The caller stops reading at the first heading, and the unread rest of the response
+        # is discarded when the connection is closed
+        return self.parser.done
+
+    def result(self) -> tuple:
+        """
+        Returns:
+            Tuple of (introduction, json_data, nbytes): introduction is None if the response has no HTML,
+            in which case json_data is the decoded JSON response (e.g. with an error); nbytes is the number
+            of bytes read
+        """
+        if not self.stream.found:
+            buffer = self.stream.buffer + self.decoder.decode(b"", final=True)
+            try:
+                json_data = json.loads(buffer)
+            except Exception:
+                raise ValueError(f"Unable to parse response: {buffer[:200]}")
+            return None, json_data, self.nbytes
+
+        self.parser.close()
+        return self.parser.introduction(), None, self.nbytes
+
+
+def stream_introduction(chunks) -> tuple:
+    """
+    Extract the introduction from chunks of the JSON response of a parse API request.
+    Reading stops at the first section heading, so the rest of the article is not decoded or parsed.
+
+    Args:
+        chunks: Iterable of bytes (e.g. response.iter_content())
+
+    Returns:
+        Tuple of (introduction, json_data, nbytes) (see IntroductionStream.result())
+    """
+    stream = IntroductionStream()
+    for chunk in chunks:
+        if stream.feed(chunk):
+            break
+    return stream.result()
 
 
-def get_wikipedia_introduction(revid: int) -> Dict[str, str]:
+def run_streaming_parse_request(params: dict) -> tuple:
+    """
+    Run a parse API request and extract the introduction while the response is downloaded.
+    Once the first section heading is reached, the connection is closed (instead of being
+    returned to the pool) without downloading the rest of the article.
+
+    Returns:
+        Tuple of (introduction, json_data) as for stream_introduction()
+    """
+    session = get_session()
+    # Wait for the shared Wikipedia rate limiter
+    acquire("wikipedia")
+    connections_before = _connection_count(session)
+    start = time.perf_counter()
+
+    with session.get(
+        BASE_URL, params=params, timeout=_session_settings["timeout"], stream=True
+    ) as response:
+        # Handle HTTP errors
+        response.raise_for_status()
+        introduction, json_data, nbytes = stream_introduction(
+            response.iter_content(CHUNK_SIZE)
+        )
+
+    # Record timing for this request
+    _record_timing(
+        params["action"],
+        _connection_count(session) > connections_before,
+        response.elapsed.total_seconds(),
+        start,
+        nbytes,
+    )
+
+    return introduction, json_data
+
+
+def clean_introduction(text: str) -> str:
+    """
+    Clean up the text of an introduction: remove extra newlines and empty paragraphs.
+    """
+    # Join and clean up the text
+    introduction = text.strip()
+
+    # Remove multiple newlines
+    introduction = re.sub(r"\n{3,}", "\n\n", introduction)
+
+    # Remove empty paragraphs
+    paragraphs = [p.strip() for p in introduction.split("\n\n") if p.strip()]
+    introduction = "\n\n".join(paragraphs)
+
+    return introduction
+
+
+def get_wikipedia_introduction(
+    revid: int, use_cache: bool = True, mode: str = "lead"
+) -> Dict[str, str]:
     """
     Retrieve the introduction of a Wikipedia article.
 
     Args:
         revid: Revision id of the article
+        use_cache: Look up and store the introduction in the persistent cache
+        mode: "lead" to download only the lead section, or "full" to download the whole article.
+            The lead mode falls back to the full article if the lead section can't be used.
 
     Returns:
         Text of the introduction
@@ -155,175 +648,769 @@ def get_wikipedia_introduction(revid: int) -> Dict[str, str]:
     if not revid:
         return None
 
-    # Get the content of this specific revision
-    params = {"action": "parse", "oldid": revid, "prop": "text", "format": "json"}
+    if use_cache:
+        introduction = introduction_cache.get(str(revid))
+        if introduction is not None:
+            return introduction
 
-    json_data = run_get_request(params)
+    # Get the introduction of this specific revision
+    introduction, json_data = run_streaming_parse_request(parse_params(revid, mode))
+
+    # Fall back to the full article if the lead section isn't available,
+    # unless the revision itself is missing or deleted
+    if introduction is None and mode == "lead":
+        error_code = json_data.get("error", {}).get("code")
+        if error_code not in REVISION_ERROR_CODES:
+            introduction, json_data = run_streaming_parse_request(
+                parse_params(revid, "full")
+            )
 
     # Sometimes a revision is deleted and can't be viewed
     # E.g. revid = '1276494621' for Turin
+    if introduction is None:
+        return None
+
+    if use_cache:
+        introduction_cache.set(str(revid), introduction)
+
+    return introduction
+
+
+# Maximum number of revids in one query for revision content (API limit)
+MAX_REVIDS = 50
+
+# Placeholder for a reference marker: group and key between control characters
+REFERENCE_PLACEHOLDER = "\x00{group}\x01{key}\x00"
+
+# Groups of footnotes that are labeled with letters
+ALPHA_GROUPS = {"lower-alpha": "abcdefghijklmnopqrstuvwxyz"}
+ALPHA_GROUPS["upper-alpha"] = ALPHA_GROUPS["lower-alpha"].upper()
+
+# Footnote templates and their reference groups
+FOOTNOTE_TEMPLATES = {
+    "efn": "lower-alpha",
+    "efn-la": "lower-alpha",
+    "efn-ua": "upper-alpha",
+}
+
+# Templates that are rendered as the text of their last unnamed parameter
+TEXT_TEMPLATES = [
+    "lang",
+    "langx",
+    "nowrap",
+    "nobr",
+    "small",
+    "big",
+    "noitalic",
+    "transl",
+    "script",
+]
+
+# Templates that are rendered as fixed text
+FIXED_TEMPLATES = {
+    "citation needed": "[citation needed]",
+    "cn": "[citation needed]",
+    "fact": "[citation needed]",
+    "snd": " – ",
+    "spaced ndash": " – ",
+    "ndash": "–",
+    "mdash": "—",
+    "nbsp": "\xa0",
+}
+
+# Date templates: "birth", "death", or "date" (no age)
+DATE_TEMPLATES = {
+    "birth date": "date",
+    "dob": "date",
+    "birth date and age": "birth",
+    "bda": "birth",
+    "death date": "date",
+    "death date and age": "death",
+    "dda": "death",
+    "start date": "date",
+    "end date": "date",
+    "start date and age": "date",
+}
+
+MONTHS = [
+    "January",
+    "February",
+    "March",
+    "April",
+    "May",
+    "June",
+    "July",
+    "August",
+    "September",
+    "October",
+    "November",
+    "December",
+]
+
+# Units for the convert template: unit -> (name, symbol, default output unit, conversion)
+# (the conversion gives the value in the output unit)
+CONVERT_UNITS = {
+    "km": ("kilometres", "km", "mi", lambda x: x / 1.609344),
+    "m": ("metres", "m", "ft", lambda x: x / 0.3048),
+    "cm": ("centimetres", "cm", "in", lambda x: x / 2.54),
+    "mi": ("miles", "mi", "km", lambda x: x * 1.609344),
+    "ft": ("feet", "ft", "m", lambda x: x * 0.3048),
+    "in": ("inches", "in", "cm", lambda x: x * 2.54),
+    "kg": ("kilograms", "kg", "lb", lambda x: x / 0.45359237),
+    "lb": ("pounds", "lb", "kg", lambda x: x * 0.45359237),
+    "km2": ("square kilometres", "km2", "sqmi", lambda x: x / 2.589988),
+    "sqmi": ("square miles", "sq mi", "km2", lambda x: x * 2.589988),
+    "ha": ("hectares", "ha", "acre", lambda x: x / 0.4046856),
+    "acre": ("acres", "acres", "ha", lambda x: x * 0.4046856),
+    "C": ("°C", "°C", "F", lambda x: x * 9 / 5 + 32),
+    "F": ("°F", "°F", "C", lambda x: (x - 32) * 5 / 9),
+    "km/h": ("kilometres per hour", "km/h", "mph", lambda x: x / 1.609344),
+    "mph": ("miles per hour", "mph", "km/h", lambda x: x * 1.609344),
+}
+
+
+def _reference_placeholder(group: str, key: str) -> str:
+    """
+    Mark the position of a reference; the markers are numbered after all templates are expanded.
+    """
+    return REFERENCE_PLACEHOLDER.format(group=group, key=key)
+
+
+def _split_template(content: str) -> list:
+    """
+    Split the content of a template on "|" characters that are not inside links.
+    """
+    parts = [""]
+    depth = 0
+    i = 0
+    while i < len(content):
+        if content.startswith("[[", i):
+            depth += 1
+            parts[-1] += "[["
+            i += 2
+        elif content.startswith("]]", i) and depth > 0:
+            depth -= 1
+            parts[-1] += "]]"
+            i += 2
+        elif content[i] == "|" and depth == 0:
+            parts.append("")
+            i += 1
+        else:
+            parts[-1] += content[i]
+            i += 1
+    return parts
+
+
+def _format_number(value: str) -> str:
+    """
+    Add thousands separators to a number (as the formatnum magic word does).
+    """
+    match = re.fullmatch(r"(-?)(\d+)(\.\d+)?", value.strip().replace(",", ""))
+    if not match:
+        return value.strip()
+    sign, integer, fraction = match.groups()
+    return f"{sign}{int(integer):,}{fraction or ''}"
+
+
+def _format_date(parts: list, named: dict) -> str:
+    """
+    Format a date from year, month, and day parameters (month and day are optional).
+    Dates are month first unless the df parameter is set, as in the date templates.
+    """
+    parts = [part for part in parts[:3] if part]
+    if not parts:
+        return ""
     try:
-        html_content = json_data["parse"]["text"]["*"]
-    except:
+        numbers = [int(part) for part in parts]
+    except ValueError:
+        return " ".join(parts)
+    if len(numbers) == 1 or not 1 <= numbers[1] <= 12:
+        return str(numbers[0])
+    month = MONTHS[numbers[1] - 1]
+    if len(numbers) == 2:
+        return f"{month} {numbers[0]}"
+    if named.get("df", "").lower() in ["y", "yes"]:
+        return f"{numbers[2]} {month} {numbers[0]}"
+    return f"{month} {numbers[2]}, {numbers[0]}"
+
+
+def _iso_date(parts: list) -> str:
+    """
+    Format a date in ISO format (the hidden date in the rendered date templates).
+    """
+    numbers = [int(part) for part in parts[:3] if part.isdigit()]
+    return "-".join([f"{numbers[0]:04d}"] + [f"{number:02d}" for number in numbers[1:]])
+
+
+def _age(start: list, end: list = None) -> Optional[int]:
+    """
+    Age in whole years between two dates given as [year, month, day] strings (end: today).
+    """
+    try:
+        start = [int(part) for part in start[:3]]
+        end = [int(part) for part in end[:3]] if end else None
+    except ValueError:
         return None
+    if len(start) < 3 or (end is not None and len(end) < 3):
+        return None
+    end = end or [date.today().year, date.today().month, date.today().day]
+    return end[0] - start[0] - ((end[1], end[2]) < (start[1], start[2]))
 
-    # Extract introduction (text before first section heading)
-    # Remove everything from the first <h2> tag onwards
-    intro_html = re.split(r"<h2", html_content, maxsplit=1)[0]
 
-    # Extract text from paragraphs, excluding certain elements
-    from html.parser import HTMLParser
+def _render_date(kind: str, positional: list, named: dict) -> str:
+    """
+    Render a date template, e.g. {{birth date and age|1974|1|5}}
+    as " (1974-01-05) January 5, 1974 (age 51)".
+    """
+    positional = [part for part in positional if part]
+    text = _format_date(positional, named)
+    if not text or not positional[0].isdigit():
+        return text
+    text = f" ({_iso_date(positional)}) {text}"
+    if kind == "birth":
+        age = _age(positional)
+        if age is not None:
+            text += f" (age\xa0{age})"
+    elif kind == "death":
+        age = _age(positional[3:6], positional[:3])
+        if age is not None:
+            text += f" (aged\xa0{age})"
+    return text
+
+
+def _render_convert(positional: list, named: dict) -> str:
+    """
+    Render a convert template, e.g. {{convert|100|km|mi}} as "100 kilometres (62 mi)".
+    Only the units in CONVERT_UNITS are converted (to their default output unit);
+    other values are shown with their unit and no conversion.
+    """
+    values = [positional[0]]
+    rest = positional[1:]
+    # Ranges like {{convert|1|to|3|km}}
+    if len(rest) >= 2 and rest[0] in ["to", "-", "–", "and", "or"]:
+        values.append(rest[1])
+        rest = rest[2:]
+    text = " – ".join(_format_number(value) for value in values)
+    if not rest:
+        return text
+    unit = rest[0]
+    if unit not in CONVERT_UNITS:
+        return f"{text} {unit}"
+    name, symbol, output, conversion = CONVERT_UNITS[unit]
+    text += f" {symbol if named.get('abbr') in ['on', 'in'] else name}"
+    if len(rest) > 1 and rest[1] != output:
+        return text
+    converted = []
+    for value in values:
+        value = value.replace(",", "")
+        try:
+            number = conversion(float(value))
+        except ValueError:
+            return text
+        # Round to about the precision of the input (at least two significant digits)
+        significant = value.replace(".", "") if "." in value else value.rstrip("0")
+        digits = max(2, len(significant.lstrip("-0")))
+        converted.append(_format_number(f"{float(f'{number:.{digits}g}'):.10g}"))
+    return text + f" ({' – '.join(converted)} {CONVERT_UNITS[output][1]})"
 
-    class IntroParser(HTMLParser):
-        def __init__(self):
-            super().__init__()
-            self.text = []
-            self.in_p = False
-            self.skip = False
 
-        def handle_starttag(self, tag, attrs):
-            if tag == "p":
-                self.in_p = True
-            # Skip certain elements
-            if tag in ["style", "script", "table", "div"]:
-                attrs_dict = dict(attrs)
-                # Skip infoboxes, navboxes, etc.
-                if "class" in attrs_dict:
-                    if any(
-                        x in attrs_dict["class"]
-                        for x in ["infobox", "navbox", "metadata", "toc"]
-                    ):
-                        self.skip = True
-                if tag in ["style", "script"]:
-                    self.skip = True
+def _render_template(content: str, counter: list) -> str:
+    """
+    Render a template as plain text, approximating the rendered HTML.
+    Templates that don't produce text in the paragraphs of an introduction
+    (infoboxes, hatnotes, pronunciations, etc.) are removed.
 
-        def handle_endtag(self, tag):
-            if tag == "p":
-                if self.in_p and self.text and not self.text[-1].endswith("\n\n"):
-                    self.text.append("\n\n")
-                self.in_p = False
-            if tag in ["style", "script", "table", "div"]:
-                self.skip = False
-
-        def handle_data(self, data):
-            if self.in_p and not self.skip:
-                # *Don't* clean up whitespace here - it makes run-on words
-                # text = " ".join(data.split())
-                text = data
-                if text:
-                    self.text.append(text)
+    Args:
+        content: Text between the braces of the template
+        counter: One-element list used to number unnamed references
+    """
+    parts = _split_template(content)
+    name = parts[0].strip().lower().replace("_", " ")
+    positional = [part.strip() for part in parts[1:] if "=" not in part]
+    named = dict(
+        [x.strip() for x in part.split("=", 1)] for part in parts[1:] if "=" in part
+    )
+
+    if name in FOOTNOTE_TEMPLATES or name == "refn":
+        group = FOOTNOTE_TEMPLATES.get(name) or named.get("group", "")
+        key = named.get("name")
+        if not key:
+            counter[0] += 1
+            key = f"#{counter[0]}"
+        return _reference_placeholder(group, key)
+    if name in ["sfn", "sfnp", "sfnm"]:
+        # Short footnotes with the same arguments share a number
+        return _reference_placeholder("", "sfn:" + "|".join(parts[1:]))
+    if name == "r" and positional:
+        return "".join(_reference_placeholder("", key) for key in positional)
+    if name in FIXED_TEMPLATES:
+        return FIXED_TEMPLATES[name]
+    if name in TEXT_TEMPLATES or name.startswith("lang-"):
+        return positional[-1] if positional else ""
+    if name == "ill":
+        return positional[0] if positional else ""
+    if name in ["circa", "c."]:
+        return f"c.\u2009{positional[0]}" if positional else "c."
+    if name in ["convert", "cvt"] and positional:
+        return _render_convert(positional, named)
+    if name in DATE_TEMPLATES:
+        return _render_date(DATE_TEMPLATES[name], positional, named)
+    if name == "birth year and age" and positional and positional[0].isdigit():
+        age = date.today().year - int(positional[0])
+        return f"{positional[0]} (age\xa0{age - 1}–{age})"
+    if name == "as of" and positional:
+        if named.get("alt"):
+            return named["alt"]
+        text = "as of" if named.get("lc", "").lower() in ["y", "yes"] else "As of"
+        return f"{text} {_format_date(positional, named)}"
+    if name.startswith("formatnum:"):
+        return _format_number(parts[0].split(":", 1)[1])
+    return ""
+
+
+def _tag_attribute(attrs: str, name: str) -> Optional[str]:
+    """
+    Get the value of an attribute (quoted or not) from the attributes of an HTML tag.
+    """
+    match = re.search(
+        name + r"""\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s/>]+))""", attrs, flags=re.I
+    )
+    if not match:
+        return None
+    return next(value for value in match.groups() if value is not None).strip()
 
-    parser = IntroParser()
-    parser.feed(intro_html)
 
-    # Join and clean up the text
-    introduction = "".join(parser.text).strip()
+def _reference_label(group: str, number: int) -> str:
+    """
+    Label of a reference marker, e.g. [1], [a], or [n 1].
+    """
+    if group == "":
+        return f"[{number}]"
+    if group in ALPHA_GROUPS:
+        letters = ALPHA_GROUPS[group]
+        label = ""
+        while number > 0:
+            number, remainder = divmod(number - 1, len(letters))
+            label = letters[remainder] + label
+        return f"[{label}]"
+    return f"[{group} {number}]"
+
+
+def _number_references(text: str) -> str:
+    """
+    Replace reference placeholders with numbered markers in order of first use.
+    """
+    counts = {}
+    numbers = {}
 
-    # Remove multiple newlines
-    introduction = re.sub(r"\n{3,}", "\n\n", introduction)
+    def replace(match):
+        group, key = match.group(1), match.group(2)
+        if (group, key) not in numbers:
+            counts[group] = counts.get(group, 0) + 1
+            numbers[(group, key)] = counts[group]
+        return _reference_label(group, numbers[(group, key)])
 
-    # Remove empty paragraphs
-    paragraphs = [p.strip() for p in introduction.split("\n\n") if p.strip()]
-    introduction = "\n\n".join(paragraphs)
+    return re.sub("\x00([^\x00\x01]*)\x01([^\x00]*)\x00", replace, text)
 
-    return introduction
 
+# Template with no other templates inside it
+TEMPLATE = re.compile(r"\{\{((?:[^{}]|\{(?!\{)|\}(?!\}))*)\}\}")
 
-def get_revisions_behind(title: str, revid: int) -> int:
+
+def wikitext_to_text(wikitext: str) -> str:
     """
-    Get the number of revisions a given revid is behind the current revision of the page.
+    Convert the wikitext of a lead section to plain text.
+
+    The output approximates extract_introduction() applied to the rendered HTML:
+    text of the paragraphs with links and formatting removed and numbered
+    reference markers like [1]. Templates are not expanded by the MediaWiki
+    parser, so only common inline templates are rendered, including dates,
+    "as of", formatnum, and convert for common units (see _render_template()).
+    Other templates are removed.
 
     Args:
-        revid: Revision ID of the page
+        wikitext: Wikitext of the lead section
 
     Returns:
-        Integer representing the number of revisions back (0 if it's the current revision)
+        Text of the introduction
+    """
+    # Unnamed references are numbered with a counter
+    counter = [0]
+
+    def ref_tag(match):
+        attrs = match.group(1) or ""
+        key = _tag_attribute(attrs, "name")
+        if not key:
+            counter[0] += 1
+            key = f"#{counter[0]}"
+        return _reference_placeholder(_tag_attribute(attrs, "group") or "", key)
+
+    # Remove comments
+    text = re.sub(r"<!--.*?-->", "", wikitext, flags=re.S)
+    # Replace references with placeholders (this also removes citation templates)
+    text = re.sub(
+        r"<ref\b([^>]*?)(?:/>|>.*?</ref\s*>)", ref_tag, text, flags=re.S | re.I
+    )
+
+    # Render templates, starting with the innermost ones
+    n = 1
+    while n:
+        text, n = TEMPLATE.subn(
+            lambda match: _render_template(match.group(1), counter), text
+        )
+
+    # Remove tables, starting with the innermost ones
+    table = re.compile(r"\{\|(?:(?!\{\|).)*?\|\}", flags=re.S)
+    n = 1
+    while n:
+        text, n = table.subn("", text)
+
+    # Replace links with their labels and remove files and categories,
+    # starting with the innermost links (e.g. links in image captions)
+    def link(match):
+        target = match.group(1).strip()
+        if re.match(r"(file|image|category):", target, flags=re.I):
+            return ""
+        if match.group(2) is not None:
+            return match.group(2)
+        return target.lstrip(":")
+
+    n = 1
+    while n:
+        text, n = re.subn(
+            r"\[\[([^\[\]|]*)(?:\|((?:[^\[\]]|\[(?!\[)|\](?!\]))*))?\]\]", link, text
+        )
+
+    # External links: keep the label (links without labels are rendered as numbers)
+    text = re.sub(r"\[(?:https?:)?//[^\s\]]+\s+([^\]]*)\]", r"\1", text)
+    text = re.sub(r"\[(?:https?:)?//[^\s\]]+\]", "", text)
+    # Bold and italic formatting
+    text = re.sub(r"'{2,5}", "", text)
+    # HTML tags (keep their content) and behavior switches like __NOTOC__
+    text = re.sub(r"</?[a-zA-Z][^>]*>", "", text)
+    text = re.sub(r"__[A-Z]+__", "", text)
+    text = html.unescape(text)
+
+    # Keep only paragraph text: lists, indented lines, and headings aren't paragraphs
+    lines = [
+        line
+        for line in text.split("\n")
+        if not line.startswith(("*", "#", ":", ";", "=", "----"))
+    ]
+    text = _number_references("\n".join(lines))
+
+    return clean_introduction(text)
+
+
+def removed_templates(wikitext: str) -> list:
+    """
+    Get the templates in the paragraphs of a lead section that wikitext_to_text() removes.
+
+    These templates may add text to the rendered introduction that isn't in the
+    converted text, so an edit that only changes them isn't seen by comparing the
+    converted introductions. Templates on their own lines (infoboxes, hatnotes, etc.)
+    and in lists, tables, and template parameters aren't in the paragraphs and are left out.
+
+    Args:
+        wikitext: Wikitext of the lead section
+
+    Returns:
+        List of templates (with whitespace normalized) in the order they were removed
 
     Example:
-        # Get how many revisions behind a specific revid is
-        revisions_behind = get_revisions_behind(123456789)
-    """
-
-    ## First, get the page title from the revid
-    # params = {"action": "parse", "oldid": revid, "prop": "title", "format": "json"}
-    # try:
-    #    json_data = run_get_request(params)
-    #    title = json_data["parse"]["title"]
-    # except Exception:
-    #    # If we can't get the title, the revid might be invalid
-    #    raise ValueError(f"Could not retrieve page title for revid {revid}. The revid may be invalid or deleted.")
-
-    # Search through revisions going back from current
-    # We'll paginate through results if needed
-    revision_count = 0
-    continue_token = None
-
-    # Run the loop twice to get up to 1000 revisions behind
-    for i in range(2):
-        params = {
-            "action": "query",
-            "titles": title,
-            "prop": "revisions",
-            "rvlimit": 500,  # API limit per request
-            "rvdir": "older",
-            "rvprop": "ids",
-            "format": "json",
-        }
-
-        if continue_token:
-            params["rvcontinue"] = continue_token
+        removed_templates("Turin {{IPA|it|toˈriːno}} is a city.{{citation needed}}")
+        # ['{{IPA|it|toˈriːno}}'] (citation needed is rendered as [citation needed])
+    """
+    removed = []
+
+    def render(match):
+        text = _render_template(match.group(1), [0])
+        # Text before the template on its line
+        line = match.string[
+            match.string.rfind("\n", 0, match.start()) + 1 : match.start()
+        ]
+        if (
+            not text
+            and line.strip()
+            and not line.lstrip().startswith(("|", "!", "{", "*", "#", ":", ";", "="))
+        ):
+            removed.append(" ".join(match.group(0).split()))
+        return text
+
+    text = re.sub(r"<!--.*?-->", "", wikitext, flags=re.S)
+    text = re.sub(r"<ref\b[^>]*?(?:/>|>.*?</ref\s*>)", "", text, flags=re.S | re.I)
+    n = 1
+    while n:
+        text, n = TEMPLATE.subn(render, text)
+    return removed
+
+
+# Prefix of cache keys for introductions from wikitext (changed when the conversion
+# changes, so introductions converted with older versions aren't used)
+WIKITEXT_CACHE_PREFIX = "wikitext-v2:"
+
+
+def _cached_introductions(revids: list, use_cache: bool) -> tuple:
+    """
+    Look up introductions from wikitext in the cache.
 
-        try:
+    Returns:
+        Tuple of (introductions, to_fetch): dictionary of cached introductions by revid
+        and list of unique revids that are not in the cache
+    """
+    introductions = {}
+    to_fetch = []
+    for revid in revids:
+        if not revid or int(revid) in introductions or int(revid) in to_fetch:
+            continue
+        if use_cache:
+            # Introductions from wikitext are stored separately from those from HTML
+            introduction = introduction_cache.get(f"{WIKITEXT_CACHE_PREFIX}{revid}")
+            if introduction is not None:
+                introductions[int(revid)] = introduction
+                continue
+        to_fetch.append(int(revid))
+    return introductions, to_fetch
+
+
+def introductions_params(revids: list) -> dict:
+    """
+    Get the API parameters to download the lead-section wikitext of up to 50 revisions.
+    """
+    return {
+        "action": "query",
+        "prop": "revisions",
+        "revids": "|".join(str(revid) for revid in revids),
+        "rvprop": "ids|content",
+        "rvslots": "main",
+        "rvsection": 0,
+        "format": "json",
+    }
+
+
+def _add_wikitexts(json_data: dict, wikitexts: dict):
+    """
+    Add the lead-section wikitext in a query response to a dictionary by revid.
+    """
+    pages = json_data.get("query", {}).get("pages", {})
+    for page in pages.values():
+        for revision in page.get("revisions", []):
+            # Content of deleted revisions is hidden
+            try:
+                wikitexts[revision["revid"]] = revision["slots"]["main"]["*"]
+            except KeyError:
+                continue
+
+
+def _add_introductions(
+    wikitexts: list, revids: list, introductions: dict, use_cache: bool
+):
+    """
+    Convert lead-section wikitext to introductions and add them to the dictionary and cache.
+    """
+    for revid, wikitext in zip(revids, wikitexts):
+        if wikitext is None:
+            continue
+        introduction = wikitext_to_text(wikitext)
+        introductions[revid] = introduction
+        if use_cache:
+            introduction_cache.set(f"{WIKITEXT_CACHE_PREFIX}{revid}", introduction)
+
+
+def get_lead_wikitexts(revids: list) -> list:
+    """
+    Retrieve the wikitext of the lead section of many revisions with one API request for
+    up to 50 revisions. The wikitext isn't cached.
+
+    Args:
+        revids: Revision ids of articles
+
+    Returns:
+        List of wikitexts in the same order as revids (None for missing or deleted revisions)
+    """
+    wikitexts = {}
+    to_fetch = list(dict.fromkeys(int(revid) for revid in revids if revid))
+    for i in range(0, len(to_fetch), MAX_REVIDS):
+        params = introductions_params(to_fetch[i : i + MAX_REVIDS])
+        while True:
             json_data = run_get_request(params)
-            pages = json_data["query"]["pages"]
-            page_id = list(pages.keys())[0]
+            _add_wikitexts(json_data, wikitexts)
+            # Large responses are split into parts
+            if "continue" not in json_data:
+                break
+            params.update(json_data["continue"])
+    return [wikitexts.get(int(revid)) if revid else None for revid in revids]
 
-            if page_id == "-1":
-                raise ValueError(f"Page not found for revid {revid}")
 
-            revisions = pages[page_id]["revisions"]
+def get_wikipedia_introductions(revids: list, use_cache: bool = True) -> list:
+    """
+    Retrieve the introductions of many revisions with one API request for up to 50 revisions.
+
+    The wikitext of the lead section is downloaded and converted to plain text locally
+    (see wikitext_to_text()), so the output may differ slightly from get_wikipedia_introduction().
 
-            # Find the index of the given revid in the current batch of revisions
-            for i, revision in enumerate(revisions):
-                if revision["revid"] == revid:
-                    return revision_count + i
+    Args:
+        revids: Revision ids of articles
+        use_cache: Look up and store the introductions in the persistent cache
 
-            # Update the count of revisions we've checked
-            revision_count += len(revisions)
+    Returns:
+        List of introductions in the same order as revids (None for missing or deleted revisions)
 
-            # Check if there are more revisions to search
-            continue_token = json_data.get("continue", {}).get("rvcontinue")
+    Example:
+        json_data = get_previous_revisions("David_Szalay", revisions = 100)
+        revids = [extract_revision_info(json_data, n)["revid"] for n in [0, 10, 100]]
+        get_wikipedia_introductions(revids)
+    """
+    introductions, to_fetch = _cached_introductions(revids, use_cache)
+    wikitexts = get_lead_wikitexts(to_fetch)
+    _add_introductions(wikitexts, to_fetch, introductions, use_cache)
 
-            if not continue_token:
-                # Reached the end of revisions but didn't find the revid
-                raise ValueError(
-                    f"Revid {revid} not found in the revision history of the page. "
-                    f"It may be from a different page or may have been deleted."
-                )
+    return [introductions.get(int(revid)) if revid else None for revid in revids]
 
-        except ValueError:
-            # Re-raise ValueError exceptions
-            raise
-        except Exception as e:
-            raise ValueError(f"Error searching for revid {revid}: {e}")
 
-    # If we looped without returning the revision count, return it as a negative number
-    negative_revision_count = -revision_count
-    return negative_revision_count
+def _get_revision(title: str, revid: int = None, timestamp: str = None, rvdir="older"):
+    """
+    Get the id and timestamp of a revision: the current revision, a given revid, or the
+    closest revision before (rvdir="older") or after (rvdir="newer") a timestamp.
+    """
+    json_data = run_get_request(_revision_params(title, revid, timestamp, rvdir))
+    return _first_revision(json_data)
 
 
-def get_random_wikipedia_title():
-    url = "https://en.wikipedia.org/w/api.php"
+def _revision_params(title: str, revid: int, timestamp: str, rvdir: str) -> dict:
+    """
+    Get the API parameters for _get_revision().
+    """
     params = {
         "action": "query",
-        "list": "random",
-        "rnnamespace": 0,
-        "rnlimit": 1,
+        "prop": "revisions",
+        "rvprop": "ids|timestamp",
         "format": "json",
     }
+    if revid:
+        params["revids"] = revid
+    else:
+        params.update(titles=title, rvlimit=1, rvdir=rvdir)
+        if timestamp:
+            params["rvstart"] = timestamp
+    return params
+
+
+def _first_revision(json_data: dict) -> Optional[dict]:
+    """
+    Get the id and timestamp of the first revision in a query response (None if there is none).
+    """
+    pages = json_data.get("query", {}).get("pages", {})
+    for page_id, page in pages.items():
+        if page_id != "-1" and page.get("revisions"):
+            revision = page["revisions"][0]
+            return {"revid": revision["revid"], "timestamp": revision["timestamp"]}
+    return None
+
+
+def _edit_count_url(title: str) -> str:
+    """
+    URL of the REST API endpoint for counting the edits of a page.
+    """
+    return f"{REST_URL}/page/{quote(title.replace(' ', '_'), safe='')}/history/counts/edits"
+
+
+def _middle_timestamp(old: dict, new: dict) -> str:
+    """
+    Get the timestamp halfway between the timestamps of two revisions.
+    """
+    old_time = datetime.fromisoformat(old["timestamp"].replace("Z", "+00:00"))
+    new_time = datetime.fromisoformat(new["timestamp"].replace("Z", "+00:00"))
+    return (old_time + (new_time - old_time) / 2).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _count_revisions_between(title: str, old: dict, new: dict) -> int:
+    """
+    Count the revisions of a page between two revisions (excluding both).
+
+    The REST API counts up to 30000 edits in one request. For longer histories,
+    the interval is split at the revision closest to the midpoint of the timestamps,
+    so the number of requests grows only with the number of 30000-edit blocks.
+    """
+    json_data = run_get_request(
+        {"from": old["revid"], "to": new["revid"]}, url=_edit_count_url(title)
+    )
+    if not json_data.get("limit"):
+        return json_data["count"]
+
+    # Split the interval at the midpoint of the timestamps
+    middle = _middle_timestamp(old, new)
+    revision = _get_revision(title, timestamp=middle, rvdir="older")
+    if revision is None or revision["revid"] == old["revid"]:
+        revision = _get_revision(title, timestamp=middle, rvdir="newer")
+    if revision is None or revision["revid"] in [old["revid"], new["revid"]]:
+        raise ValueError(f"Unable to split revision history of '{title}'")
+
+    return (
+        _count_revisions_between(title, old, revision)
+        + 1
+        + _count_revisions_between(title, revision, new)
+    )
+
+
+def get_revisions_behind(title: str, revid: int) -> int:
+    """
+    Get the number of revisions a given revid is behind the current revision of the page.
 
+    Args:
+        title: Wikipedia article title
+        revid: Revision ID of the page
+
+    Returns:
+        Integer representing the number of revisions back (0 if it's the current revision)
+
+    Example:
+        # Get how many revisions behind a specific revid is
+        revisions_behind = get_revisions_behind("Albert Einstein", 123456789)
+
+    Note:
+        This uses the edit counts from the REST API, so it takes three requests
+        (current revision, target revision, count) for up to 30000 revisions behind,
+        and a few more for each additional 30000 revisions.
+    """
+    try:
+        current = _get_revision(title)
+        if current is None:
+            raise ValueError(f"Page not found for revid {revid}")
+
+        if current["revid"] == int(revid):
+            return 0
+
+        target = _get_revision(title, revid=revid)
+        if target is None:
+            raise ValueError(
+                f"Revid {revid} not found in the revision history of the page. "
+                f"It may be from a different page or may have been deleted."
+            )
+
+        # The target revision and the revisions between it and the current one
+        return _count_revisions_between(title, target, current) + 1
+
+    except ValueError:
+        # Re-raise ValueError exceptions
+        raise
+    except Exception as e:
+        raise ValueError(f"Error searching for revid {revid}: {e}")
+
+
+# Parameters to get a random article title
+RANDOM_TITLE_PARAMS = {
+    "action": "query",
+    "list": "random",
+    "rnnamespace": 0,
+    "rnlimit": 1,
+    "format": "json",
+}
+
+
+def get_random_wikipedia_title():
     try:
-        json_data = run_get_request(params)
+        json_data = run_get_request(RANDOM_TITLE_PARAMS)
 
         # Extract the title
         title = json_data["query"]["random"][0]["title"]
@@ -332,3 +1419,33 @@ def get_random_wikipedia_title():
     except requests.RequestException as e:
         print(f"Error fetching random Wikipedia title: {e}")
         return None
+
+
+# Maximum number of random titles in one request (API limit)
+MAX_RANDOM_TITLES = 500
+
+
+def random_titles_params(count: int) -> dict:
+    """
+    Get the parameters to request a number of random article titles.
+    """
+    return dict(RANDOM_TITLE_PARAMS, rnlimit=min(count, MAX_RANDOM_TITLES))
+
+
+def get_random_wikipedia_titles(count: int = 20) -> list:
+    """
+    Get many random article titles with one API request.
+
+    Args:
+        count: Number of titles (up to 500)
+
+    Returns:
+        List of titles (empty if the request failed)
+    """
+    try:
+        json_data = run_get_request(random_titles_params(count))
+        return [page["title"] for page in json_data["query"]["random"]]
+
+    except requests.RequestException as e:
+        print(f"Error fetching random Wikipedia titles: {e}")
+        return []